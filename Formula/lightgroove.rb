@@ -16,7 +16,7 @@ class Lightgroove < Formula
 
     # Install Python deps (keep in sync with requirements.txt).
     venv.pip_install "pyserial==3.5"
-    venv.pip_install "stupidArtnet==1.4.0"
+    venv.pip_install "numpy>=1.22"
 
     # Install project files into libexec.
     libexec.install Dir["*"]
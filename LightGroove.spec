@@ -12,9 +12,20 @@ a = Analysis(
     ],
     hiddenimports=[
         'src.dmx_controller',
+        'src.artnet_sender',
+        'src.sacn_sender',
+        'src.serial_output',
+        'src.output_worker',
         'src.fixture_manager',
         'src.color_manager',
+        'src.move_manager',
         'src.http_api',
+        'src.async_http',
+        'src.live_state',
+        'src.fader_input',
+        'src.cue_store',
+        'src.cue_list',
+        'src.layer_merge',
         'src.ui_generator',
     ],
     hookspath=[],
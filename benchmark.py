@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for LightGroove hot paths.
+Runs entirely in virtual DMX mode - no ArtNet node or serial device required.
+
+Usage: python benchmark.py [--fixtures N] [--iterations N]
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from dmx_controller import DMXController
+from fixture_manager import FixtureManager
+from http_api import HttpApiServer
+from async_http import AsyncHttpApiServer
+from move_manager import MoveFXEngine, MOVE_SHAPES, np
+from cue_store import CueStore
+from cue_list import CueListPlayer
+
+
+BASE_DIR = Path(__file__).parent
+FIXTURES_FILE = BASE_DIR / "config" / "fixtures.json"
+
+
+def build_rig(fixture_count: int, tmp_dir: str) -> FixtureManager:
+    """Patch fixture_count fixtures (alternating PARs and moving heads) across as many universes as needed"""
+    fixtures_config = json.loads(FIXTURES_FILE.read_text())
+    types = ['rgbw_dimmer_shutter_macro', 'uking_mini_moving_light']
+    universes = {}
+    universe_id, address = 1, 1
+    for i in range(fixture_count):
+        fixture_type = types[i % len(types)]
+        footprint = len(fixtures_config[fixture_type]['channels'])
+        if address + footprint - 1 > 512:
+            universe_id, address = universe_id + 1, 1
+        universes.setdefault(str(universe_id), {'fixtures': []})['fixtures'].append(
+            {'id': f'fx{i}', 'type': fixture_type, 'start_address': address}
+        )
+        address += footprint
+
+    patch_file = os.path.join(tmp_dir, 'patch.json')
+    with open(patch_file, 'w') as f:
+        json.dump({'universes': universes}, f)
+
+    dmx = DMXController()
+    for uid in universes:
+        dmx.add_universe(int(uid))
+    return FixtureManager(dmx, str(FIXTURES_FILE), patch_file)
+
+
+def quiet():
+    """Suppress the engines' console logging while setting up or switching effects"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def timed(label: str, calls: int, func):
+    """Run func once and print the per-call cost of the calls it performs"""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<44} {elapsed / calls * 1e6:8.2f} us/call")
+    return elapsed / calls
+
+
+def linear_channel_lookup(fixture: dict, channel_name: str):
+    """Channel lookup as done before the compiled address table (scan of config['channels'])"""
+    for ch in fixture['config']['channels']:
+        if ch['name'] == channel_name:
+            return ch
+    return None
+
+
+def bench_channel_index(fm: FixtureManager, iterations: int):
+    print("\nChannel lookup (FixtureManager)")
+    fixture_ids = fm.list_fixtures()
+    names = ['dimmer', 'red', 'white', 'macro_speed', 'pan', 'tilt_fine', 'master_dimmer', 'reset']
+    calls = iterations * len(names)
+
+    def scan():
+        for i in range(iterations):
+            fixture = fm.fixtures[fixture_ids[i % len(fixture_ids)]]
+            for name in names:
+                linear_channel_lookup(fixture, name)
+
+    def indexed():
+        for i in range(iterations):
+            fixture = fm.fixtures[fixture_ids[i % len(fixture_ids)]]
+            for name in names:
+                fixture['channels'].get(name)
+
+    before = timed("linear scan of config['channels']", calls, scan)
+    after = timed("compiled address table", calls, indexed)
+    print(f"  speedup: {before / after:.1f}x")
+
+    def has_channel():
+        for i in range(iterations):
+            fid = fixture_ids[i % len(fixture_ids)]
+            for name in names:
+                fm.has_channel(fid, name)
+
+    def set_channel():
+        for i in range(iterations):
+            fid = fixture_ids[i % len(fixture_ids)]
+            fm.set_fixture_channel(fid, 'tilt' if fm.has_pan_tilt(fid) else 'red', 0.5)
+
+    def set_color():
+        for i in range(iterations):
+            fm.set_fixture_color(fixture_ids[i % len(fixture_ids)], 1.0, 0.5, 0.0, 0.0)
+
+    timed("has_channel()", calls, has_channel)
+    timed("set_fixture_channel()", iterations, set_channel)
+    timed("set_fixture_color()", iterations, set_color)
+
+
+def bench_frame_export(fm: FixtureManager, iterations: int):
+    print("\nFrame export (DMXUniverse)")
+    universe = next(iter(fm.dmx.universes.values()))
+    data = [0] * 512
+
+    def list_copy():
+        for _ in range(iterations):
+            # Previous path: list copy per frame, rebuilt again for the serial packet
+            frame = data.copy()
+            bytes([0x00] + frame)
+
+    def snapshot():
+        for _ in range(iterations):
+            universe.snapshot()
+
+    before = timed("list copy + bytes([0x00] + data)", iterations, list_copy)
+    after = timed("immutable snapshot()", iterations, snapshot)
+    print(f"  speedup: {before / after:.1f}x")
+
+
+def bench_move_effects(fm: FixtureManager, iterations: int, tmp_dir: str):
+    print("\nMove effects, one frame for all moving heads (MoveFXEngine)")
+    with quiet():
+        engine = MoveFXEngine(fm, state_file=os.path.join(tmp_dir, 'move_state.json'))
+    engine.autosave_running = False
+    engine.fx_size, engine.move_phase = 0.5, 1.0
+    frames = max(1, iterations // 100)
+    print(f"  {len(engine.get_moving_fixtures())} moving heads, {frames} frames per shape")
+    if np is None:
+        print("  numpy not installed - only the scalar path is available")
+
+    for fx_name in MOVE_SHAPES:
+        with quiet():
+            engine.start_fx(fx_name)
+        results = {}
+        for vectorized in (False, True):
+            if vectorized and np is None:
+                continue
+            engine.vectorized = vectorized
+
+            def render():
+                for frame in range(frames):
+                    engine._render(frame / 44.0)
+
+            label = f"{fx_name} ({'vectorized' if vectorized else 'scalar'})"
+            results[vectorized] = timed(label, frames, render)
+        if len(results) == 2:
+            print(f"  {'':<44} speedup: {results[False] / results[True]:.1f}x")
+        with quiet():
+            engine.stop_fx()
+
+
+def bench_cue_recall(fm: FixtureManager, iterations: int, tmp_dir: str):
+    print("\nScene recall, all fixtures (CueStore)")
+    store = CueStore(fm, cue_file=os.path.join(tmp_dir, 'cues.json'))
+    with quiet():
+        with fm.frame():
+            for fixture_id in fm.list_fixtures():
+                fm.set_fixture_dimmer(fixture_id, 1.0)
+                if fm.has_pan_tilt(fixture_id):
+                    fm.set_pan_tilt(fixture_id, 0.5, 0.5)
+                else:
+                    fm.set_fixture_color(fixture_id, 1.0, 0.5, 0.0, 0.0)
+        cue = store.save_cue('bench')
+    saved = fm.save_current_states()
+    recalls = max(1, iterations // 100)
+    print(f"  {sum(len(patch.values) for patch in cue.patches)} channels in {len(cue.patches)} patches")
+
+    def replay():
+        for _ in range(recalls):
+            fm.restore_states(saved)
+
+    def recall():
+        for _ in range(recalls):
+            store.recall('bench', fade=0)
+
+    before = timed("restore_states() (channel by channel)", recalls, replay)
+    after = timed("CueStore.recall() (compiled patches)", recalls, recall)
+    print(f"  speedup: {before / after:.1f}x")
+
+
+def bench_cue_list(fm: FixtureManager, iterations: int, tmp_dir: str):
+    print("\nCue list fade, one frame (CueListPlayer)")
+    with quiet():
+        store = CueStore(fm, cue_file=os.path.join(tmp_dir, 'cues.json'))
+        player = CueListPlayer(store, list_file=os.path.join(tmp_dir, 'cue_lists.json'))
+    pars = [fid for fid in fm.list_fixtures() if not fm.has_pan_tilt(fid)]
+    with quiet():
+        store.save_cue('look', values={fid: {'dimmer': 1.0, 'red': 1.0, 'green': 0.5} for fid in pars})
+        store.save_cue('accent', values={fid: {'blue': 1.0} for fid in pars[:4]})
+        player.save_list('bench', ['look', {'cue': 'accent', 'fade_in': 1e9}])
+        player.goto('bench', 0, now=0.0)
+        player.goto('bench', 1, now=0.0)
+    frames = max(1, iterations // 10)
+    print(f"  {len(pars) * 3 + 4} channels in the look, {player.get_status()['fading_channels']} changed by the GO")
+
+    def full_fade():
+        for frame in range(frames):
+            store._render(frame / 44.0)
+
+    def tracked_fade():
+        for frame in range(frames):
+            player._render(frame / 44.0)
+
+    store.recall('look', fade=1e9, start_time=0.0)
+    before = timed("CueStore crossfade (whole look)", frames, full_fade)
+    store.stop_fade()
+    after = timed("CueListPlayer (changed channels only)", frames, tracked_fade)
+    print(f"  speedup: {before / after:.1f}x")
+    with quiet():
+        player.release()
+
+
+def bench_http_api(fm: FixtureManager, requests: int):
+    print("\nFader POST flood over loopback (HttpApiServer / AsyncHttpApiServer)")
+    fixture_id = fm.list_fixtures()[0]
+    path = f"/api/fixture/{fixture_id}/dimmer"
+    headers = {'Content-Type': 'application/json'}
+
+    def post(conn, i):
+        conn.request('POST', path, body=json.dumps({'value': (i % 256) / 255}), headers=headers)
+        conn.getresponse().read()
+
+    def connection_per_request(address):
+        # What every fader value cost with HTTP/1.0: connect, send, close
+        for i in range(requests):
+            conn = http.client.HTTPConnection(*address)
+            post(conn, i)
+            conn.close()
+
+    def keep_alive(address):
+        conn = http.client.HTTPConnection(*address)
+        for i in range(requests):
+            post(conn, i)
+        conn.close()
+
+    results = {}
+    for server_class in (HttpApiServer, AsyncHttpApiServer):
+        server = server_class(fm, BASE_DIR / "ui", host="127.0.0.1", port=0)
+        with quiet():
+            server.start()
+        name = "asyncio" if server_class is AsyncHttpApiServer else "threaded"
+        address = ("127.0.0.1", server.bound_port if name == "asyncio" else server._server.server_address[1])
+        # Request logging goes to stderr
+        with contextlib.redirect_stderr(io.StringIO()):
+            if name == "threaded":
+                results['new'] = timed("new connection per request (threaded)", requests,
+                                       lambda: connection_per_request(address))
+            results[name] = timed(f"keep-alive connection ({name})", requests, lambda: keep_alive(address))
+        with quiet():
+            server.stop()
+    print(f"  {1 / results['new']:,.0f} -> {1 / results['threaded']:,.0f} (threaded) / "
+          f"{1 / results['asyncio']:,.0f} (asyncio) requests/s")
+
+
+def bench_layer_merge(fm: FixtureManager, iterations: int):
+    print("\nOutput layers (DMXController.merge)")
+    dmx = fm.dmx
+    flashes = max(1, iterations // 100)
+    saved = fm.save_current_states()
+
+    def flash_replay():
+        for _ in range(flashes):
+            fm.flash_all_white()
+            fm.restore_states(saved)
+
+    def flash_overlay():
+        for _ in range(flashes):
+            fm.flash_all_white()
+            fm.release_flash()
+
+    before = timed("flash on/off, replay saved states", flashes, flash_replay)
+    after = timed("flash on/off, overlay layer", flashes, flash_overlay)
+    print(f"  speedup: {before / after:.1f}x")
+
+    frames = max(1, iterations // 10)
+
+    def merge_frame():
+        for _ in range(frames):
+            for universe in dmx.universes.values():
+                universe.layers_dirty = True
+            dmx.merge()
+
+    print(f"  {len(dmx.universes)} universes, every universe changed each frame")
+    timed(f"merge, {len(dmx.layers)} layers", frames, merge_frame)
+    for i in range(16 - len(dmx.layers)):
+        dmx.add_layer(f'bench{i}')
+    timed(f"merge, {len(dmx.layers)} layers", frames, merge_frame)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LightGroove micro-benchmarks")
+    parser.add_argument('--fixtures', type=int, default=200, help="number of patched fixtures")
+    parser.add_argument('--iterations', type=int, default=20000, help="iterations per benchmark")
+    parser.add_argument('--requests', type=int, default=2000, help="HTTP requests per load test")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Silence per-fixture patch output while building the rig
+        with quiet():
+            fm = build_rig(args.fixtures, tmp_dir)
+
+        print(f"LightGroove benchmark: {args.fixtures} fixtures, {args.iterations} iterations")
+        bench_channel_index(fm, args.iterations)
+        bench_frame_export(fm, args.iterations)
+        bench_move_effects(fm, args.iterations, tmp_dir)
+        bench_cue_recall(fm, args.iterations, tmp_dir)
+        bench_cue_list(fm, args.iterations, tmp_dir)
+        bench_http_api(fm, args.requests)
+        # Last: adds layers to the rig
+        bench_layer_merge(fm, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
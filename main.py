@@ -17,8 +17,11 @@ from dmx_controller import DMXController
 from fixture_manager import FixtureManager
 from ui_generator import generate_ui
 from http_api import HttpApiServer
+from async_http import AsyncHttpApiServer
 from color_manager import ColorFXEngine
 from move_manager import MoveFXEngine
+from cue_store import CueStore
+from cue_list import CueListPlayer
 
 
 def main():
@@ -34,6 +37,8 @@ def main():
     artnet_file = base_dir / "config" / "artnet.json"
     ui_dir = base_dir / "ui_dist"
     http_port = int(os.getenv("LIGHTGROOVE_HTTP_PORT", "5555"))
+    # 'threaded' (thread per connection) or 'asyncio' (single event loop)
+    http_server = os.getenv("LIGHTGROOVE_HTTP_SERVER", "threaded")
     
     print(f"\nConfiguration:")
     print(f"  Fixtures: {fixtures_file}")
@@ -58,9 +63,17 @@ def main():
         # Move FX Engine
         move_fx = MoveFXEngine(fixture_mgr)
         
+        # Cue Store (config/cues.json)
+        cue_store = CueStore(fixture_mgr)
+        
+        # Cue List Player (config/cue_lists.json)
+        cue_list = CueListPlayer(cue_store)
+        
         # Generate UI shell and start HTTP UI/API server
         generate_ui(fixture_mgr, ui_dir, api_base="")
-        http = HttpApiServer(fixture_mgr, ui_dir, host="0.0.0.0", port=http_port, color_fx=color_fx, move_fx=move_fx)
+        server_class = AsyncHttpApiServer if http_server == "asyncio" else HttpApiServer
+        http = server_class(fixture_mgr, ui_dir, host="0.0.0.0", port=http_port, color_fx=color_fx, move_fx=move_fx,
+                            cue_store=cue_store, cue_list=cue_list)
         try:
             http.start()
         except OSError as e:
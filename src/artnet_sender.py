@@ -0,0 +1,106 @@
+"""
+Art-Net Sender for LightGroove
+Encodes ArtDmx packets and sends every universe through one shared UDP socket
+"""
+
+import socket
+from typing import Dict, Tuple
+
+
+ARTNET_PORT = 6454
+ARTNET_ID = b'Art-Net\x00'
+OP_DMX = 0x5000
+PROTOCOL_VERSION = 14
+DMX_HEADER_SIZE = 18
+DMX_CHANNELS = 512
+
+
+def build_dmx_header(universe: int, length: int = DMX_CHANNELS) -> bytearray:
+    """
+    Build an ArtDmx packet header (sequence byte left at 0)
+
+    Args:
+        universe: 15-bit Art-Net port-address (Net in bits 8-14, Sub-Net/Universe in bits 0-7)
+        length: Number of DMX channels in the packet (2-512, even)
+    """
+    header = bytearray(DMX_HEADER_SIZE)
+    header[0:8] = ARTNET_ID
+    header[8:10] = OP_DMX.to_bytes(2, 'little')
+    header[10:12] = PROTOCOL_VERSION.to_bytes(2, 'big')
+    # 12: sequence (set per packet), 13: physical port
+    header[14] = universe & 0xFF         # SubUni
+    header[15] = (universe >> 8) & 0x7F  # Net
+    header[16:18] = length.to_bytes(2, 'big')
+    return header
+
+
+class ArtNetPort:
+    """One destination universe: a pre-built packet and its own sequence counter"""
+
+    def __init__(self, sender: 'ArtNetSender', address: Tuple[str, int], universe: int):
+        self.sender = sender
+        self.address = address
+        self.universe = universe
+        self.sequence = 0
+        self.packets_sent = 0
+        self.send_errors = 0
+        # Header template + channel data, reused for every packet
+        self._packet = bytearray(DMX_HEADER_SIZE + DMX_CHANNELS)
+        self._packet[:DMX_HEADER_SIZE] = build_dmx_header(universe)
+        self._data = memoryview(self._packet)[DMX_HEADER_SIZE:]
+
+    def send(self, data) -> bool:
+        """
+        Send one DMX frame
+
+        Args:
+            data: 512 channel values (bytes-like, without start code)
+        """
+        # Sequence runs 1-255; 0 would tell the receiver sequencing is disabled
+        self.sequence = self.sequence % 255 + 1
+        self._packet[12] = self.sequence
+        self._data[:] = data
+        try:
+            sent = self.sender.sendto(self._packet, self.address)
+        except OSError:
+            self.send_errors += 1
+            raise
+        if sent:
+            self.packets_sent += 1
+        return sent
+
+
+class ArtNetSender:
+    """Shared non-blocking UDP socket for all Art-Net destinations"""
+
+    def __init__(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self.socket.setblocking(False)
+        self.ports: Dict[Tuple[str, int, int], ArtNetPort] = {}
+        self.packets_dropped = 0  # Socket buffer full
+
+    def add_port(self, ip: str, universe: int, port: int = ARTNET_PORT) -> ArtNetPort:
+        """Get the destination for (ip, port, universe), creating it on first use"""
+        key = (ip, port, universe)
+        if key not in self.ports:
+            self.ports[key] = ArtNetPort(self, (ip, port), universe)
+        return self.ports[key]
+
+    def sendto(self, packet, address: Tuple[str, int]) -> bool:
+        """
+        Send one datagram without blocking; a full socket buffer drops the packet
+
+        Raises:
+            OSError: Destination unreachable or other socket errors (handled by the output worker)
+        """
+        try:
+            self.socket.sendto(packet, address)
+            return True
+        except BlockingIOError:
+            self.packets_dropped += 1
+        return False
+
+    def close(self):
+        """Close the UDP socket"""
+        self.socket.close()
@@ -0,0 +1,208 @@
+"""
+Asyncio HTTP server for LightGroove
+Serves the same routes as HttpApiServer from a single event loop instead of a thread per connection
+"""
+
+import asyncio
+import http.client
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Optional, Set
+from urllib.parse import urlsplit
+
+from http_api import ApiResponse, HttpApiServer, CORS_PREFLIGHT
+
+
+class AsyncHttpApiServer(HttpApiServer):
+    """
+    HttpApiServer variant running on one asyncio event loop (in a background thread).
+
+    Connections are coroutines, not threads, so many clients dragging faders do not
+    create hundreds of threads competing with the DMX output. Route handlers run one at
+    a time on a single engine thread, in arrival order, so the loop never blocks on
+    fixture locks or file I/O. Limits:
+        max_connections: further connections get 503 and are closed
+        max_pending: requests waiting for the engine thread; when full, connections stop
+            reading until a slot frees up, which pushes back on the clients via TCP
+    """
+
+    HEADER_LIMIT = 64 * 1024
+    MAX_BODY = 1024 * 1024
+    IDLE_TIMEOUT = 30.0
+
+    def __init__(self, *args, max_connections: int = 256, max_pending: int = 64, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_connections = max_connections
+        self.max_pending = max_pending
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._start_error: Optional[BaseException] = None
+        self._connections: Set[asyncio.Task] = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-engine")
+        self.bound_port = None
+        # Metrics
+        self.connections_rejected = 0
+
+    def start(self):
+        """Start the event loop thread; raises OSError if the port cannot be bound"""
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._serve()), name="http-asyncio", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._start_error:
+            raise self._start_error
+        print(f"HTTP UI/API: http://{self.host}:{self.bound_port} (asyncio)")
+
+    def stop(self):
+        """Close the listening socket and all connections"""
+        if self._thread and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+            self._thread.join(timeout=2)
+            self._executor.shutdown(wait=False)
+            self.fader_input.close()
+            print("HTTP UI/API: Stopped")
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._pending = asyncio.Semaphore(self.max_pending)
+        try:
+            server = await asyncio.start_server(self._on_connection, self.host, self.port, limit=self.HEADER_LIMIT)
+        except OSError as e:
+            self._start_error = e
+            self._ready.set()
+            return
+        self.bound_port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+
+        async with server:
+            await self._stop_event.wait()
+            tasks = list(self._connections)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _on_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        try:
+            if len(self._connections) >= self.max_connections:
+                self.connections_rejected += 1
+                await self._write(writer, ApiResponse(503, b'{"error": "too many connections"}',
+                                                      headers=(("Retry-After", "1"),)), keep_alive=False)
+                return
+            self._connections.add(task)
+            while await self._handle_request(reader, writer):
+                pass
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass  # Client closed or went idle
+        except asyncio.CancelledError:
+            pass  # Server stopping; finish quietly instead of leaving a cancelled task to asyncio's callback
+        except asyncio.LimitOverrunError:
+            await self._write(writer, ApiResponse(431, b"{}"), keep_alive=False)
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _handle_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Read and answer one request; returns False when the connection should close"""
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.IDLE_TIMEOUT)
+        request_line, _, header_block = head.partition(b"\r\n")
+        headers = http.client.parse_headers(io.BytesIO(header_block))
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+            length = int(headers.get("Content-Length", "0") or 0)
+        except ValueError:
+            await self._write(writer, ApiResponse(400, b"{}"), keep_alive=False)
+            return False
+
+        connection = headers.get("Connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+        if length > self.MAX_BODY:
+            await self._write(writer, ApiResponse(413, b"{}"), keep_alive=False)
+            return False
+        body = await reader.readexactly(length) if length else b""
+
+        if method == "OPTIONS":
+            await self._write(writer, CORS_PREFLIGHT, keep_alive)
+            return keep_alive
+        if method == "GET" and urlsplit(target).path == "/api/events":
+            await self._stream_events(writer)
+            return False
+        if method not in ("GET", "POST"):
+            await self._write(writer, ApiResponse(501, b"{}"), keep_alive)
+            return keep_alive
+
+        payload = self._parse_json(body) if method == "POST" else {}
+        # Backpressure: wait for a slot before handing the request to the engine thread
+        async with self._pending:
+            response = await self._loop.run_in_executor(self._executor, self.handle, method, target, headers, payload)
+        await self._write(writer, response, keep_alive)
+        return keep_alive
+
+    @staticmethod
+    def _parse_json(body: bytes):
+        try:
+            return json.loads(body.decode("utf-8")) if body else {}
+        except Exception:
+            return {}
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, response: ApiResponse, keep_alive: bool):
+        status = HTTPStatus(response.status)
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}", "Access-Control-Allow-Origin: *"]
+        lines += [f"{name}: {value}" for name, value in response.headers]
+        body = b""
+        if response.status not in (204, 304):
+            body = response.body
+            lines.append(f"Content-Type: {response.content_type}")
+            lines.append(f"Content-Length: {len(body)}")
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _stream_events(self, writer: asyncio.StreamWriter):
+        """Server-Sent Events without a thread per client: the hub wakes the stream through an asyncio.Event"""
+        live_state = self.live_state
+        loop = self._loop
+        published = asyncio.Event()
+
+        def notify():
+            # Called on the sampler thread
+            try:
+                loop.call_soon_threadsafe(published.set)
+            except RuntimeError:
+                pass  # Loop closed while stopping
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                     b"Access-Control-Allow-Origin: *\r\nConnection: close\r\n\r\n")
+        live_state.add_listener(notify)
+        version, state = live_state.subscribe()
+        try:
+            writer.write(f"id: {version}\nevent: snapshot\ndata: {state}\n\n".encode("utf-8"))
+            await writer.drain()
+            while True:
+                # Cleared before reading, so a delta published after the read sets it again
+                published.clear()
+                deltas = live_state.deltas_since(version)
+                if deltas is None:
+                    # Fell behind the kept history: resync with a full state
+                    version, state = live_state.get_state()
+                    chunk = f"id: {version}\nevent: snapshot\ndata: {state}\n\n"
+                elif deltas:
+                    version = deltas[-1][0]
+                    chunk = "".join(f"id: {v}\nevent: delta\ndata: {payload}\n\n" for v, payload in deltas)
+                else:
+                    try:
+                        await asyncio.wait_for(published.wait(), 15)
+                        continue
+                    except asyncio.TimeoutError:
+                        chunk = ": keepalive\n\n"  # Comment line, also detects closed connections
+                writer.write(chunk.encode("utf-8"))
+                await writer.drain()
+        finally:
+            live_state.remove_listener(notify)
+            live_state.unsubscribe()
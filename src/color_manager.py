@@ -9,6 +9,8 @@ import os
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from layer_merge import COLOR_FX_LAYER
+
 
 def load_colors() -> Dict:
     """Load color definitions from config/colors.json"""
@@ -31,15 +33,27 @@ def load_colors() -> Dict:
 # Static color definitions (normalized 0.0-1.0 values)
 COLORS = load_colors()
 
+# Incremented whenever COLORS is reloaded (cache key for serialized color lists)
+_colors_version = 0
+
+# Map short keys to actual fixture channel names
+CHANNEL_MAP = {'r': 'red', 'g': 'green', 'b': 'blue', 'w': 'white'}
+
 
 def reload_colors():
     """Reload colors from config file and update the COLORS dictionary"""
-    global COLORS
+    global COLORS, _colors_version
     COLORS.clear()
     COLORS.update(load_colors())
+    _colors_version += 1
     print(f"Reloaded {len(COLORS)} colors from config")
 
 
+def colors_version() -> int:
+    """Get the version of the COLORS dictionary (changes on every reload)"""
+    return _colors_version
+
+
 class ColorFXEngine:
     """
     Manages color effects that run server-side independently of UI.
@@ -52,9 +66,17 @@ class ColorFXEngine:
         self.running = False
         self.current_fx = None
         self.current_colors = []  # Track currently displayed colors (list for multi-color FX)
-        self.fx_thread = None
-        self.stop_event = threading.Event()
-        self.flash_active = False  # Flag to pause FX during flash
+        self.group = 'color'  # Fixture group the effects run on
+        
+        # Render state, advanced once per DMX frame by _render()
+        self._render_lock = threading.Lock()
+        self._beat_func = None  # Beat handler of the running effect
+        self._fixtures: List[str] = []  # Members of the target group, captured at effect start
+        self._beat = -1  # Index of the last beat applied
+        self._beat_pos = 0.0  # Beats elapsed since effect start
+        self._last_render: Optional[float] = None
+        self._last_colors = {}  # Last color picked per fixture (or None for all), avoids repeats
+        self._clear_layer = False  # Release the FX layer on the next frame (set by stop_fx)
         
         # State persistence
         if state_file is None:
@@ -72,6 +94,10 @@ class ColorFXEngine:
         # Load saved state
         self._load_state()
         
+        # Effects write to their own output layer (a held flash overlays it) on the DMX frame clock
+        self.fixture_manager.dmx.add_layer(COLOR_FX_LAYER)
+        self.fixture_manager.dmx.add_renderer(self._render)
+        
     def set_bpm(self, bpm: int):
         """Set FX speed in beats per minute (1-480 range)."""
         self.bpm = max(1, min(480, bpm))
@@ -89,10 +115,8 @@ class ColorFXEngine:
         """Calculate interval in seconds based on BPM."""
         return 60.0 / self.bpm
     
-    def _apply_color_instant(self, fixture_id: str, color_values: dict, channel_map: dict):
+    def _apply_color_instant(self, fixture_id: str, color_values: dict):
         """Apply color to fixture instantly."""
-        if self.flash_active:  # Don't apply colors during flash
-            return
         # Use set_fixture_color to handle both RGBW and color wheel fixtures
         r = color_values.get('r', 0.0)
         g = color_values.get('g', 0.0)
@@ -100,113 +124,108 @@ class ColorFXEngine:
         w = color_values.get('w', 0.0)
         self.fixture_manager.set_fixture_color(fixture_id, r, g, b, w)
     
-    def _apply_colors_with_fade(self, fixture_colors: dict, channel_map: dict) -> float:
-        """Apply colors to multiple fixtures simultaneously with fade.
+    def _start_fade(self, fixture_colors: dict, now: float):
+        """Start fading multiple fixtures simultaneously to their new colors.
+        
+        The crossfades are kept per fixture by the fixture manager and interpolated
+        on the DMX frame clock; color wheel fixtures and fade 0% change instantly.
         
         Args:
             fixture_colors: Dict mapping fixture_id to color_values dict
-            channel_map: Dict mapping short keys to channel names
-            
-        Returns:
-            Actual fade time used in seconds
+            now: Frame timestamp the fade starts at
         """
-        if self.flash_active:  # Don't apply colors during flash
-            return 0.0
-        if self.fade_percentage <= 0:
-            # Instant color change for all fixtures
+        fade_time = self.fade_percentage * self.get_interval()
+        with self.fixture_manager.frame(COLOR_FX_LAYER):
             for fixture_id, color_values in fixture_colors.items():
-                self._apply_color_instant(fixture_id, color_values, channel_map)
-            return 0.0
-        else:
-            # Smooth fade - calculate actual time from percentage of beat interval
-            actual_fade_time = self.fade_percentage * self.get_interval()
-            steps = max(10, int(actual_fade_time * 20))  # 20 steps per second
-            step_time = actual_fade_time / steps
-            
-            # Get current RGBW values for all fixtures
-            fixture_current_values = {}
-            for fixture_id, color_values in fixture_colors.items():
-                # For fixtures with color wheel, we can't smoothly fade between wheel positions
-                # Just apply the final color instantly
-                if self.fixture_manager.has_channel(fixture_id, 'color_wheel'):
-                    self._apply_color_instant(fixture_id, color_values, channel_map)
-                    fixture_current_values[fixture_id] = None  # Skip fading for this fixture
-                else:
-                    # For RGBW fixtures, get current channel values for smooth fade
-                    current_values = {}
-                    for short_key in ['r', 'g', 'b', 'w']:
-                        channel_name = channel_map.get(short_key, short_key)
-                        try:
-                            current_values[short_key] = self.fixture_manager.get_fixture_channel(fixture_id, channel_name)
-                        except:
-                            current_values[short_key] = 0.0
-                    fixture_current_values[fixture_id] = current_values
-            
-            # Fade through steps for RGBW fixtures only
-            for step in range(1, steps + 1):
-                if not self.running or self.flash_active:
-                    break
-                progress = step / steps
-                for fixture_id, color_values in fixture_colors.items():
-                    current_values = fixture_current_values[fixture_id]
-                    if current_values is None:  # Color wheel fixture - already applied
-                        continue
-                    # Interpolate RGBW values
-                    r_curr = current_values.get('r', 0.0)
-                    g_curr = current_values.get('g', 0.0)
-                    b_curr = current_values.get('b', 0.0)
-                    w_curr = current_values.get('w', 0.0)
-                    r_target = color_values.get('r', 0.0)
-                    g_target = color_values.get('g', 0.0)
-                    b_target = color_values.get('b', 0.0)
-                    w_target = color_values.get('w', 0.0)
-                    r = r_curr + (r_target - r_curr) * progress
-                    g = g_curr + (g_target - g_curr) * progress
-                    b = b_curr + (b_target - b_curr) * progress
-                    w = w_curr + (w_target - w_curr) * progress
-                    self.fixture_manager.set_fixture_color(fixture_id, r, g, b, w)
-                time.sleep(step_time)
+                r = color_values.get('r', 0.0)
+                g = color_values.get('g', 0.0)
+                b = color_values.get('b', 0.0)
+                w = color_values.get('w', 0.0)
+                self.fixture_manager.fade_fixture_color(fixture_id, r, g, b, w, fade_time, now)
+    
+    def _render(self, now: float):
+        """
+        Advance the running effect for one DMX frame (called by the DMX output clock).
+        
+        The beat position is advanced by the real frame delta, so beats stay aligned to
+        the frame clock and BPM changes apply from the next frame without drift.
+        """
+        with self._render_lock:
+            if self._clear_layer:
+                # On the frame clock, after any crossfade step of the stopped effect was written
+                self._clear_layer = False
+                self.fixture_manager.dmx.clear_layer(COLOR_FX_LAYER)
+            if not self.running:
+                return
+            if self._last_render is not None:
+                self._beat_pos += (now - self._last_render) / self.get_interval()
+            self._last_render = now
             
-            return actual_fade_time
+            beat = int(self._beat_pos)
+            if beat != self._beat:
+                self._beat = beat
+                fixture_colors = self._beat_func(beat, self._fixtures)
+                self._start_fade(fixture_colors, now)
         
-    def start_fx(self, fx_name: str):
-        """Start a color effect by name."""
+    def start_fx(self, fx_name: str, group: Optional[str] = None):
+        """
+        Start a color effect by name.
+        
+        Args:
+            fx_name: Effect name ('random_1' ... 'random_4')
+            group: Fixture group to run on (defaults to the last used group, initially 'color')
+        """
         if self.running:
             self.stop_fx()
-            
-        self.current_fx = fx_name
-        self.running = True
-        self.stop_event.clear()
         
-        if fx_name == 'random' or fx_name == 'random_1':
-            self.fx_thread = threading.Thread(target=self._run_random_fx, daemon=True)
-            self.fx_thread.start()
-            print(f"Color FX: Started 'random_1' effect at {self.bpm} BPM")
-        elif fx_name == 'random_2':
-            self.fx_thread = threading.Thread(target=self._run_random_2_fx, daemon=True)
-            self.fx_thread.start()
-            print(f"Color FX: Started 'random_2' effect at {self.bpm} BPM")
-        elif fx_name == 'random_3':
-            self.fx_thread = threading.Thread(target=self._run_random_3_fx, daemon=True)
-            self.fx_thread.start()
-            print(f"Color FX: Started 'random_3' effect at {self.bpm} BPM")
-        elif fx_name == 'random_4':
-            self.fx_thread = threading.Thread(target=self._run_random_4_fx, daemon=True)
-            self.fx_thread.start()
-            print(f"Color FX: Started 'random_4' effect at {self.bpm} BPM")
-        else:
+        programs = {
+            'random': ('random_1', self._beat_random_1),
+            'random_1': ('random_1', self._beat_random_1),
+            'random_2': ('random_2', self._beat_random_2),
+            'random_3': ('random_3', self._beat_random_3),
+            'random_4': ('random_4', self._beat_random_4),
+        }
+        if fx_name not in programs:
             print(f"Color FX: Unknown effect '{fx_name}'")
-            self.running = False
+            return
+        
+        label, beat_func = programs[fx_name]
+        group_name = group or self.group
+        fixture_group = self.fixture_manager.get_group(group_name)
+        if fixture_group is None:
+            print(f"Color FX: Unknown group '{group_name}'")
+            return
+        
+        with self._render_lock:
+            self.current_fx = fx_name
+            self.group = group_name
+            self._fixtures = list(fixture_group.fixtures)
+            self._beat_func = beat_func
+            self._beat = -1
+            self._beat_pos = 0.0
+            self._last_render = None
+            self._last_colors = {}
+            self.running = True
+        print(f"Color FX: Started '{label}' effect on group '{group_name}' at {self.bpm} BPM")
             
     def stop_fx(self):
         """Stop the currently running effect."""
         if self.running:
             print(f"Color FX: Stopping '{self.current_fx}' effect")
-            self.running = False
-            self.stop_event.set()
-            if self.fx_thread and self.fx_thread.is_alive():
-                self.fx_thread.join(timeout=2.0)
-            self.current_fx = None
+            # Wait for an in-flight frame so no effect color lands after stop
+            with self._render_lock:
+                self.running = False
+                self.current_fx = None
+                fixtures = self._fixtures
+            # Colour steps are crossfades run by the fixture manager: stop them and release
+            # the FX layer so the fixtures fall back to the manual and cue layers
+            self.fixture_manager.cancel_fades(fixtures)
+            if self.fixture_manager.dmx.running:
+                # The frame clock may be writing a fade step right now; clear after it
+                # (a switch to another effect writes its first colours in the same frame)
+                self._clear_layer = True
+            else:
+                self.fixture_manager.dmx.clear_layer(COLOR_FX_LAYER)
             # Keep current_color to preserve highlighted state
     
     def _save_state(self):
@@ -274,158 +293,62 @@ class ColorFXEngine:
         if self.autosave_thread.is_alive():
             self.autosave_thread.join(timeout=1.0)
             
-    def _run_random_fx(self):
-        """Random color cycling effect - all fixtures same color."""
-        # Exclude 'black' from random color selection
+    def _pick_color(self, key) -> str:
+        """Pick a random color (excluding black), avoiding the last color picked for key."""
         color_names = [c for c in COLORS.keys() if c != 'black']
-        # Map short keys to actual fixture channel names
-        channel_map = {'r': 'red', 'g': 'green', 'b': 'blue', 'w': 'white'}
-        
-        while self.running:
-            # Pick random color (avoid repeating the same color)
-            last_color = self.current_colors[0] if self.current_colors else None
-            available_colors = [c for c in color_names if c != last_color]
-            if not available_colors:  # Fallback if only one color defined
-                available_colors = color_names
-            color_name = random.choice(available_colors)
-            self.current_colors = [color_name]  # Track current color
-            color_values = COLORS[color_name]
-            
-            # Apply to all fixtures simultaneously with fade
-            fixtures = self.fixture_manager.list_fixtures()
-            fixture_colors = {fixture_id: color_values for fixture_id in fixtures}
-            fade_time_used = self._apply_colors_with_fade(fixture_colors, channel_map)
-                        
-            # Wait for remaining time in beat (beat_interval - fade_time)
-            remaining_time = max(0.0, self.get_interval() - fade_time_used)
-            if self.stop_event.wait(remaining_time):
-                break
+        last_color = self._last_colors.get(key)
+        available_colors = [c for c in color_names if c != last_color]
+        if not available_colors:  # Fallback if only one color defined
+            available_colors = color_names
+        color_name = random.choice(available_colors)
+        self._last_colors[key] = color_name
+        return color_name
     
-    def _run_random_2_fx(self):
+    def _beat_random_1(self, beat: int, fixtures: List[str]) -> Dict[str, dict]:
+        """Random color cycling effect - all fixtures same color."""
+        color_name = self._pick_color(None)
+        self.current_colors = [color_name]  # Track current color
+        color_values = COLORS[color_name]
+        return {fixture_id: color_values for fixture_id in fixtures}
+    
+    def _beat_random_2(self, beat: int, fixtures: List[str]) -> Dict[str, dict]:
         """Random color cycling effect - each fixture gets different color."""
-        # Exclude 'black' from random color selection
-        color_names = [c for c in COLORS.keys() if c != 'black']
-        # Map short keys to actual fixture channel names
-        channel_map = {'r': 'red', 'g': 'green', 'b': 'blue', 'w': 'white'}
-        fixture_last_colors = {}  # Track last color per fixture
-        
-        while self.running:
-            fixtures = self.fixture_manager.list_fixtures()
-            
-            # Pick different random color for each fixture
-            fixture_colors = {}
-            for fixture_id in fixtures:
-                # Pick random color for this fixture (avoid repeating)
-                last_color = fixture_last_colors.get(fixture_id)
-                available_colors = [c for c in color_names if c != last_color]
-                if not available_colors:
-                    available_colors = color_names
-                color_name = random.choice(available_colors)
-                fixture_last_colors[fixture_id] = color_name
-                fixture_colors[fixture_id] = COLORS[color_name]
-            
-            # Apply all fixtures simultaneously with fade
-            fade_time_used = self._apply_colors_with_fade(fixture_colors, channel_map)
-            
-            # Track all active colors for UI display
-            self.current_colors = list(set(fixture_last_colors.values()))
-                        
-            # Wait for remaining time in beat (beat_interval - fade_time)
-            remaining_time = max(0.0, self.get_interval() - fade_time_used)
-            if self.stop_event.wait(remaining_time):
-                break
+        fixture_colors = {}
+        for fixture_id in fixtures:
+            fixture_colors[fixture_id] = COLORS[self._pick_color(fixture_id)]
+        # Track all active colors for UI display
+        self.current_colors = list(set(self._last_colors[fixture_id] for fixture_id in fixtures))
+        return fixture_colors
     
-    def _run_random_3_fx(self):
+    def _beat_random_3(self, beat: int, fixtures: List[str]) -> Dict[str, dict]:
         """Random color cycling effect - alternates between even/odd patches."""
-        # Exclude 'black' from random color selection
-        color_names = [c for c in COLORS.keys() if c != 'black']
+        color_name = self._pick_color(None)
+        color_values = COLORS[color_name]
         black_values = COLORS['black']
-        # Map short keys to actual fixture channel names
-        channel_map = {'r': 'red', 'g': 'green', 'b': 'blue', 'w': 'white'}
-        last_color = None
-        even_turn = True  # Start with even patches lit
-        
-        while self.running:
-            fixtures = self.fixture_manager.list_fixtures()
-            
-            # Pick random color (avoid repeating)
-            available_colors = [c for c in color_names if c != last_color]
-            if not available_colors:
-                available_colors = color_names
-            color_name = random.choice(available_colors)
-            last_color = color_name
-            color_values = COLORS[color_name]
-            
-            # Alternate between even and odd patches
-            fixture_colors = {}
-            for idx, fixture_id in enumerate(fixtures):
-                is_even = (idx % 2 == 0)
-                if (even_turn and is_even) or (not even_turn and not is_even):
-                    fixture_colors[fixture_id] = color_values
-                else:
-                    fixture_colors[fixture_id] = black_values
-            
-            # Track active color (black is not highlighted)
-            self.current_colors = [color_name]
-            
-            # Apply all fixtures simultaneously with fade
-            fade_time_used = self._apply_colors_with_fade(fixture_colors, channel_map)
-            
-            # Track current color for UI display
-            self.current_color = color_name
-            
-            # Toggle for next beat
-            even_turn = not even_turn
-                        
-            # Wait for remaining time in beat (beat_interval - fade_time)
-            remaining_time = max(0.0, self.get_interval() - fade_time_used)
-            if self.stop_event.wait(remaining_time):
-                break
+        # Even patches lit on even beats, odd patches on odd beats
+        even_turn = (beat % 2 == 0)
+        fixture_colors = {}
+        for idx, fixture_id in enumerate(fixtures):
+            is_even = (idx % 2 == 0)
+            fixture_colors[fixture_id] = color_values if is_even == even_turn else black_values
+        # Track active color (black is not highlighted)
+        self.current_colors = [color_name]
+        return fixture_colors
     
-    def _run_random_4_fx(self):
+    def _beat_random_4(self, beat: int, fixtures: List[str]) -> Dict[str, dict]:
         """Chaser effect - one fixture at a time from left to right with random colors."""
-        # Exclude 'black' from random color selection
-        color_names = [c for c in COLORS.keys() if c != 'black']
+        if not fixtures:
+            return {}
+        active_fixture_id = fixtures[beat % len(fixtures)]
+        color_name = self._pick_color(active_fixture_id)
+        color_values = COLORS[color_name]
         black_values = COLORS['black']
-        # Map short keys to actual fixture channel names
-        channel_map = {'r': 'red', 'g': 'green', 'b': 'blue', 'w': 'white'}
-        fixture_last_colors = {}  # Track last color per fixture to avoid repeating
-        
-        while self.running:
-            fixtures = self.fixture_manager.list_fixtures()
-            
-            # Chase through each fixture
-            for active_idx, active_fixture_id in enumerate(fixtures):
-                if not self.running:
-                    break
-                
-                # Pick random color for this fixture (avoid repeating)
-                last_color = fixture_last_colors.get(active_fixture_id)
-                available_colors = [c for c in color_names if c != last_color]
-                if not available_colors:
-                    available_colors = color_names
-                color_name = random.choice(available_colors)
-                fixture_last_colors[active_fixture_id] = color_name
-                color_values = COLORS[color_name]
-                
-                # Set active fixture to color, all others to black
-                fixture_colors = {}
-                for fixture_id in fixtures:
-                    if fixture_id == active_fixture_id:
-                        fixture_colors[fixture_id] = color_values
-                    else:
-                        fixture_colors[fixture_id] = black_values
-                
-                # Track active color
-                self.current_colors = [color_name]
-                
-                # Apply all fixtures simultaneously with fade
-                fade_time_used = self._apply_colors_with_fade(fixture_colors, channel_map)
-                
-                # Wait for remaining time in beat (beat_interval - fade_time)
-                remaining_time = max(0.0, self.get_interval() - fade_time_used)
-                if self.stop_event.wait(remaining_time):
-                    break
+        # Set active fixture to color, all others to black
+        fixture_colors = {fixture_id: black_values for fixture_id in fixtures}
+        fixture_colors[active_fixture_id] = color_values
+        # Track active color
+        self.current_colors = [color_name]
+        return fixture_colors
                 
     def is_running(self) -> bool:
         """Check if an effect is currently running."""
@@ -437,6 +360,7 @@ class ColorFXEngine:
             'running': self.running,
             'current_fx': self.current_fx,
             'current_colors': self.current_colors,
+            'group': self.group,
             'bpm': self.bpm,
             'fade_percentage': self.fade_percentage
         }
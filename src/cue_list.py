@@ -0,0 +1,368 @@
+"""
+Cue List Player for LightGroove
+Plays ordered cue lists (GO/BACK/GOTO) with wait, follow and per-cue fade times, tracking values between cues
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from cue_store import Cue, CuePatch, dmx_bytes, np
+from layer_merge import CUE_LAYER
+
+
+class CueStep(NamedTuple):
+    """One entry of a cue list"""
+    cue: str  # Name of a cue in the CueStore
+    fade_in: float = 0.0  # Seconds for intensities that go up and for all attribute changes
+    fade_out: Optional[float] = None  # Seconds for intensities that go down (default: fade_in)
+    wait: float = 0.0  # Delay between GO and the start of the fades
+    follow: Optional[float] = None  # Seconds after GO to trigger the next step automatically (None: manual)
+
+
+class FadeBatch(NamedTuple):
+    """Channels of one universe moving together towards a step's values"""
+    patch: CuePatch  # Target addresses, levels and bytes
+    start_levels: object  # Levels at GO, same order as the patch addresses
+    start_time: float
+    duration: float
+
+
+def subset_patch(patch: CuePatch, indices) -> CuePatch:
+    """Restrict a patch to the entries at the given positions"""
+    if np is not None and isinstance(patch.addresses, np.ndarray):
+        values = np.frombuffer(patch.values, dtype=np.uint8)[indices].tobytes()
+        return patch._replace(addresses=patch.addresses[indices], levels=patch.levels[indices], values=values,
+                              states=tuple(patch.states[i] for i in indices))
+    return patch._replace(addresses=tuple(patch.addresses[i] for i in indices),
+                          levels=tuple(patch.levels[i] for i in indices),
+                          values=bytes(patch.values[i] for i in indices),
+                          states=tuple(patch.states[i] for i in indices))
+
+
+class CueListPlayer:
+    """
+    Plays cue lists saved to config/cue_lists.json.
+
+    A list is an ordered set of CueSteps referring to cues of the CueStore. Values
+    track: the look of a step is every cue up to and including it, merged in order
+    (channels used by the list but not set yet are 0), compiled to patches once per
+    list and cue store version. On GO only channels whose
+    DMX value differs from what the cue layer holds are faded (intensities with fade_in when
+    they rise and fade_out when they fall, attributes with fade_in). They are kept as
+    FadeBatches and each frame only the batches still in motion are interpolated, so
+    the per-frame cost depends on the channels moving, not on the size of the rig or
+    the list. A later GO takes over the channels it touches from older batches.
+    """
+
+    def __init__(self, cue_store, list_file: str = None):
+        """
+        Args:
+            cue_store: CueStore with the cues the lists refer to
+            list_file: Path to the cue list file (default: config/cue_lists.json)
+        """
+        self.cue_store = cue_store
+        self.fixture_manager = cue_store.fixture_manager
+        if list_file is None:
+            list_file = os.path.join(os.path.dirname(__file__), '..', 'config', 'cue_lists.json')
+        self.list_file = Path(list_file)
+        self.lists: Dict[str, Tuple[CueStep, ...]] = {}
+        self.version = 0  # Bumped when lists are saved or deleted
+        self.active_list: Optional[str] = None
+        self.step = -1  # Index of the last step played in the active list
+        self._lock = threading.RLock()
+        self._batches: List[FadeBatch] = []
+        self._follow_at: Optional[float] = None
+        self._compiled: Dict[str, Tuple[Tuple[int, int], Tuple[Cue, ...]]] = {}  # name -> (versions, looks)
+
+        self._load()
+
+        # Fades and follow times are evaluated by the DMX frame clock
+        self.fixture_manager.dmx.add_renderer(self._render)
+
+    @staticmethod
+    def parse_steps(steps: List[Union[str, Dict]]) -> Tuple[CueStep, ...]:
+        """Build steps from JSON entries (a cue name or a dict with 'cue' and optional times)"""
+        parsed = []
+        for entry in steps:
+            if isinstance(entry, str):
+                entry = {'cue': entry}
+            fade_out = entry.get('fade_out')
+            follow = entry.get('follow')
+            parsed.append(CueStep(
+                cue=str(entry['cue']),
+                fade_in=max(0.0, float(entry.get('fade_in', 0.0))),
+                fade_out=None if fade_out is None else max(0.0, float(fade_out)),
+                wait=max(0.0, float(entry.get('wait', 0.0))),
+                follow=None if follow is None else max(0.0, float(follow)),
+            ))
+        return tuple(parsed)
+
+    def save_list(self, name: str, steps: List[Union[str, Dict]]) -> Tuple[CueStep, ...]:
+        """
+        Store a cue list and write the list file
+
+        Args:
+            name: List name (replaces an existing list with the same name)
+            steps: Cue names or {"cue", "fade_in", "fade_out", "wait", "follow"} dicts, in playback order
+        """
+        parsed = self.parse_steps(steps)
+        with self._lock:
+            self.lists[name] = parsed
+            self._compiled.pop(name, None)
+            self.version += 1
+        self._save()
+        missing = sorted({step.cue for step in parsed if self.cue_store.get_cue(step.cue) is None})
+        if missing:
+            print(f"Cue List: '{name}' refers to unknown cues: {', '.join(missing)}")
+        print(f"Cue List: Saved '{name}' ({len(parsed)} steps)")
+        return parsed
+
+    def delete_list(self, name: str) -> bool:
+        """Remove a cue list; returns False if it does not exist"""
+        with self._lock:
+            if self.lists.pop(name, None) is None:
+                return False
+            self._compiled.pop(name, None)
+            self.version += 1
+            if self.active_list == name:
+                self.release()
+        self._save()
+        print(f"Cue List: Deleted '{name}'")
+        return True
+
+    def _looks(self, name: str) -> Tuple[Cue, ...]:
+        """Tracked look of every step of a list, compiled on first use after a change"""
+        versions = (self.version, self.cue_store.version)
+        compiled = self._compiled.get(name)
+        if compiled is not None and compiled[0] == versions:
+            return compiled[1]
+        cues = [self.cue_store.get_cue(step.cue) for step in self.lists[name]]
+        # Every channel the list uses is part of every look, at 0 until a cue sets it,
+        # so BACK and GOTO also return channels that only later cues brought up
+        tracked: Dict[str, Dict[str, float]] = {}
+        for cue in cues:
+            for fixture_id, channels in (cue.values.items() if cue else ()):
+                tracked.setdefault(fixture_id, {}).update(dict.fromkeys(channels, 0.0))
+        looks = []
+        for index, cue in enumerate(cues):
+            for fixture_id, channels in (cue.values.items() if cue else ()):
+                tracked[fixture_id].update(channels)
+            looks.append(self.cue_store.compile(f"{name}/{index + 1}", tracked))
+        looks = tuple(looks)
+        self._compiled[name] = (versions, looks)
+        return looks
+
+    def go(self, name: Optional[str] = None, now: Optional[float] = None) -> bool:
+        """
+        Play the next step of a list (default: the active list, or the first list if none is active).
+        Switching to another list starts it at its first step.
+
+        Returns:
+            False if the list does not exist or is already at its last step
+        """
+        with self._lock:
+            if name is None:
+                name = self.active_list or next(iter(self.lists), None)
+            if name == self.active_list:
+                index = self.step + 1
+            else:
+                index = 0
+            if name not in self.lists or index >= len(self.lists[name]):
+                return False
+            return self.goto(name, index, now)
+
+    def back(self, now: Optional[float] = None) -> bool:
+        """Play the previous step of the active list; returns False at the first step"""
+        with self._lock:
+            if self.active_list is None or self.step <= 0:
+                return False
+            return self.goto(self.active_list, self.step - 1, now)
+
+    def goto(self, name: str, step: Union[int, str], now: Optional[float] = None) -> bool:
+        """
+        Fade to a step of a list using that step's times
+
+        Args:
+            name: List name
+            step: Step index (0-based) or cue name
+            now: time.monotonic() timestamp of the GO (default: now)
+
+        Returns:
+            False if the list or step does not exist
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            steps = self.lists.get(name)
+            if steps is None:
+                return False
+            if isinstance(step, str):
+                index = next((i for i, s in enumerate(steps) if s.cue == step), None)
+                if index is None:
+                    return False
+            else:
+                index = step
+            if not 0 <= index < len(steps):
+                return False
+
+            cue_step = steps[index]
+            look = self._looks(name)[index]
+            fade_out = cue_step.fade_in if cue_step.fade_out is None else cue_step.fade_out
+            start_time = now + cue_step.wait
+            batches, instant = [], []
+            for patch in look.patches:
+                # Compared with the cue layer itself: other layers may show the same value
+                # now and change it later. Channels the layer does not drive yet are taken
+                # over even at the same value, so the cue holds them from now on.
+                current, driven = self.cue_store.current_levels(patch)
+                if np is not None:
+                    current_bytes = np.frombuffer(dmx_bytes(current), dtype=np.uint8)
+                    target_bytes = np.frombuffer(patch.values, dtype=np.uint8)
+                    changed = (current_bytes != target_bytes) | ~driven
+                    up = np.flatnonzero(changed & (target_bytes >= current_bytes))
+                    down = np.flatnonzero(changed & (target_bytes < current_bytes))
+                else:
+                    current_bytes = dmx_bytes(current)
+                    up = [i for i, (a, b) in enumerate(zip(current_bytes, patch.values)) if b > a or (b == a and not driven[i])]
+                    down = [i for i, (a, b) in enumerate(zip(current_bytes, patch.values)) if b < a]
+                # Fade out times apply to intensity only; attributes move with the fade in time
+                for indices, duration in ((up, cue_step.fade_in), (down, fade_out if patch.dimmer else cue_step.fade_in)):
+                    if not len(indices):
+                        continue
+                    moving = subset_patch(patch, indices)
+                    if duration <= 0 and cue_step.wait <= 0:
+                        instant.append(moving)
+                    else:
+                        start = current[indices] if np is not None else [current[i] for i in indices]
+                        batches.append(FadeBatch(moving, start, start_time, duration))
+
+            # Channels of this step stop following older fades (including ones already at the target)
+            self._release_channels(look.patches)
+            self._batches.extend(batches)
+            self.active_list, self.step = name, index
+            self._follow_at = None if cue_step.follow is None else now + cue_step.follow
+
+        # Single cues and colour crossfades would fight over the same channels
+        self.cue_store.stop_fade()
+        self.fixture_manager.cancel_fades(look.fixtures)
+        if instant:
+            self.cue_store.apply_patches(instant, [p.values for p in instant])
+        moving = sum(len(batch.patch.values) for batch in batches) + sum(len(p.values) for p in instant)
+        print(f"Cue List: '{name}' step {index + 1}/{len(steps)} ({cue_step.cue}), {moving} channels changing")
+        return True
+
+    def _release_channels(self, patches: Tuple[CuePatch, ...]):
+        """Drop the given addresses from the running batches (called with the lock held)"""
+        taken: Dict[int, set] = {}
+        for patch in patches:
+            taken.setdefault(patch.universe, set()).update(int(a) for a in patch.addresses)
+        kept = []
+        for batch in self._batches:
+            addresses = taken.get(batch.patch.universe)
+            if not addresses:
+                kept.append(batch)
+                continue
+            indices = [i for i, a in enumerate(batch.patch.addresses) if int(a) not in addresses]
+            if len(indices) == len(batch.patch.values):
+                kept.append(batch)
+            elif indices:
+                start = batch.start_levels
+                start = start[indices] if np is not None else [start[i] for i in indices]
+                kept.append(batch._replace(patch=subset_patch(batch.patch, indices), start_levels=start))
+        self._batches = kept
+
+    def release(self):
+        """Stop all fades, forget the list position and release the cue layer (manual and FX output show again)"""
+        with self._lock:
+            self._batches = []
+            self._follow_at = None
+            self.active_list, self.step = None, -1
+        self.cue_store.stop_fade()
+        self.fixture_manager.dmx.clear_layer(CUE_LAYER)
+
+    def get_status(self) -> Dict:
+        """Active list, position and channels in motion"""
+        with self._lock:
+            steps = self.lists.get(self.active_list, ())
+            return {
+                'list': self.active_list,
+                'step': self.step + 1 if self.active_list else 0,  # 1-based, 0 = not started
+                'steps': len(steps),
+                'cue': steps[self.step].cue if 0 <= self.step < len(steps) else None,
+                'fading_channels': sum(len(batch.patch.values) for batch in self._batches),
+                'follow_pending': self._follow_at is not None,
+            }
+
+    def list_lists(self) -> Dict[str, List[Dict]]:
+        """Cue list definitions for the API"""
+        return {name: [step._asdict() for step in steps] for name, steps in list(self.lists.items())}
+
+    def _render(self, now: float):
+        """Advance running fades and follow times for the current frame (called by the DMX output clock)"""
+        if self._follow_at is not None and now >= self._follow_at:
+            with self._lock:
+                if self._follow_at is not None and now >= self._follow_at:
+                    self._follow_at = None
+                    self.go(now=now)
+        batches = self._batches
+        if not batches:
+            return
+
+        patches, values, finished = [], [], []
+        for batch in batches:
+            if now < batch.start_time:
+                continue  # Still in its wait time
+            progress = 1.0 if batch.duration <= 0 else (now - batch.start_time) / batch.duration
+            patch = batch.patch
+            patches.append(patch)
+            if progress >= 1.0:
+                values.append(patch.values)
+                finished.append(batch)
+            else:
+                start = batch.start_levels
+                if np is not None:
+                    patch_levels = start + (patch.levels - start) * progress
+                else:
+                    patch_levels = [a + (b - a) * progress for a, b in zip(start, patch.levels)]
+                values.append(dmx_bytes(patch_levels))
+
+        with self._lock:
+            if self._batches is not batches:
+                return  # A GO or release changed the fades meanwhile; the next frame uses them
+            if finished:
+                finished = {id(batch) for batch in finished}
+                self._batches = [batch for batch in batches if id(batch) not in finished]
+        if patches:
+            self.cue_store.apply_patches(patches, values)
+
+    def _load(self):
+        """Load the cue list file"""
+        if not self.list_file.exists():
+            return
+        try:
+            with open(self.list_file, 'r') as f:
+                data = json.load(f)
+            for name, steps in data.get('lists', {}).items():
+                self.lists[name] = self.parse_steps(steps)
+        except Exception as e:
+            print(f"Cue List: Error loading {self.list_file}: {e}")
+            return
+        self.version += 1
+        print(f"Cue List: Loaded {len(self.lists)} cue lists")
+
+    def _save(self):
+        """Write all cue lists to the list file (temp file + rename)"""
+        with self._lock:
+            data = {'lists': self.list_lists()}
+        try:
+            self.list_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.list_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                json.dump(data, f, indent=2)
+            temp_file.replace(self.list_file)
+        except Exception as e:
+            print(f"Cue List: Error saving {self.list_file}: {e}")
@@ -0,0 +1,325 @@
+"""
+Cue Store for LightGroove
+Persistent scenes compiled to sparse per-universe DMX patches for instant recall and timed crossfades
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, used for vectorized crossfades
+    np = None
+
+from layer_merge import CUE_LAYER
+
+
+class CuePatch(NamedTuple):
+    """Sparse write of one cue to one universe, compiled when the cue is saved"""
+    universe: int
+    dimmer: bool  # Intensity addresses (HTP merge, grandmaster)
+    addresses: object  # DMX channels (1-512), ascending; numpy int array when numpy is available
+    levels: object  # Target values 0.0-1.0, same order as addresses (numpy float array when available)
+    values: bytes  # Target DMX values
+    states: Tuple[Tuple[Dict, str], ...]  # (fixture state dict, channel name) per address, start of attribute fades
+
+
+class Cue(NamedTuple):
+    """A stored scene"""
+    name: str
+    values: Dict[str, Dict[str, float]]  # fixture_id -> channel -> value 0.0-1.0 (as saved)
+    fade: float  # Default crossfade time in seconds
+    patches: Tuple[CuePatch, ...]
+    fixtures: Tuple[str, ...]
+
+
+class CueFade(NamedTuple):
+    """A running crossfade into a cue"""
+    cue: Cue
+    start_levels: Tuple[object, ...]  # Per patch, levels at fade start (numpy arrays when available)
+    start_time: float
+    duration: float
+
+
+def dmx_bytes(levels) -> bytes:
+    """Convert levels 0.0-1.0 to DMX bytes the same way set_fixture_channel does (int(v * 255), clamped)"""
+    if np is not None and isinstance(levels, np.ndarray):
+        return np.clip(levels * 255, 0, 255).astype(np.uint8).tobytes()
+    return bytes(max(0, min(255, int(v * 255))) for v in levels)
+
+
+class CueStore:
+    """
+    Named scenes saved to config/cues.json.
+
+    A cue stores fixture channel values. When it is saved (or loaded from disk) it is
+    compiled to CuePatches: per universe, the sorted DMX addresses and the bytes to
+    write there, split into dimmer and non-dimmer addresses. Recalling a cue is one
+    scatter per patch into the cue output layer in one frame transaction, independent
+    of how the cue was built; the grandmaster is applied when the layers are merged.
+    Crossfades start from what the cue layer holds and interpolate the patches on the
+    DMX frame clock.
+    """
+
+    def __init__(self, fixture_manager, cue_file: str = None):
+        """
+        Args:
+            fixture_manager: FixtureManager the cues are recorded from and played to
+            cue_file: Path to the cue file (default: config/cues.json)
+        """
+        self.fixture_manager = fixture_manager
+        if cue_file is None:
+            cue_file = os.path.join(os.path.dirname(__file__), '..', 'config', 'cues.json')
+        self.cue_file = Path(cue_file)
+        self.cues: Dict[str, Cue] = {}
+        self.version = 0  # Bumped when cues are saved or deleted
+        self.current_cue: Optional[str] = None
+        self._lock = threading.Lock()
+        self._fade: Optional[CueFade] = None
+
+        self._load()
+
+        # Cues play on their own output layer, merged with the manual and FX layers
+        self.fixture_manager.dmx.add_layer(CUE_LAYER)
+
+        # Crossfades are evaluated by the DMX frame clock
+        self.fixture_manager.dmx.add_renderer(self._render)
+
+    def compile(self, name: str, values: Dict[str, Dict[str, float]], fade: float = 0.0) -> Cue:
+        """
+        Compile fixture channel values to a cue; unknown fixtures and channels are skipped
+
+        Args:
+            name: Cue name
+            values: fixture_id -> channel name -> value 0.0-1.0
+            fade: Default crossfade time in seconds
+        """
+        fixtures = self.fixture_manager.fixtures
+        by_key: Dict[Tuple[int, bool], Dict[int, Tuple[float, Dict, str]]] = {}
+        kept: Dict[str, Dict[str, float]] = {}
+        for fixture_id, channels in values.items():
+            fixture = fixtures.get(fixture_id)
+            if fixture is None:
+                print(f"Cues: Cue '{name}' references unknown fixture '{fixture_id}'")
+                continue
+            for channel_name, value in channels.items():
+                channel = fixture['channels'].get(channel_name)
+                if channel is None:
+                    continue
+                level = max(0.0, min(1.0, float(value)))
+                kept.setdefault(fixture_id, {})[channel_name] = level
+                by_key.setdefault((channel.universe, channel.type == 'dimmer'), {})[channel.address] = (
+                    level, fixture['state'], channel_name)
+
+        patches = []
+        for (universe, dimmer), by_address in sorted(by_key.items()):
+            addresses = sorted(by_address)
+            levels = [by_address[address][0] for address in addresses]
+            patches.append(CuePatch(
+                universe=universe,
+                dimmer=dimmer,
+                addresses=np.array(addresses, dtype=np.intp) if np is not None else tuple(addresses),
+                levels=np.array(levels, dtype=np.float64) if np is not None else tuple(levels),
+                values=dmx_bytes(levels),
+                states=tuple(by_address[address][1:] for address in addresses),
+            ))
+        return Cue(name, kept, max(0.0, float(fade)), tuple(patches), tuple(kept))
+
+    def save_cue(self, name: str, fixture_ids: Optional[Iterable[str]] = None,
+                 values: Optional[Dict[str, Dict[str, float]]] = None, fade: float = 0.0) -> Cue:
+        """
+        Store a cue and write the cue file
+
+        Args:
+            name: Cue name (replaces an existing cue with the same name)
+            fixture_ids: Fixtures to record from their current state (default: all), ignored if values are given
+            values: Explicit fixture_id -> channel -> value 0.0-1.0
+            fade: Default crossfade time in seconds
+        """
+        if values is None:
+            fixtures = self.fixture_manager.fixtures
+            if fixture_ids is None:
+                fixture_ids = list(fixtures)
+            values = {fid: dict(fixtures[fid]['state']) for fid in fixture_ids if fid in fixtures}
+        cue = self.compile(name, values, fade)
+        with self._lock:
+            self.cues[name] = cue
+            self.version += 1
+        self._save()
+        print(f"Cues: Saved cue '{name}' ({len(cue.fixtures)} fixtures, {sum(len(p.values) for p in cue.patches)} channels)")
+        return cue
+
+    def delete_cue(self, name: str) -> bool:
+        """Remove a cue; returns False if it does not exist"""
+        with self._lock:
+            if self.cues.pop(name, None) is None:
+                return False
+            self.version += 1
+            if self._fade is not None and self._fade.cue.name == name:
+                self._fade = None
+        self._save()
+        print(f"Cues: Deleted cue '{name}'")
+        return True
+
+    def get_cue(self, name: str) -> Optional[Cue]:
+        """Get a cue by name, or None"""
+        return self.cues.get(name)
+
+    def recall(self, name: str, fade: Optional[float] = None, start_time: Optional[float] = None) -> bool:
+        """
+        Play a cue, instantly or as a crossfade from the current cue layer levels
+
+        Args:
+            name: Cue name
+            fade: Crossfade time in seconds (default: the cue's own fade time)
+            start_time: time.monotonic() timestamp the fade starts at (default: next frame)
+
+        Returns:
+            False if the cue does not exist
+        """
+        cue = self.cues.get(name)
+        if cue is None:
+            return False
+        duration = cue.fade if fade is None else max(0.0, float(fade))
+        # Colour crossfades of these fixtures would overwrite the cue on the next frame
+        self.fixture_manager.cancel_fades(cue.fixtures)
+        with self._lock:
+            self.current_cue = name
+            if duration <= 0:
+                self._fade = None
+            else:
+                start_levels = tuple(self.current_levels(patch)[0] for patch in cue.patches)
+                self._fade = CueFade(cue, start_levels, start_time, duration)
+        if duration <= 0:
+            self.apply_patches(cue.patches, [patch.values for patch in cue.patches])
+        return True
+
+    def stop_fade(self):
+        """Stop a running crossfade at its current values"""
+        with self._lock:
+            self._fade = None
+
+    def list_cues(self) -> Dict[str, Dict]:
+        """Cue summaries for the API"""
+        return {
+            name: {
+                'fade': cue.fade,
+                'fixtures': list(cue.fixtures),
+                'channels': sum(len(patch.values) for patch in cue.patches),
+            }
+            for name, cue in list(self.cues.items())
+        }
+
+    def get_status(self) -> Dict:
+        """Current cue and crossfade progress"""
+        fade = self._fade
+        return {
+            'current_cue': self.current_cue,
+            'fading': fade is not None,
+            'fade_time': fade.duration if fade else 0.0,
+        }
+
+    def current_levels(self, patch: CuePatch):
+        """
+        Levels of a patch's channels on the cue layer, read back from the layer itself
+        (the merged output and the fixture states also hold manual and FX values)
+
+        Returns:
+            (levels, driven): levels 0.0-1.0 and whether the cue layer drives each channel.
+            Intensities the layer does not drive are 0; attributes it does not drive start
+            from the fixture state, so fading them in does not jump from 0.
+        """
+        values, driven = self.fixture_manager.dmx.read_layer(CUE_LAYER, patch.universe, patch.addresses)
+        if np is not None and isinstance(values, np.ndarray):
+            levels = values / 255.0
+            if not patch.dimmer and not driven.all():
+                for i in np.flatnonzero(~driven):
+                    state, channel_name = patch.states[i]
+                    levels[i] = state.get(channel_name, 0.0)
+            return levels, driven
+        levels = [value / 255.0 for value in values]
+        if not patch.dimmer:
+            for i, (state, channel_name) in enumerate(patch.states):
+                if not driven[i]:
+                    levels[i] = state.get(channel_name, 0.0)
+        return levels, driven
+
+    def apply_patches(self, patches: Sequence[CuePatch], values: Sequence[bytes]):
+        """
+        Write precompiled patches (one scatter each) to the cue layer in one frame. The
+        fixture states are left alone: they hold the manual (programmer) values, which
+        the cue layer is merged with.
+
+        Args:
+            patches: Patches giving the addresses
+            values: DMX bytes per patch
+        """
+        with self.fixture_manager.frame(CUE_LAYER) as frame:
+            for patch, patch_values in zip(patches, values):
+                if np is not None and isinstance(patch.addresses, np.ndarray):
+                    patch_values = np.frombuffer(patch_values, dtype=np.uint8)
+                frame.scatter(patch.universe, patch.addresses, patch_values)
+
+    def _render(self, now: float):
+        """Advance the running crossfade for the current frame (called by the DMX output clock)"""
+        fade = self._fade
+        if fade is None:
+            return
+        if fade.start_time is None:
+            # Started from the API: count the fade from the first frame
+            with self._lock:
+                if self._fade is not fade:
+                    return
+                fade = self._fade = fade._replace(start_time=now)
+
+        progress = (now - fade.start_time) / fade.duration
+        patches = fade.cue.patches
+        if progress >= 1.0:
+            values = [patch.values for patch in patches]
+        else:
+            progress = max(0.0, progress)
+            levels = []
+            for patch, start in zip(patches, fade.start_levels):
+                if np is not None:
+                    levels.append(start + (patch.levels - start) * progress)
+                else:
+                    levels.append([a + (b - a) * progress for a, b in zip(start, patch.levels)])
+            values = [dmx_bytes(patch_levels) for patch_levels in levels]
+
+        with self._lock:
+            if self._fade is not fade:
+                return  # Replaced or stopped meanwhile
+            if progress >= 1.0:
+                self._fade = None
+        self.apply_patches(patches, values)
+
+    def _load(self):
+        """Load and compile the cue file"""
+        if not self.cue_file.exists():
+            return
+        try:
+            with open(self.cue_file, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Cues: Error loading {self.cue_file}: {e}")
+            return
+        for name, entry in data.get('cues', {}).items():
+            self.cues[name] = self.compile(name, entry.get('values', {}), entry.get('fade', 0.0))
+        self.version += 1
+        print(f"Cues: Loaded {len(self.cues)} cues")
+
+    def _save(self):
+        """Write all cues to the cue file (temp file + rename)"""
+        with self._lock:
+            data = {'cues': {name: {'fade': cue.fade, 'values': cue.values} for name, cue in self.cues.items()}}
+        try:
+            self.cue_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.cue_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                json.dump(data, f, indent=2)
+            temp_file.replace(self.cue_file)
+        except Exception as e:
+            print(f"Cues: Error saving {self.cue_file}: {e}")
@@ -3,53 +3,362 @@ DMX Controller with Multi-Universe and ArtNet Support
 Manages DMX output via serial, ArtNet or virtual interfaces
 Author: https://github.com/oliverbyte
 """
+import itertools
 import json
 import threading
 import time
-from typing import Optional, Dict, List, Tuple
+from collections import deque
+from typing import Callable, Optional, Dict, List, NamedTuple, Tuple
+
+from artnet_sender import ArtNetSender, ArtNetPort, ARTNET_PORT
+from sacn_sender import E131Sender, DEFAULT_PRIORITY
+from serial_output import SerialOutput
+from output_worker import OutputWorker
+from layer_merge import LayerStack, MANUAL_LAYER, PRIORITY_SHIFT
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, used for vectorized scatter writes
+    np = None
 
 
 class DMXUniverse:
-    """Represents a single DMX universe with 512 channels"""
+    """
+    Represents a single DMX universe with 512 channels
+    
+    Setters write to one of the output layers (see LayerStack); merge() combines the
+    layers into the back buffer, once per frame from the output loop. Reads merge
+    first if the layers changed since, so without a running loop writes stay cheap
+    and the merge happens once when the output is looked at.
+    """
     
-    def __init__(self, universe_id: int, output_mode: str = 'virtual'):
+    def __init__(self, universe_id: int, output_mode: str = 'virtual', layer_count: int = 1,
+                 grandmaster: float = 1.0):
         self.universe_id = universe_id
-        self.output_mode = output_mode  # 'serial', 'artnet', 'virtual'
-        self.dmx_data = [0] * 512
+        self.output_mode = output_mode  # 'serial', 'artnet', 'e131', 'virtual'
+        self.dmx_data = bytearray(512)  # Back buffer, the merged output of all layers
+        self.layers = LayerStack(layer_count)
+        self.layers_dirty = False  # Layers changed since the last merge
+        self.grandmaster = grandmaster  # Applied to the intensity channels by the merge
         self.lock = threading.Lock()
-        self.artnet_sender = None
         self.serial = None
+        # Change tracking: set when the merged output changes, cleared when a frame is taken for sending
+        self.dirty = True
+        self.last_sent = 0.0
+        self.packets_sent = 0
+        self.packets_skipped = 0
+        # Ready-to-send frame (start code + 512 channels), immutable and rebuilt only when the output changes
+        self._frame = bytes(513)
         
-    def set_channel(self, channel: int, value: int):
-        """Set a single DMX channel (1-512)"""
+    def set_channel(self, channel: int, value: int, layer: int = 0, stamp: int = 1):
+        """Set a single DMX channel (1-512) on a layer (index and ownership stamp from DMXController.layer_stamp)"""
         if 1 <= channel <= 512:
-            with self.lock:
-                self.dmx_data[channel - 1] = max(0, min(255, value))
+            self.apply_writes({channel: max(0, min(255, value))}, layer, stamp)
+    
+    def set_channels(self, start_channel: int, values, layer: int = 0, stamp: int = 1):
+        """
+        Set multiple consecutive DMX channels in one bulk write
+        
+        Args:
+            start_channel: First DMX channel (1-512)
+            values: bytes/bytearray/memoryview (written as-is) or a sequence of ints (clamped to 0-255)
+            layer, stamp: Layer index and ownership stamp
+        """
+        if not isinstance(values, (bytes, bytearray, memoryview)):
+            values = bytes(max(0, min(255, int(v))) for v in values)
+        offset = start_channel - 1
+        if offset < 0:
+            values = values[-offset:]
+            offset = 0
+        end = min(512, offset + len(values))
+        if end <= offset:
+            return
+        values = values[:end - offset]
+        with self.lock:
+            self.layers.write_range(layer, stamp, offset, values)
+            self.layers_dirty = True
+    
+    def apply_writes(self, writes: Dict[int, int], layer: int = 0, stamp: int = 1):
+        """Apply staged channel -> value writes (already validated and clamped) to a layer under a single lock"""
+        with self.lock:
+            self.layers.write(layer, stamp, writes)
+            self.layers_dirty = True
+    
+    def scatter(self, addresses, values, layer: int = 0, stamp: int = 1):
+        """
+        Write values to (not necessarily consecutive) DMX channels of a layer under a single lock
+        
+        Args:
+            addresses: DMX channels (1-512), a sequence or numpy int array
+            values: DMX values (0-255), same length as addresses
+            layer, stamp: Layer index and ownership stamp
+        """
+        with self.lock:
+            self.layers.scatter(layer, stamp, addresses, values)
+            self.layers_dirty = True
+    
+    def add_layers(self, layer_count: int):
+        """Grow the layer stack to layer_count layers"""
+        with self.lock:
+            self.layers.resize(layer_count)
+    
+    def set_intensity(self, addresses):
+        """Mark DMX channels (1-512) as intensity channels (HTP merge, grandmaster)"""
+        with self.lock:
+            self.layers.set_intensity(addresses)
+            self.layers_dirty = True
+    
+    def read_layer(self, layer: int, addresses):
+        """Read back the values of a layer and whether it drives the given channels (see LayerStack.read)"""
+        with self.lock:
+            return self.layers.read(layer, addresses)
     
-    def set_channels(self, start_channel: int, values: list):
-        """Set multiple DMX channels"""
+    def clear_layer(self, layer: int, intensity_only: bool = False):
+        """Release all channels (or only the intensity channels) of a layer"""
+        with self.lock:
+            self.layers.clear(layer, intensity_only)
+            self.layers_dirty = True
+    
+    def set_grandmaster(self, level: float):
+        """Set the grandmaster level applied to the intensity channels by the next merge"""
         with self.lock:
-            for i, value in enumerate(values):
-                channel = start_channel + i
-                if 1 <= channel <= 512:
-                    self.dmx_data[channel - 1] = max(0, min(255, value))
+            self.grandmaster = level
+            self.layers_dirty = True
+    
+    def merge(self):
+        """Merge the layers into the back buffer if they changed since the last merge"""
+        with self.lock:
+            if self.layers_dirty:
+                self._merge()
+    
+    def _merge(self):
+        """Merge the layers into the back buffer (called with the lock held)"""
+        merged = self.layers.merge(self.grandmaster)
+        if self.dmx_data != merged:
+            self.dmx_data[:] = merged
+            self._frame = b'\x00' + merged
+            self.dirty = True
+        self.layers_dirty = False
     
     def get_channel(self, channel: int) -> int:
         """Get current value of a DMX channel"""
         if 1 <= channel <= 512:
             with self.lock:
+                if self.layers_dirty:
+                    self._merge()
                 return self.dmx_data[channel - 1]
         return 0
     
-    def get_data(self) -> list:
+    def get_data(self) -> bytes:
         """Get copy of all DMX data"""
         with self.lock:
-            return self.dmx_data.copy()
+            if self.layers_dirty:
+                self._merge()
+            return bytes(self.dmx_data)
+    
+    def snapshot(self) -> bytes:
+        """
+        Return the current output as a ready-to-send frame (start code at index 0,
+        channels 1-512 after it) and clear the dirty flag. The frame is immutable and
+        only rebuilt when the merged output changes, so taking it copies nothing and
+        it stays valid while a worker thread sends it.
+        """
+        with self.lock:
+            if self.layers_dirty:
+                self._merge()
+            self.dirty = False
+            return self._frame
+    
+    def needs_send(self, now: float, keepalive_interval: float) -> bool:
+        """Check if the universe changed since the last frame or is due for a keep-alive refresh"""
+        return self.dirty or now - self.last_sent >= keepalive_interval
     
     def blackout(self):
-        """Set all channels to 0"""
+        """Set all channels to 0 and release them on all layers"""
+        with self.lock:
+            for layer in range(self.layers.layer_count):
+                self.layers.clear(layer)
+            self.dmx_data[:] = bytes(512)
+            self._frame = bytes(513)
+            self.layers_dirty = False
+            self.dirty = True
+
+
+class DMXFrame:
+    """
+    Stages channel writes across universes and publishes them atomically.
+    
+    Writes are collected without locking and applied on commit() with one lock
+    acquisition per touched universe and layer, so the output thread never sends a
+    half-updated fixture. Writes go to the frame's current `layer`, which may be
+    switched between writes. Can be used as a context manager (commits on exit).
+    """
+    
+    def __init__(self, controller: 'DMXController', layer: str = MANUAL_LAYER):
+        self._controller = controller
+        self.layer = layer
+        self._writes: Dict[Tuple[str, int], Dict[int, int]] = {}  # (layer, universe) -> channel -> value
+        self._scatters: List[Tuple[str, int, object, object]] = []  # (layer, universe, addresses, values)
+    
+    def set_channel(self, universe_id: int, channel: int, value: int, channel_type: str = 'other'):
+        """Stage a single DMX channel write (same arguments as DMXController.set_channel)"""
+        if 1 <= channel <= 512:
+            self._writes.setdefault((self.layer, universe_id), {})[channel] = max(0, min(255, value))
+    
+    def set_channels(self, universe_id: int, start_channel: int, values):
+        """Stage multiple consecutive DMX channel writes"""
+        writes = self._writes.setdefault((self.layer, universe_id), {})
+        for i, value in enumerate(values):
+            channel = start_channel + i
+            if 1 <= channel <= 512:
+                writes[channel] = max(0, min(255, int(value)))
+    
+    def scatter(self, universe_id: int, addresses, values):
+        """
+        Stage a bulk write of values to precomputed channel addresses (see DMXUniverse.scatter).
+        Addresses must be valid (1-512) and values already scaled to 0-255.
+        """
+        self._scatters.append((self.layer, universe_id, addresses, values))
+    
+    def commit(self):
+        """Publish all staged writes, one lock per universe and layer, with one ownership stamp per layer"""
+        writes, self._writes = self._writes, {}
+        scatters, self._scatters = self._scatters, []
+        controller = self._controller
+        stamps: Dict[str, Tuple[int, int]] = {}
+        for (layer, universe_id), universe_writes in writes.items():
+            if universe_writes:
+                if layer not in stamps:
+                    stamps[layer] = controller.layer_stamp(layer)
+                controller.get_universe(universe_id).apply_writes(universe_writes, *stamps[layer])
+        for layer, universe_id, addresses, values in scatters:
+            if layer not in stamps:
+                stamps[layer] = controller.layer_stamp(layer)
+            controller.get_universe(universe_id).scatter(addresses, values, *stamps[layer])
+    
+    def __enter__(self) -> 'DMXFrame':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.commit()
+        return False
+
+
+class FrameClock:
+    """
+    Deadline-based frame scheduler on the monotonic perf_counter_ns clock.
+    
+    Deadlines advance by exactly one period per frame, so sleep overshoot does not
+    accumulate into drift. A frame that runs past its deadline is an overrun; whole
+    frames missed during an overrun are skipped instead of sent back-to-back.
+    Keeps a rolling window of start jitter (lateness against the deadline) and work time.
+    """
+    
+    # Upper bounds (microseconds) of the jitter histogram buckets; the last bucket is open
+    JITTER_BUCKETS_US = (100, 250, 500, 1000, 2000, 5000, 10000)
+    
+    def __init__(self, fps: float = 44, window: int = 1000):
+        self.lock = threading.Lock()
+        self.period_ns = 0
+        self.set_fps(fps)
+        self.window = window
+        self.reset()
+    
+    def set_fps(self, fps: float):
+        """Change the frame rate; takes effect from the next deadline"""
+        self.fps = max(1.0, min(100.0, float(fps)))
+        self.period_ns = int(1e9 / self.fps)
+    
+    def reset(self):
+        """Restart the schedule and clear statistics (called when the output loop starts)"""
+        with self.lock:
+            self._deadline = None
+            self._frame_start = 0
+            self._starts = deque(maxlen=self.window)
+            self._jitter = deque(maxlen=self.window)
+            self._work = deque(maxlen=self.window)
+            self.frames = 0
+            self.overruns = 0
+            self.skipped_frames = 0
+    
+    def tick(self):
+        """Wait until the next frame deadline (returns immediately on overrun)"""
+        now = time.perf_counter_ns()
+        if self._deadline is None:
+            self._deadline = now
+        else:
+            work_ns = now - self._frame_start
+            self._deadline += self.period_ns
+            if now > self._deadline:
+                self.overruns += 1
+                missed = (now - self._deadline) // self.period_ns
+                if missed:
+                    self.skipped_frames += missed
+                    self._deadline += missed * self.period_ns
+            else:
+                time.sleep((self._deadline - now) / 1e9)
+            with self.lock:
+                self._work.append(work_ns // 1000)
+        
+        start = time.perf_counter_ns()
+        self._frame_start = start
         with self.lock:
-            self.dmx_data = [0] * 512
+            self._starts.append(start)
+            self._jitter.append(max(0, start - self._deadline) // 1000)
+            self.frames += 1
+    
+    @staticmethod
+    def _summary(samples: List[int]) -> Dict:
+        if not samples:
+            return {'mean': 0, 'p50': 0, 'p95': 0, 'p99': 0, 'max': 0}
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return {
+            'mean': round(sum(ordered) / len(ordered), 1),
+            'p50': ordered[last * 50 // 100],
+            'p95': ordered[last * 95 // 100],
+            'p99': ordered[last * 99 // 100],
+            'max': ordered[last],
+        }
+    
+    def get_stats(self) -> Dict:
+        """Get frame rate, overrun counters and jitter/work statistics (microseconds) over the rolling window"""
+        with self.lock:
+            starts = list(self._starts)
+            jitter = list(self._jitter)
+            work = list(self._work)
+            frames, overruns, skipped = self.frames, self.overruns, self.skipped_frames
+        
+        actual_fps = 0.0
+        if len(starts) > 1:
+            actual_fps = round((len(starts) - 1) * 1e9 / (starts[-1] - starts[0]), 2)
+        
+        histogram = {}
+        lower = 0
+        for upper in self.JITTER_BUCKETS_US:
+            histogram[f"{lower}-{upper}us"] = sum(1 for j in jitter if lower <= j < upper)
+            lower = upper
+        histogram[f">={lower}us"] = sum(1 for j in jitter if j >= lower)
+        
+        return {
+            'target_fps': self.fps,
+            'actual_fps': actual_fps,
+            'frames': frames,
+            'overruns': overruns,
+            'skipped_frames': skipped,
+            'window': len(jitter),
+            'jitter_us': self._summary(jitter),
+            'jitter_histogram': histogram,
+            'work_us': self._summary(work),
+        }
+
+
+class OutputRoute(NamedTuple):
+    """Where the output loop sends a universe"""
+    mode: str                        # 'artnet', 'e131' or 'serial'
+    universe: DMXUniverse
+    sender: object                   # ArtNetPort, E131Universe or SerialOutput
+    worker: Optional[OutputWorker]   # None for serial (SerialOutput has its own thread)
 
 
 class DMXController:
@@ -63,13 +372,26 @@ class DMXController:
             config_file: Path to artnet.json configuration file
         """
         self.universes: Dict[int, DMXUniverse] = {}
-        self.artnet_senders: Dict[Tuple[str, int], any] = {}
+        self.artnet = None  # Shared ArtNetSender socket, created with the first ArtNet universe
+        self.artnet_senders: Dict[Tuple[str, int], ArtNetPort] = {}
+        self.e131 = None  # Shared E131Sender socket, created with the first sACN universe
+        self.output_workers: Dict[str, OutputWorker] = {}  # One sender thread per destination
+        self.routes: Dict[int, OutputRoute] = {}  # Replaced as a whole on (re)configuration, never mutated
         self.config = {}
         self.running = False
         self._thread = None
         self.fps = 44
-        self.serial = None
+        self.clock = FrameClock(self.fps)
+        self.keepalive_interval = 1.0  # Resend unchanged universes every N seconds (ArtNet recommends ~1 Hz)
+        self.serial_output: Optional[SerialOutput] = None
+        self.serial_universe: Optional[int] = None  # The one universe routed to the serial port
         self.grandmaster = 1.0  # 0.0 to 1.0 multiplier
+        self._renderers: List[Callable[[float], None]] = []  # Called once per frame before output
+        # Output layers: name -> index into every universe's LayerStack, with their priorities
+        self.layers: Dict[str, int] = {}
+        self._layer_priorities: List[int] = []
+        self._stamps = itertools.count(1)
+        self.add_layer(MANUAL_LAYER)
         
         if config_file:
             self._load_config(config_file)
@@ -78,40 +400,124 @@ class DMXController:
         """Load ArtNet configuration"""
         try:
             with open(config_file, 'r') as f:
-                self.config = json.load(f)
-            
-            self.fps = self.config.get('fps', 44)
-            
-            # Initialize universes based on mapping
-            for universe_str, mapping in self.config.get('universe_mapping', {}).items():
-                universe_id = int(universe_str)
-                output_mode = mapping.get('output_mode', 'virtual')
-                
-                universe = DMXUniverse(universe_id, output_mode)
-                
-                # Configure ArtNet output for this universe
-                if output_mode == 'artnet':
-                    node_id = mapping.get('node_id')
-                    artnet_universe = mapping.get('artnet_universe', 0)
-                    node_config = self._find_node_config(node_id)
-                    if node_config and node_config.get('enabled', True):
-                        sender = self._get_or_create_artnet_sender(node_config, artnet_universe)
-                        universe.artnet_sender = sender
-                    else:
-                        print(f"DMX Controller: ArtNet node '{node_id}' not found or disabled")
-                
-                self.universes[universe_id] = universe
-                print(f"DMX Controller: Universe {universe_id} initialized ({output_mode})")
-            
-            # Configure serial port if specified
-            serial_port = self.config.get('serial_port')
-            if serial_port:
-                self._init_serial(serial_port)
-            
+                config = json.load(f)
+            self._apply_config(config)
         except Exception as e:
             print(f"DMX Controller: Failed to load config: {e}")
             print("DMX Controller: Running in virtual mode")
-
+    
+    def _apply_config(self, config: dict):
+        """
+        Bring outputs in line with a configuration, keeping every universe, sender and
+        worker that did not change. The new routing table is built on the side and
+        published with a single assignment, so the output loop switches between two
+        frames without pausing.
+        """
+        old_config = self.config
+        self.config = config
+        
+        # The clock clamps the rate; report the one it actually runs at
+        self.clock.set_fps(config.get('fps', 44))
+        self.fps = self.clock.fps
+        self.keepalive_interval = float(config.get('keepalive_interval', 1.0))
+        
+        # Shared sACN socket: replaced only when its own settings changed. The old one is
+        # closed once the new routes are live and its worker has finished sending on it.
+        old_e131 = None
+        if self.e131 and config.get('e131', {}) != old_config.get('e131', {}):
+            old_e131, self.e131 = self.e131, None
+        
+        # Serial port: reopened only when port or mode changed
+        serial_port = config.get('serial_port')
+        serial_mode = config.get('serial_mode', 'open_dmx')
+        if self.serial_output and (self.serial_output.port, self.serial_output.mode) != (serial_port, serial_mode):
+            self.serial_output.stop()
+            self.serial_output = None
+        if serial_port and not self.serial_output:
+            self._init_serial(serial_port, serial_mode)
+        
+        # Build the new routing table, reusing existing universes (and their buffers)
+        old_routes = self.routes
+        self.serial_universe = None
+        routes: Dict[int, OutputRoute] = {}
+        self.artnet_senders = {}
+        mapped = set()
+        for universe_str, mapping in config.get('universe_mapping', {}).items():
+            universe_id = int(universe_str)
+            mapped.add(universe_id)
+            is_new = universe_id not in self.universes
+            if is_new:
+                self.universes[universe_id] = DMXUniverse(universe_id, layer_count=len(self.layers),
+                                                          grandmaster=self.grandmaster)
+            universe = self.universes[universe_id]
+            universe.output_mode = mapping.get('output_mode', 'virtual')
+            route = self._build_route(universe, mapping)
+            if route:
+                routes[universe_id] = route
+            # Routes compare by sender/worker identity, so this only reports real changes
+            if is_new or route != old_routes.get(universe_id):
+                universe.dirty = True  # Send the current frame to the new destination right away
+                print(f"DMX Controller: Universe {universe_id} initialized ({universe.output_mode})")
+        for universe_id in old_routes.keys() - mapped:
+            self.universes[universe_id].output_mode = 'virtual'
+            print(f"DMX Controller: Universe {universe_id} unmapped (virtual)")
+        
+        # Atomic swap: the output loop reads self.routes once per frame
+        self.routes = routes
+        
+        # Retire workers and packet templates the new table no longer uses
+        used_senders = {id(route.sender) for route in routes.values()}
+        used_workers = {route.worker for route in routes.values() if route.worker}
+        for name, worker in list(self.output_workers.items()):
+            if worker not in used_workers:
+                worker.stop()
+                del self.output_workers[name]
+        if self.artnet:
+            self.artnet.ports = {key: port for key, port in self.artnet.ports.items() if id(port) in used_senders}
+        if self.e131:
+            self.e131.universes = {key: u for key, u in self.e131.universes.items() if id(u) in used_senders}
+        if old_e131:
+            worker = self.output_workers.get('sacn')
+            if worker and not worker.retire(old_e131.universes.values()):
+                print("DMX Controller: sACN worker still sending on the replaced socket, closing it anyway")
+            old_e131.close()
+    
+    def _build_route(self, universe: DMXUniverse, mapping: dict) -> Optional[OutputRoute]:
+        """Create (or reuse) the sender and worker for one universe_mapping entry"""
+        output_mode = universe.output_mode
+        
+        # Configure ArtNet output for this universe
+        if output_mode == 'artnet':
+            node_id = mapping.get('node_id')
+            artnet_universe = mapping.get('artnet_universe', 0)
+            node_config = self._find_node_config(node_id)
+            if not node_config or not node_config.get('enabled', True):
+                print(f"DMX Controller: ArtNet node '{node_id}' not found or disabled")
+                return None
+            sender = self._get_or_create_artnet_sender(node_config, artnet_universe)
+            if sender:
+                return OutputRoute('artnet', universe, sender, self._get_or_create_worker(f"artnet:{node_id}"))
+        
+        # Configure sACN output for this universe
+        elif output_mode == 'e131':
+            sender = self._create_e131_sender(universe.universe_id, mapping)
+            if sender:
+                # One worker for all sACN universes so the sync packet follows all of a frame's data
+                return OutputRoute('e131', universe, sender, self._get_or_create_worker("sacn", self.e131.send_sync))
+        
+        elif output_mode == 'serial' and self.serial_output:
+            # One port carries one DMX universe: a second one would overwrite the first
+            # in the writer's single-frame mailbox every frame
+            if self.serial_universe is not None:
+                print(f"DMX Controller: Universe {universe.universe_id} not sent to serial, "
+                      f"the port already carries universe {self.serial_universe} (virtual)")
+                universe.output_mode = 'virtual'
+                return None
+            self.serial_universe = universe.universe_id
+            return OutputRoute('serial', universe, self.serial_output, None)
+        
+        return None
+    
     def _find_node_config(self, node_id: str) -> Optional[dict]:
         for node in self.config.get('nodes', []):
             if node.get('id') == node_id:
@@ -120,48 +526,177 @@ class DMXController:
 
     def _get_or_create_artnet_sender(self, node_config: dict, artnet_universe: int):
         key = (node_config['id'], artnet_universe)
-        if key in self.artnet_senders:
-            return self.artnet_senders[key]
         try:
-            from stupidArtnet import StupidArtnet
+            if self.artnet is None:
+                self.artnet = ArtNetSender()
 
             ip = node_config.get('ip', '255.255.255.255')
             broadcast = bool(node_config.get('broadcast', False))
             target_ip = '255.255.255.255' if broadcast else ip
-            sender = StupidArtnet(target_ip, artnet_universe, packet_size=512, fps=self.fps, broadcast=broadcast)
-            sender.start()
+            port = int(node_config.get('port', ARTNET_PORT))
+            # Ports are keyed by destination, so an unchanged node keeps its packet and sequence
+            is_new = (target_ip, port, artnet_universe) not in self.artnet.ports
+            sender = self.artnet.add_port(target_ip, artnet_universe, port)
             self.artnet_senders[key] = sender
-            mode = "broadcast" if broadcast else "unicast"
-            # Note: StupidArtnet always uses port 6454 (standard ArtNet port) - custom ports not supported
-            print(f"DMX Controller: ArtNet sender for node '{node_config['id']}' universe {artnet_universe} connected to {target_ip}:6454 ({mode})")
+            if is_new:
+                mode = "broadcast" if broadcast else "unicast"
+                print(f"DMX Controller: ArtNet sender for node '{node_config['id']}' universe {artnet_universe} connected to {target_ip}:{port} ({mode})")
             return sender
-        except ImportError:
-            print("DMX Controller: stupidArtnet not installed. Install with: pip install stupidArtnet")
         except Exception as e:
             print(f"DMX Controller: Failed to initialize ArtNet sender for node '{node_config['id']}' universe {artnet_universe}: {e}")
         return None
     
-    def _init_serial(self, port: str):
-        """Initialize serial connection for DMX output"""
+    def _get_or_create_worker(self, name: str, after_batch: Optional[Callable[[], None]] = None) -> OutputWorker:
+        """Get the output worker for a destination, starting it with the output if already running"""
+        if name not in self.output_workers:
+            worker = OutputWorker(name, after_batch)
+            if self.running:
+                worker.start()
+            self.output_workers[name] = worker
+        worker = self.output_workers[name]
+        worker.after_batch = after_batch
+        return worker
+    
+    def _create_e131_sender(self, universe_id: int, mapping: dict):
+        """
+        Create the sACN output for a universe
+        
+        Args:
+            universe_id: DMX universe ID, used as sACN universe unless 'e131_universe' is set
+            mapping: universe_mapping entry ('e131_universe', 'priority', optional 'unicast_ip')
+        """
+        e131_config = self.config.get('e131', {})
+        try:
+            if self.e131 is None:
+                self.e131 = E131Sender(
+                    source_name=e131_config.get('source_name', 'LightGroove'),
+                    cid=e131_config.get('cid'),
+                    sync_address=int(e131_config.get('sync_universe', 0)),
+                    multicast_ttl=int(e131_config.get('multicast_ttl', 1))
+                )
+            e131_universe = int(mapping.get('e131_universe', universe_id))
+            priority = int(mapping.get('priority', e131_config.get('priority', DEFAULT_PRIORITY)))
+            count = len(self.e131.universes)
+            sender = self.e131.add_universe(e131_universe, priority, mapping.get('unicast_ip'))
+            if len(self.e131.universes) > count:
+                target = f"{sender.address[0]}:{sender.address[1]}"
+                print(f"DMX Controller: sACN sender for universe {e131_universe} connected to {target} (priority {priority})")
+            return sender
+        except Exception as e:
+            print(f"DMX Controller: Failed to initialize sACN sender for universe {universe_id}: {e}")
+        return None
+    
+    def _init_serial(self, port: str, mode: str = 'open_dmx'):
+        """
+        Open the serial port and start its writer thread
+        
+        Args:
+            port: Serial device (e.g. /dev/ttyUSB0, COM3)
+            mode: 'open_dmx' (raw 250k baud with break) or 'enttec_pro' (Enttec DMX USB Pro framing)
+        """
         try:
-            import serial
-            self.serial = serial.Serial(
-                port=port,
-                baudrate=250000,
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_NONE,
-                stopbits=serial.TWOSTOPBITS
-            )
-            print(f"DMX Controller: Serial port connected to {port}")
+            serial_output = SerialOutput(port, mode)
+            serial_output.open()
+            serial_output.start()
+            self.serial_output = serial_output
+            print(f"DMX Controller: Serial port connected to {port} ({mode})")
         except Exception as e:
             print(f"DMX Controller: Failed to connect to serial port {port}: {e}")
     
     def add_universe(self, universe_id: int, output_mode: str = 'virtual'):
         """Add a new universe dynamically"""
         if universe_id not in self.universes:
-            self.universes[universe_id] = DMXUniverse(universe_id, output_mode)
+            self.universes[universe_id] = DMXUniverse(universe_id, output_mode, len(self.layers), self.grandmaster)
             print(f"DMX Controller: Universe {universe_id} added ({output_mode})")
     
+    def get_universe(self, universe_id: int) -> DMXUniverse:
+        """Get a universe, adding it (virtual) if it does not exist yet"""
+        if universe_id not in self.universes:
+            self.add_universe(universe_id)
+        return self.universes[universe_id]
+    
+    def begin_frame(self, layer: str = MANUAL_LAYER) -> DMXFrame:
+        """Start a frame transaction writing to a layer; staged writes are published on commit()"""
+        return DMXFrame(self, layer)
+    
+    def add_layer(self, name: str, priority: int = 0) -> int:
+        """
+        Register an output layer (no-op if it exists)
+        
+        Args:
+            name: Layer name, used by begin_frame() and FixtureManager.frame()
+            priority: Layers with a higher priority win LTP channels regardless of write order
+        
+        Returns:
+            Index of the layer
+        """
+        if name not in self.layers:
+            self.layers[name] = len(self._layer_priorities)
+            self._layer_priorities.append(priority)
+            for universe in list(self.universes.values()):
+                universe.add_layers(len(self.layers))
+        return self.layers[name]
+    
+    def layer_stamp(self, name: str) -> Tuple[int, int]:
+        """Get the index of a layer and a new ownership stamp for a write to it"""
+        index = self.layers[name]
+        return index, (self._layer_priorities[index] << PRIORITY_SHIFT) | next(self._stamps)
+    
+    def clear_layer(self, name: str, intensity_only: bool = False):
+        """
+        Release the channels a layer drives, so the other layers decide them again
+        
+        Args:
+            name: Layer name
+            intensity_only: Only release intensity channels (e.g. for a blackout)
+        """
+        index = self.layers[name]
+        for universe in list(self.universes.values()):
+            universe.clear_layer(index, intensity_only)
+    
+    def read_layer(self, name: str, universe_id: int, addresses):
+        """
+        Read back what a layer holds at some channels of a universe, independent of the merged output
+        
+        Args:
+            name: Layer name
+            universe_id: Universe ID (1-based)
+            addresses: DMX channels (1-512), a numpy int array or a sequence
+        
+        Returns:
+            (values, driven): DMX values and whether the layer drives each channel
+        """
+        return self.get_universe(universe_id).read_layer(self.layers[name], addresses)
+    
+    def set_intensity_channels(self, universe_id: int, addresses):
+        """Mark DMX channels (1-512) of a universe as intensity (HTP merge, grandmaster scaling)"""
+        self.get_universe(universe_id).set_intensity(addresses)
+    
+    def merge(self):
+        """Merge the layers of every changed universe into its output buffer (once per frame)"""
+        for universe in list(self.universes.values()):
+            universe.merge()
+    
+    def add_renderer(self, renderer: Callable[[float], None]):
+        """
+        Register a per-frame render callback.
+        Renderers are called from the output thread once per frame, just before the
+        universes are sent, with the frame timestamp (time.monotonic() seconds).
+        """
+        self._renderers = self._renderers + [renderer]
+    
+    def remove_renderer(self, renderer: Callable[[float], None]):
+        """Unregister a per-frame render callback"""
+        self._renderers = [r for r in self._renderers if r != renderer]
+    
+    def _render(self, now: float):
+        """Run all registered renderers for the current frame"""
+        for renderer in self._renderers:
+            try:
+                renderer(now)
+            except Exception as e:
+                print(f"DMX Controller: Render error in {getattr(renderer, '__qualname__', renderer)}: {e}")
+    
     def set_grandmaster(self, level: float):
         """
         Set grandmaster level (scales all DMX output)
@@ -170,6 +705,8 @@ class DMXController:
             level: Grandmaster level 0.0-1.0
         """
         self.grandmaster = max(0.0, min(1.0, level))
+        for universe in list(self.universes.values()):
+            universe.set_grandmaster(self.grandmaster)
         print(f"DMX Controller: Grandmaster set to {int(self.grandmaster * 100)}%")
     
     def set_channel(self, universe_id: int, channel: int, value: int, channel_type: str = 'other'):
@@ -182,22 +719,15 @@ class DMXController:
             value: DMX value (0-255)
             channel_type: Channel type ('dimmer', 'color', 'pan', 'tilt', 'other')
         """
-        if universe_id not in self.universes:
-            self.add_universe(universe_id)
-        
-        # Apply grandmaster scaling only to dimmer channels
-        if channel_type == 'dimmer':
-            scaled_value = int(value * self.grandmaster)
-        else:
-            scaled_value = value
-        self.universes[universe_id].set_channel(channel, scaled_value)
+        universe = self.get_universe(universe_id)
+        if channel_type == 'dimmer' and 1 <= channel <= 512 and not universe.layers.intensity[channel - 1]:
+            # Grandmaster and HTP apply to dimmer channels only
+            universe.set_intensity((channel,))
+        universe.set_channel(channel, value, *self.layer_stamp(MANUAL_LAYER))
     
-    def set_channels(self, universe_id: int, start_channel: int, values: list):
-        """Set multiple DMX channels in a specific universe"""
-        if universe_id not in self.universes:
-            self.add_universe(universe_id)
-        
-        self.universes[universe_id].set_channels(start_channel, values)
+    def set_channels(self, universe_id: int, start_channel: int, values):
+        """Set multiple consecutive DMX channels (ints or bytes) of the manual layer in a specific universe"""
+        self.get_universe(universe_id).set_channels(start_channel, values, *self.layer_stamp(MANUAL_LAYER))
     
     def get_channel(self, universe_id: int, channel: int) -> int:
         """Get current value of a DMX channel in a specific universe"""
@@ -216,13 +746,15 @@ class DMXController:
             if universe_id in self.universes:
                 self.universes[universe_id].blackout()
         else:
-            for universe in self.universes.values():
+            for universe in list(self.universes.values()):
                 universe.blackout()
     
     def start(self):
         """Start DMX output thread"""
         if not self.running:
             self.running = True
+            for worker in self.output_workers.values():
+                worker.start()
             self._thread = threading.Thread(target=self._output_loop, daemon=True)
             self._thread.start()
             print("DMX Controller: Output started")
@@ -232,100 +764,112 @@ class DMXController:
         self.running = False
         if self._thread:
             self._thread.join(timeout=2)
+        for worker in self.output_workers.values():
+            worker.stop()
 
-        # Stop ArtNet senders
-        for key, sender in self.artnet_senders.items():
-            try:
-                sender.stop()
-                print(f"DMX Controller: ArtNet sender {key} stopped")
-            except Exception:
-                pass
+        # Close the shared ArtNet socket
+        if self.artnet:
+            self.artnet.close()
+            print(f"DMX Controller: ArtNet output stopped ({len(self.artnet_senders)} senders)")
+        if self.e131:
+            self.e131.close()
+            print("DMX Controller: sACN output stopped")
         
-        # Close serial
-        if hasattr(self, 'serial') and self.serial and self.serial.is_open:
-            self.serial.close()
+        # Stop serial writer and close the port
+        if self.serial_output:
+            self.serial_output.stop()
         
         print("DMX Controller: Output stopped")
     
+    def set_fps(self, fps: float):
+        """Change the output frame rate while running (not saved to artnet.json)"""
+        self.clock.set_fps(fps)
+        self.fps = self.clock.fps
+        print(f"DMX Controller: Output rate set to {self.fps:g} fps")
+    
+    def get_timing_stats(self) -> Dict:
+        """Get output loop frame rate, overrun and jitter statistics"""
+        return self.clock.get_stats()
+    
+    def get_output_stats(self) -> Dict:
+        """Get per-universe packet counters, per-node send/error/latency metrics and serial writer counters"""
+        universes = {}
+        for universe_id, universe in list(self.universes.items()):
+            universes[universe_id] = {
+                'output_mode': universe.output_mode,
+                'packets_sent': universe.packets_sent,
+                'packets_skipped': universe.packets_skipped,
+            }
+        return {
+            'keepalive_interval': self.keepalive_interval,
+            'packets_sent': sum(u['packets_sent'] for u in universes.values()),
+            'packets_skipped': sum(u['packets_skipped'] for u in universes.values()),
+            'universes': universes,
+            'layers': list(self.layers),
+            'nodes': {name: worker.get_stats() for name, worker in list(self.output_workers.items())},
+            'serial': self.serial_output.get_stats() if self.serial_output else None,
+        }
+    
     def reload_config(self, config_file: str):
         """
-        Reload configuration from file without stopping the controller.
-        Preserves current channel values where possible.
+        Reload configuration from file while output keeps running.
+        Unchanged universes (including their channel values), senders and workers are kept,
+        only what changed is added or removed, and the new routing is swapped in between two frames.
         
         Args:
             config_file: Path to artnet.json configuration file
         """
         print("DMX Controller: Reloading configuration...")
+        try:
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+        except Exception as e:
+            print(f"DMX Controller: Failed to reload config, keeping current configuration: {e}")
+            return
         
-        # Store current channel values from all universes
-        current_values = {}
-        for universe_id, universe in self.universes.items():
-            current_values[universe_id] = universe.dmx_data.copy()
-        
-        # Stop output temporarily
-        was_running = self.running
-        if was_running:
-            self.running = False
-            if self._thread:
-                self._thread.join(timeout=2)
-        
-        # Cleanup old ArtNet senders
-        for sender in self.artnet_senders.values():
-            try:
-                sender.stop()
-            except:
-                pass
-        self.artnet_senders = {}
-        
-        # Reload configuration
-        self.universes = {}
-        self._load_config(config_file)
-        
-        # Restore channel values where universes still exist
-        for universe_id, values in current_values.items():
-            if universe_id in self.universes:
-                self.universes[universe_id].dmx_data = values
-                print(f"DMX Controller: Restored values for Universe {universe_id}")
-        
-        # Restart output if it was running
-        if was_running:
-            self.running = True
-            self._thread = threading.Thread(target=self._output_loop, daemon=True)
-            self._thread.start()
-        
+        self._apply_config(config)
         print("DMX Controller: Configuration reloaded successfully")
     
     def _output_loop(self):
-        """Main output loop - sends DMX data periodically"""
-        frame_time = 1.0 / self.fps
+        """Main output loop - sends DMX data once per frame clock tick"""
+        self.clock.reset()
         
         while self.running:
-            start_time = time.time()
+            self.clock.tick()
+            
+            # Evaluate effects for this frame before sending, then merge the layers
+            self._render(time.monotonic())
+            self.merge()
             
-            for universe_id, universe in self.universes.items():
+            # Snapshot all universes at the same point of the frame, then hand each
+            # destination its packets; the workers send them in parallel
+            now = time.monotonic()
+            batches: Dict[OutputWorker, list] = {}
+            # Virtual universes have no route; the table is read once so a reload applies from the next frame
+            for universe_id, route in self.routes.items():
+                universe = route.universe
                 try:
-                    if universe.output_mode == 'artnet' and universe.artnet_sender:
-                        data = universe.get_data()
-                        universe.artnet_sender.set(data)
-                        universe.artnet_sender.show()
-
-                    elif universe.output_mode == 'serial' and hasattr(self, 'serial') and self.serial and self.serial.is_open:
-                        data = universe.get_data()
-                        self.serial.break_condition = True
-                        time.sleep(0.0001)  # Break (100us)
-                        self.serial.break_condition = False
-                        time.sleep(0.000012)  # Mark After Break (12us)
-
-                        dmx_packet = bytes([0x00] + data)
-                        self.serial.write(dmx_packet)
+                    if route.mode == 'serial':
+                        # DMX needs a continuous stream: hand every frame to the writer thread,
+                        # which drops it if the port is still busy with the previous one
+                        route.sender.submit(universe.snapshot())
+                        universe.packets_sent += 1
+                        continue
 
-                    # Virtual mode: no output
+                    # Only changed universes every frame, unchanged ones at the keep-alive rate
+                    if not universe.needs_send(now, self.keepalive_interval):
+                        universe.packets_skipped += 1
+                        continue
+                    frame = universe.snapshot()
+                    # sACN carries the start code in the packet, ArtNet only the channels
+                    data = frame if route.mode == 'e131' else memoryview(frame)[1:]
+                    batches.setdefault(route.worker, []).append((route.sender, data))
+                    universe.last_sent = now
+                    universe.packets_sent += 1
 
                 except Exception as e:
                     print(f"DMX Controller: Output error for universe {universe_id}: {e}")
             
-            # Maintain target FPS
-            elapsed = time.time() - start_time
-            sleep_time = max(0, frame_time - elapsed)
-            time.sleep(sleep_time)
+            for worker, batch in batches.items():
+                worker.submit(batch)
 
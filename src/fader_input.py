@@ -0,0 +1,90 @@
+"""
+Fader Input for LightGroove
+Coalesces rapid fader writes from the API so each channel is applied at most once per frame
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+
+class FaderInput:
+    """
+    Last-writer-wins buffer between the API and the FixtureManager.
+
+    A fader drag sends one request per input event. Instead of applying each one,
+    the handlers only store the value under (fixture or group, channel) and return; the DMX
+    frame clock applies the latest value of every pending channel once per frame in
+    one frame transaction. Values overwritten before the frame are counted as coalesced.
+    While the output loop is not running, writes are applied immediately.
+    """
+
+    # Write kinds, first element of the pending keys
+    CHANNEL = 'channel'
+    DIMMER = 'dimmer'  # set_fixture_dimmer (resolves the fixture's dimmer channel)
+    GROUP = 'group'
+
+    def __init__(self, fixture_manager):
+        """
+        Args:
+            fixture_manager: FixtureManager the values are applied to
+        """
+        self.fixture_manager = fixture_manager
+        self._pending: Dict[Tuple[str, str, Optional[str]], float] = {}  # (kind, target, channel) -> value
+        self._lock = threading.Lock()
+        # Statistics
+        self.writes_received = 0
+        self.writes_applied = 0
+        fixture_manager.dmx.add_renderer(self.apply_pending)
+
+    def set_channel(self, fixture_id: str, channel_name: str, value: float):
+        """Queue a channel value (0.0-1.0) for the next frame"""
+        self._put((self.CHANNEL, fixture_id, channel_name), value)
+
+    def set_dimmer(self, fixture_id: str, value: float):
+        """Queue a manual dimmer value (0.0-1.0) for the next frame"""
+        self._put((self.DIMMER, fixture_id, None), value)
+
+    def set_group_channel(self, group_name: str, channel_name: str, value: float):
+        """Queue a group fader value (0.0-1.0) for the next frame"""
+        self._put((self.GROUP, group_name, channel_name), value)
+
+    def _put(self, key: Tuple[str, str, Optional[str]], value: float):
+        with self._lock:
+            self._pending[key] = value
+            self.writes_received += 1
+        if not self.fixture_manager.dmx.running:
+            self.apply_pending()
+
+    def apply_pending(self, now: float = 0.0):
+        """Apply the latest value of every pending channel (called by the DMX frame clock)"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+
+        fixture_manager = self.fixture_manager
+        with fixture_manager.frame():
+            for (kind, target, channel_name), value in pending.items():
+                if kind == self.CHANNEL:
+                    fixture_manager.set_fixture_channel(target, channel_name, value)
+                elif kind == self.DIMMER:
+                    fixture_manager.set_fixture_dimmer(target, value, manual=True)
+                else:
+                    fixture_manager.set_group_channel(target, channel_name, value)
+        self.writes_applied += len(pending)
+
+    def close(self):
+        """Apply what is still pending and stop following the frame clock"""
+        self.fixture_manager.dmx.remove_renderer(self.apply_pending)
+        self.apply_pending()
+
+    def get_stats(self) -> Dict:
+        """Get write counters"""
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'writes_received': self.writes_received,
+            'writes_applied': self.writes_applied,
+            'writes_coalesced': self.writes_received - self.writes_applied - pending,
+            'pending': pending,
+        }
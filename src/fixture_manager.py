@@ -3,9 +3,166 @@ Fixture Manager
 Handles fixture configuration, patching and control
 Author: https://github.com/oliverbyte
 """
+import itertools
 import json
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Dict, Any, Iterable, List, Mapping, Optional, NamedTuple, Tuple
+
+from color_manager import COLORS
+from layer_merge import FLASH_LAYER, MANUAL_LAYER
+
+
+# Dimmer channel names in order of preference
+DIMMER_CHANNELS = ('master_dimmer', 'dimmer', 'intensity')
+
+# Short color keys mapped to RGBW channel names
+RGBW_CHANNELS = (('r', 'red'), ('g', 'green'), ('b', 'blue'), ('w', 'white'))
+
+
+def split_16bit(value: float) -> Tuple[int, int]:
+    """
+    Split a normalised value (0.0-1.0) into coarse and fine DMX bytes.
+    
+    The coarse byte is exactly what the 8-bit path writes (int(value * 255)) and the
+    fine byte subdivides that coarse step into 256 parts, so 8-bit and 16-bit
+    output of the same value never disagree on the coarse channel.
+    """
+    scaled = max(0.0, min(1.0, value)) * 255
+    coarse = int(scaled)
+    return coarse, min(255, int((scaled - coarse) * 256))
+
+
+# Quantisation levels per RGBW channel of the color wheel lookup tables (8^4 = 4096 entries)
+WHEEL_TABLE_LEVELS = 8
+
+# Reference colors for standard wheel slot names that are not defined in colors.json
+WHEEL_REFERENCE_COLORS = {
+    'white': {'r': 0.0, 'g': 0.0, 'b': 0.0, 'w': 1.0},
+    'red': {'r': 1.0, 'g': 0.0, 'b': 0.0, 'w': 0.0},
+    'green': {'r': 0.0, 'g': 1.0, 'b': 0.0, 'w': 0.0},
+    'blue': {'r': 0.0, 'g': 0.0, 'b': 1.0, 'w': 0.0},
+    'yellow': {'r': 1.0, 'g': 1.0, 'b': 0.0, 'w': 0.0},
+    'orange': {'r': 1.0, 'g': 0.5, 'b': 0.0, 'w': 0.0},
+    'cyan': {'r': 0.0, 'g': 1.0, 'b': 1.0, 'w': 0.0},
+    'magenta': {'r': 1.0, 'g': 0.0, 'b': 1.0, 'w': 0.0},
+}
+
+
+def wheel_table_index(r: float, g: float, b: float, w: float) -> int:
+    """Index of an RGBW color (0.0-1.0 values) in a color wheel lookup table"""
+    top = WHEEL_TABLE_LEVELS - 1
+    index = 0
+    for value in (r, g, b, w):
+        index = index * WHEEL_TABLE_LEVELS + int(max(0.0, min(1.0, value)) * top + 0.5)
+    return index
+
+
+def _wheel_chroma(r: float, g: float, b: float, w: float) -> Optional[Tuple[float, float, float]]:
+    """RGB chromaticity of an RGBW color scaled to full brightness (the dimmer handles intensity), None for black"""
+    rgb = (min(1.0, r + w), min(1.0, g + w), min(1.0, b + w))
+    peak = max(rgb)
+    if peak < 0.01:
+        return None
+    return tuple(c / peak for c in rgb)
+
+
+def _color_distance(c1: Tuple[float, float, float], c2: Tuple[float, float, float]) -> float:
+    """Perceptual color distance (weighted 'redmean' RGB approximation)"""
+    rmean = (c1[0] + c2[0]) / 2
+    dr, dg, db = c1[0] - c2[0], c1[1] - c2[1], c1[2] - c2[2]
+    return (2 + rmean) * dr * dr + 4 * dg * dg + (3 - rmean) * db * db
+
+
+def build_color_wheel_table(mapping: Dict[str, int], colors: Dict[str, Dict]) -> bytes:
+    """
+    Build a quantised RGBW -> color wheel DMX value lookup table.
+    
+    Every table cell maps to the perceptually nearest wheel slot. Slot colors come
+    from colors.json (by slot name), falling back to WHEEL_REFERENCE_COLORS.
+    Black maps to the white slot.
+    
+    Args:
+        mapping: color_wheel_mapping of the fixture type (slot name -> DMX value)
+        colors: Color definitions (name -> r/g/b/w dict)
+    """
+    slots = []
+    for name, dmx_value in mapping.items():
+        color = colors.get(name) or WHEEL_REFERENCE_COLORS.get(name)
+        chroma = _wheel_chroma(*(color.get(k, 0.0) for k in 'rgbw')) if color else None
+        if chroma is not None:
+            slots.append((chroma, dmx_value))
+    default = mapping.get('white', slots[0][1] if slots else 0)
+    if not slots:
+        return bytes([default]) * (WHEEL_TABLE_LEVELS ** 4)
+    
+    top = WHEEL_TABLE_LEVELS - 1
+    table = bytearray(WHEEL_TABLE_LEVELS ** 4)
+    levels = [i / top for i in range(WHEEL_TABLE_LEVELS)]
+    index = 0
+    for r in levels:
+        for g in levels:
+            for b in levels:
+                for w in levels:
+                    chroma = _wheel_chroma(r, g, b, w)
+                    if chroma is None:
+                        table[index] = default
+                    else:
+                        table[index] = min(slots, key=lambda slot: _color_distance(chroma, slot[0]))[1]
+                    index += 1
+    return bytes(table)
+
+
+class ChannelAddress(NamedTuple):
+    """Precomputed absolute address of a fixture channel"""
+    universe: int
+    address: int
+    type: str
+    range: Tuple[int, int]
+
+
+class FixtureCapabilities(NamedTuple):
+    """Capability flags derived from a fixture's channel layout"""
+    has_rgbw: bool
+    has_color_wheel: bool
+    has_pan_tilt: bool
+    dimmer_channel: Optional[str]
+    rgbw_channels: Tuple[Tuple[str, str], ...]  # (short key, channel name) pairs present on the fixture
+
+
+class GroupChannel(NamedTuple):
+    """Addresses of one channel across the members of a group that share a universe and channel type"""
+    universe: int
+    type: str
+    addresses: Tuple[int, ...]
+
+
+class FixtureGroup(NamedTuple):
+    """A named set of fixtures, resolved once when the patch is loaded"""
+    name: str
+    fixtures: Tuple[str, ...]
+    channels: Mapping[str, Tuple[GroupChannel, ...]]  # channel name -> address vectors of the members
+    moving: Tuple[str, ...]  # Members with pan and tilt channels (movement FX targets)
+
+
+# Built-in groups, used as default targets of the FX engines (patch.json groups with the same name replace them)
+BUILTIN_GROUPS = {
+    'all': {},
+    'color': {'capability': 'color'},
+    'moving': {'capability': 'pan_tilt'},
+}
+
+# Group selector capabilities -> test on FixtureCapabilities
+GROUP_CAPABILITIES = {
+    'rgbw': lambda caps: caps.has_rgbw,
+    'color_wheel': lambda caps: caps.has_color_wheel,
+    'color': lambda caps: caps.has_rgbw or caps.has_color_wheel,
+    'pan_tilt': lambda caps: caps.has_pan_tilt,
+    'dimmer': lambda caps: caps.dimmer_channel is not None,
+}
 
 
 class FixtureManager:
@@ -24,8 +181,21 @@ class FixtureManager:
         self.fixtures_config = self._load_json(fixtures_file)
         self.patch_config = self._load_json(patch_file)
         self.fixtures = {}
+        self._local = threading.local()  # Per-thread active frame transaction
+        # Bumped after every fixture state change, used to cache serialized state
+        self.state_version = 0
+        self._state_versions = itertools.count(1)
+        # Running color crossfades: fixture_id -> (start rgbw, target rgbw, start time, duration, output layer)
+        self._fades: Dict[str, Tuple[Tuple[float, ...], Tuple[float, ...], float, float, str]] = {}
+        self._fade_lock = threading.Lock()
         
         self._initialize_fixtures()
+        self.groups: Dict[str, FixtureGroup] = self._build_groups(self.patch_config.get('groups', {}))
+        # Flash overlays every other layer while held (see flash_all_white)
+        self.dmx.add_layer(FLASH_LAYER, priority=1)
+        
+        # Crossfades are evaluated by the DMX frame clock
+        self.dmx.add_renderer(self._render_fades)
     
     def _load_json(self, filepath: str) -> Dict:
         """Load JSON configuration file"""
@@ -46,16 +216,198 @@ class FixtureManager:
                 start_address = fixture_data['start_address']
                 
                 if fixture_type in self.fixtures_config:
+                    config = self.fixtures_config[fixture_type]
+                    channels = self._compile_channels(universe_id, start_address, config)
                     self.fixtures[fixture_id] = {
                         'type': fixture_type,
                         'universe': universe_id,
                         'start_address': start_address,
-                        'config': self.fixtures_config[fixture_type],
+                        'config': config,
+                        'channels': channels,
+                        'caps': self._compile_capabilities(channels),
+                        'tags': tuple(fixture_data.get('tags', ())),
                         'state': {}
                     }
                     print(f"Initialized fixture '{fixture_id}' ({fixture_type}) at Universe {universe_id}, Address {start_address}")
                 else:
                     print(f"Warning: Fixture type '{fixture_type}' not found in fixtures.json")
+        
+        # Dimmer channels are merged HTP across output layers and scaled by the grandmaster
+        intensity: Dict[int, List[int]] = {}
+        for fixture in self.fixtures.values():
+            for channel in fixture['channels'].values():
+                if channel.type == 'dimmer':
+                    intensity.setdefault(channel.universe, []).append(channel.address)
+        for universe_id, addresses in intensity.items():
+            self.dmx.set_intensity_channels(universe_id, addresses)
+        
+        self.rebuild_color_wheel_tables()
+
+    @staticmethod
+    def _compile_channels(universe_id: int, start_address: int, config: Dict) -> MappingProxyType:
+        """
+        Build the read-only channel name -> absolute address table for a fixture
+        
+        Args:
+            universe_id: Universe the fixture is patched in
+            start_address: DMX start address of the fixture
+            config: Fixture type definition from fixtures.json
+        """
+        channels = {}
+        for ch in config.get('channels', []):
+            channels[ch['name']] = ChannelAddress(
+                universe=universe_id,
+                address=start_address + ch['index'],
+                type=ch.get('type', 'other'),
+                range=tuple(ch.get('range', (0, 255)))
+            )
+        return MappingProxyType(channels)
+
+    def _build_groups(self, definitions: Dict[str, Dict]) -> Dict[str, FixtureGroup]:
+        """
+        Resolve the built-in and patch.json groups to member lists and address vectors
+        
+        Args:
+            definitions: Group name -> selector from patch.json. Selectors are combined (all must
+                match): 'fixtures' (explicit id list), 'type', 'universe', 'tag' (matched against
+                the fixture's 'tags' in the patch) and 'capability' (rgbw, color_wheel, color,
+                pan_tilt, dimmer). 'type', 'universe' and 'tag' also accept lists (any of).
+        """
+        groups = {}
+        for name, selector in {**BUILTIN_GROUPS, **definitions}.items():
+            members = self._select_fixtures(name, selector)
+            moving = tuple(fid for fid in members if self.fixtures[fid]['caps'].has_pan_tilt)
+            groups[name] = FixtureGroup(name, tuple(members), self._compile_group_channels(members), moving)
+            if name in definitions:
+                print(f"Initialized group '{name}' with {len(members)} fixtures")
+        return groups
+    
+    def _select_fixtures(self, name: str, selector: Dict) -> List[str]:
+        """Fixture ids matching a group selector, in patch order"""
+        def any_of(key):
+            value = selector[key]
+            return set(value) if isinstance(value, list) else {value}
+        
+        if 'fixtures' in selector:
+            members = []
+            for fixture_id in selector['fixtures']:
+                if fixture_id in self.fixtures:
+                    members.append(fixture_id)
+                else:
+                    print(f"Warning: Group '{name}' references unknown fixture '{fixture_id}'")
+        else:
+            members = list(self.fixtures)
+        
+        if 'type' in selector:
+            types = any_of('type')
+            members = [fid for fid in members if self.fixtures[fid]['type'] in types]
+        if 'universe' in selector:
+            universes = {int(u) for u in any_of('universe')}
+            members = [fid for fid in members if self.fixtures[fid]['universe'] in universes]
+        if 'tag' in selector:
+            tags = any_of('tag')
+            members = [fid for fid in members if tags.intersection(self.fixtures[fid]['tags'])]
+        if 'capability' in selector:
+            test = GROUP_CAPABILITIES.get(selector['capability'])
+            if test is None:
+                print(f"Warning: Group '{name}' has unknown capability '{selector['capability']}'")
+                return []
+            members = [fid for fid in members if test(self.fixtures[fid]['caps'])]
+        return members
+    
+    def _compile_group_channels(self, members: List[str]) -> MappingProxyType:
+        """Channel name -> member addresses, grouped by universe and channel type"""
+        vectors: Dict[str, Dict[Tuple[int, str], List[int]]] = {}
+        for fixture_id in members:
+            for channel_name, channel in self.fixtures[fixture_id]['channels'].items():
+                vectors.setdefault(channel_name, {}).setdefault((channel.universe, channel.type), []).append(channel.address)
+        return MappingProxyType({
+            channel_name: tuple(GroupChannel(universe, channel_type, tuple(addresses))
+                                for (universe, channel_type), addresses in by_key.items())
+            for channel_name, by_key in vectors.items()
+        })
+    
+    def get_group(self, name: str) -> Optional[FixtureGroup]:
+        """Get a resolved group by name, or None if not defined"""
+        return self.groups.get(name)
+    
+    def set_group_channel(self, group_name: str, channel_name: str, value: float) -> int:
+        """
+        Set a channel on all members of a group that have it (group fader)
+        
+        The DMX value is computed once and written through the group's precomputed
+        address vectors.
+        
+        Args:
+            group_name: Name of the group
+            channel_name: Name of the channel (e.g., 'dimmer')
+            value: Value 0.0-1.0
+        
+        Returns:
+            Number of fixtures written (0 if the group or channel does not exist)
+        """
+        group = self.groups.get(group_name)
+        if group is None or channel_name not in group.channels:
+            return 0
+        dmx_value = bytes([max(0, min(255, int(value * 255)))])
+        with self.frame() as frame:
+            for vector in group.channels[channel_name]:
+                frame.scatter(vector.universe, vector.addresses, dmx_value * len(vector.addresses))
+        
+        count = 0
+        for fixture_id in group.fixtures:
+            fixture = self.fixtures[fixture_id]
+            if channel_name in fixture['channels']:
+                fixture['state'][channel_name] = value
+                count += 1
+        self.mark_state_changed()
+        return count
+    
+    @staticmethod
+    def _compile_capabilities(channels: MappingProxyType) -> FixtureCapabilities:
+        """Derive capability flags from a compiled channel table"""
+        rgbw_channels = tuple((key, name) for key, name in RGBW_CHANNELS if name in channels)
+        dimmer_channel = next((name for name in DIMMER_CHANNELS if name in channels), None)
+        return FixtureCapabilities(
+            has_rgbw=bool(rgbw_channels),
+            has_color_wheel='color_wheel' in channels,
+            has_pan_tilt='pan' in channels and 'tilt' in channels,
+            dimmer_channel=dimmer_channel,
+            rgbw_channels=rgbw_channels
+        )
+    
+    @contextmanager
+    def frame(self, layer: Optional[str] = None):
+        """
+        Stage all fixture writes made in this block (on this thread) and publish
+        them atomically when the block exits. Nested frames join the outer one.
+        
+        Args:
+            layer: Output layer the block writes to (default: the outer frame's layer,
+                   or the manual layer); a nested frame switches it for its own block
+        
+        Usage:
+            with fixture_manager.frame():
+                fixture_manager.set_fixture_color('par1', 1.0, 0.0, 0.0)
+        """
+        current = getattr(self._local, 'frame', None)
+        if current is not None:
+            if layer is None or layer == current.layer:
+                yield current
+                return
+            previous, current.layer = current.layer, layer
+            try:
+                yield current
+            finally:
+                current.layer = previous
+            return
+        frame = self.dmx.begin_frame(layer or MANUAL_LAYER)
+        self._local.frame = frame
+        try:
+            yield frame
+        finally:
+            self._local.frame = None
+            frame.commit()
     
     def set_fixture_channel(self, fixture_id: str, channel_name: str, value: float):
         """
@@ -71,16 +423,10 @@ class FixtureManager:
             return
         
         fixture = self.fixtures[fixture_id]
-        config = fixture['config']
         
-        # Find channel configuration
-        channel_config = None
-        for ch in config['channels']:
-            if ch['name'] == channel_name:
-                channel_config = ch
-                break
-        
-        if not channel_config:
+        # Look up precomputed channel address
+        channel = fixture['channels'].get(channel_name)
+        if channel is None:
             print(f"Channel '{channel_name}' not found in fixture '{fixture_id}'")
             return
         
@@ -88,18 +434,54 @@ class FixtureManager:
         dmx_value = int(value * 255)
         dmx_value = max(0, min(255, dmx_value))
         
-        # Calculate absolute DMX address
-        universe_id = fixture['universe']
-        dmx_address = fixture['start_address'] + channel_config['index']
-        
-        # Get channel type for grandmaster handling
-        channel_type = channel_config.get('type', 'other')
-        
-        # Set DMX channel with universe and channel type
-        self.dmx.set_channel(universe_id, dmx_address, dmx_value, channel_type)
+        # Set DMX channel with universe and channel type, staged in the active frame
+        # transaction (and its output layer) if there is one, else on the manual layer
+        target = getattr(self._local, 'frame', None) or self.dmx
+        target.set_channel(channel.universe, channel.address, dmx_value, channel.type)
         
         # Update state
         fixture['state'][channel_name] = value
+        self.mark_state_changed()
+    
+    def set_fixture_channel_16bit(self, fixture_id: str, channel_name: str, value: float):
+        """
+        Set a channel with 16-bit precision using its '<name>_fine' channel.
+        Falls back to a plain 8-bit write if the fixture has no fine channel.
+        
+        Args:
+            fixture_id: ID of the fixture (e.g., 'moving1')
+            channel_name: Name of the coarse channel (e.g., 'pan', 'tilt')
+            value: Value 0.0-1.0
+        """
+        fixture = self.fixtures.get(fixture_id)
+        if fixture is None:
+            print(f"Fixture '{fixture_id}' not found")
+            return
+        
+        channels = fixture['channels']
+        coarse_channel = channels.get(channel_name)
+        fine_channel = channels.get(f"{channel_name}_fine")
+        if coarse_channel is None or fine_channel is None:
+            self.set_fixture_channel(fixture_id, channel_name, value)
+            return
+        
+        # Both bytes are staged together so they are always sent in the same frame
+        coarse, fine = split_16bit(value)
+        with self.frame() as frame:
+            frame.set_channel(coarse_channel.universe, coarse_channel.address, coarse, coarse_channel.type)
+            frame.set_channel(fine_channel.universe, fine_channel.address, fine, fine_channel.type)
+        
+        # Update state (fine stored so that int(value * 255) gives the fine byte back)
+        fixture['state'][channel_name] = max(0.0, min(1.0, value))
+        fixture['state'][f"{channel_name}_fine"] = fine / 255
+        self.mark_state_changed()
+    
+    def mark_state_changed(self):
+        """
+        Bump the state version after fixture states were written.
+        Call this after writing fixture['state'] directly (outside set_fixture_channel).
+        """
+        self.state_version = next(self._state_versions)
     
     def get_fixture_channel(self, fixture_id: str, channel_name: str) -> float:
         """
@@ -129,21 +511,43 @@ class FixtureManager:
         Returns:
             True if the fixture has the channel, False otherwise
         """
-        if fixture_id not in self.fixtures:
+        fixture = self.fixtures.get(fixture_id)
+        if fixture is None:
             return False
+        return channel_name in fixture['channels']
+    
+    def get_capabilities(self, fixture_id: str) -> Optional[FixtureCapabilities]:
+        """Get precomputed capability flags of a fixture, or None if not found"""
+        fixture = self.fixtures.get(fixture_id)
+        if fixture is None:
+            return None
+        return fixture['caps']
+    
+    def rebuild_color_wheel_tables(self, colors: Optional[Dict] = None):
+        """
+        (Re)build the RGBW -> color wheel lookup tables of all wheel fixtures.
+        Call after colors.json changed so user-defined colors map to the closest slot.
         
-        fixture = self.fixtures[fixture_id]
-        config = fixture['config']
-        
-        for ch in config['channels']:
-            if ch['name'] == channel_name:
-                return True
-        return False
+        Args:
+            colors: Color definitions (name -> r/g/b/w dict), defaults to the loaded COLORS
+        """
+        if colors is None:
+            colors = COLORS
+        tables = {}  # One table per fixture type
+        for fixture in self.fixtures.values():
+            mapping = fixture['config'].get('color_wheel_mapping')
+            if not mapping:
+                fixture['wheel_table'] = None
+                continue
+            if fixture['type'] not in tables:
+                tables[fixture['type']] = build_color_wheel_table(mapping, colors)
+            fixture['wheel_table'] = tables[fixture['type']]
     
     def _rgbw_to_color_wheel(self, fixture_id: str, r: float, g: float, b: float, w: float) -> float:
         """
         Convert RGBW values to color wheel position (0.0-1.0)
-        Uses fixture-specific color wheel mapping from fixture definition
+        Uses the fixture type's precomputed nearest-slot lookup table
+        (see build_color_wheel_table), so conversion is a single indexed read
         
         Args:
             fixture_id: ID of the fixture
@@ -151,66 +555,10 @@ class FixtureManager:
             
         Returns normalized value (0.0-1.0) for color wheel channel
         """
-        if fixture_id not in self.fixtures:
-            return 0.0
-        
-        fixture = self.fixtures[fixture_id]
-        config = fixture['config']
-        
-        # Get color wheel mapping from fixture config
-        color_wheel_mapping = config.get('color_wheel_mapping', {})
-        if not color_wheel_mapping:
+        fixture = self.fixtures.get(fixture_id)
+        if fixture is None or not fixture.get('wheel_table'):
             return 0.0
-        
-        # Tolerance for color matching
-        tolerance = 0.2
-        
-        # Helper function to get DMX value from mapping
-        def get_dmx(color_name):
-            return color_wheel_mapping.get(color_name, 0) / 255.0
-        
-        # White (w channel or RGB all high)
-        if w > 0.5 or (r > 0.8 and g > 0.8 and b > 0.8):
-            return get_dmx('white')
-        
-        # Check two-color combinations BEFORE pure colors to avoid ambiguity
-        
-        # Yellow (R+G, no B)
-        if r > 0.8 and g > 0.8 and b < tolerance:
-            return get_dmx('yellow')
-        
-        # Cyan (G+B, no R)
-        if r < tolerance and g > 0.8 and b > 0.8:
-            return get_dmx('cyan')
-        
-        # Magenta/Pink (R+B, no G)
-        if r > 0.8 and g < tolerance and b > 0.8:
-            return get_dmx('magenta')
-        
-        # Orange (R high, G medium, no B)
-        if r > 0.8 and g > 0.3 and g < 0.7 and b < tolerance:
-            return get_dmx('orange')
-        
-        # Now check pure colors
-        
-        # Pure Red
-        if r > 0.8 and g < tolerance and b < tolerance:
-            return get_dmx('red')
-        
-        # Pure Green
-        if r < tolerance and g > 0.8 and b < tolerance:
-            return get_dmx('green')
-        
-        # Pure Blue
-        if r < tolerance and g < tolerance and b > 0.8:
-            return get_dmx('blue')
-        
-        # Purple (R medium, B high, G low) - closest to magenta
-        if r > 0.4 and b > 0.8 and g < 0.5:
-            return get_dmx('magenta')
-        
-        # Black or unknown - default to white
-        return get_dmx('white')
+        return fixture['wheel_table'][wheel_table_index(r, g, b, w)] / 255.0
     
     def set_fixture_color(self, fixture_id: str, red: float, green: float, blue: float, white: float = 0.0):
         """
@@ -232,45 +580,138 @@ class FixtureManager:
         if not fixture:
             return
         
-        # Handle black color: save current dimmer and turn off
-        if is_black:
-            current_dimmer = self._get_fixture_dimmer(fixture_id)
-            # Save current dimmer if it's on (but not if it's from flash at 100%)
-            if current_dimmer > 0.01:
-                # Prefer manual_dimmer if set, otherwise save current
-                if 'manual_dimmer' not in fixture:
-                    fixture['active_dimmer'] = current_dimmer
+        # A direct color change replaces any running crossfade
+        with self._fade_lock:
+            self._fades.pop(fixture_id, None)
+        
+        with self.frame():
+            # The black/restore dimmer logic belongs to the fixture, not to the layer writing the color
+            with self.frame(MANUAL_LAYER):
+                if is_black:
+                    self._dim_for_black(fixture_id, fixture)
                 else:
-                    fixture['active_dimmer'] = fixture['manual_dimmer']
-            # Set dimmer to 0 for black
-            self.set_fixture_dimmer(fixture_id, 0.0)
-        else:
-            # Non-black color: restore previous dimmer if currently off
-            current_dimmer = self._get_fixture_dimmer(fixture_id)
-            if current_dimmer < 0.01:
-                # Dimmer is off, restore it
-                # Priority: manual_dimmer (user set) > active_dimmer (auto-saved) > keep at 0
-                if 'manual_dimmer' in fixture:
-                    self.set_fixture_dimmer(fixture_id, fixture['manual_dimmer'])
-                elif 'active_dimmer' in fixture:
-                    self.set_fixture_dimmer(fixture_id, fixture['active_dimmer'])
-        
-        # Set color channels
-        if self.has_channel(fixture_id, 'color_wheel'):
-            # Color wheel fixture
-            if not is_black:  # Only set color wheel for non-black
-                wheel_value = self._rgbw_to_color_wheel(fixture_id, red, green, blue, white)
-                self.set_fixture_channel(fixture_id, 'color_wheel', wheel_value)
-        else:
-            # Standard RGBW fixture
-            if self.has_channel(fixture_id, 'red'):
-                self.set_fixture_channel(fixture_id, 'red', red)
-            if self.has_channel(fixture_id, 'green'):
-                self.set_fixture_channel(fixture_id, 'green', green)
-            if self.has_channel(fixture_id, 'blue'):
-                self.set_fixture_channel(fixture_id, 'blue', blue)
-            if self.has_channel(fixture_id, 'white'):
-                self.set_fixture_channel(fixture_id, 'white', white)
+                    self._restore_dimmer(fixture_id, fixture)
+        
+            # Set color channels
+            caps = fixture['caps']
+            if caps.has_color_wheel:
+                # Color wheel fixture
+                if not is_black:  # Only set color wheel for non-black
+                    wheel_value = self._rgbw_to_color_wheel(fixture_id, red, green, blue, white)
+                    self.set_fixture_channel(fixture_id, 'color_wheel', wheel_value)
+            else:
+                # Standard RGBW fixture
+                self._write_rgbw(fixture_id, caps, (red, green, blue, white))
+    
+    def _write_rgbw(self, fixture_id: str, caps: FixtureCapabilities, rgbw: Tuple[float, ...]):
+        """Write RGBW values to the color channels a fixture has (no dimmer handling)"""
+        values = dict(zip(('r', 'g', 'b', 'w'), rgbw))
+        for short_key, channel_name in caps.rgbw_channels:
+            self.set_fixture_channel(fixture_id, channel_name, values[short_key])
+    
+    def _dim_for_black(self, fixture_id: str, fixture: Dict):
+        """Handle black color: save current dimmer and turn off"""
+        current_dimmer = self._get_fixture_dimmer(fixture_id)
+        # Save current dimmer if it's on (but not if it's from flash at 100%)
+        if current_dimmer > 0.01:
+            # Prefer manual_dimmer if set, otherwise save current
+            if 'manual_dimmer' not in fixture:
+                fixture['active_dimmer'] = current_dimmer
+            else:
+                fixture['active_dimmer'] = fixture['manual_dimmer']
+        # Set dimmer to 0 for black
+        self.set_fixture_dimmer(fixture_id, 0.0)
+    
+    def _restore_dimmer(self, fixture_id: str, fixture: Dict):
+        """Non-black color: restore previous dimmer if currently off"""
+        current_dimmer = self._get_fixture_dimmer(fixture_id)
+        if current_dimmer < 0.01:
+            # Dimmer is off, restore it
+            # Priority: manual_dimmer (user set) > active_dimmer (auto-saved) > keep at 0
+            if 'manual_dimmer' in fixture:
+                self.set_fixture_dimmer(fixture_id, fixture['manual_dimmer'])
+            elif 'active_dimmer' in fixture:
+                self.set_fixture_dimmer(fixture_id, fixture['active_dimmer'])
+    
+    def fade_fixture_color(self, fixture_id: str, red: float, green: float, blue: float, white: float = 0.0,
+                           duration: float = 0.0, start_time: Optional[float] = None):
+        """
+        Crossfade a fixture from its current RGBW color to a new one.
+        The fade is interpolated once per DMX frame by the frame clock, so its
+        cost does not depend on the fade length. Color wheel fixtures and
+        duration 0 change instantly (same as set_fixture_color). The fade writes
+        to the output layer of the frame it was started in.
+        
+        Args:
+            fixture_id: ID of the fixture
+            red, green, blue, white: Target color values 0.0-1.0
+            duration: Fade time in seconds
+            start_time: time.monotonic() timestamp the fade starts at (default: now)
+        """
+        fixture = self.fixtures.get(fixture_id)
+        if not fixture:
+            return
+        caps = fixture['caps']
+        if duration <= 0 or caps.has_color_wheel or not caps.has_rgbw:
+            self.set_fixture_color(fixture_id, red, green, blue, white)
+            return
+        
+        target = (red, green, blue, white)
+        state = fixture['state']
+        start = tuple(state.get(channel_name, 0.0) for _, channel_name in RGBW_CHANNELS)
+        is_black = (red < 0.01 and green < 0.01 and blue < 0.01 and white < 0.01)
+        if not is_black:
+            # Bring the dimmer back at the start of the fade; black dims at the end
+            with self.frame(MANUAL_LAYER):
+                self._restore_dimmer(fixture_id, fixture)
+        
+        if start_time is None:
+            start_time = time.monotonic()
+        current = getattr(self._local, 'frame', None)
+        layer = current.layer if current is not None else MANUAL_LAYER
+        with self._fade_lock:
+            self._fades[fixture_id] = (start, target, start_time, duration, layer)
+    
+    def cancel_fades(self, fixture_ids: Optional[Iterable[str]] = None):
+        """
+        Stop running crossfades at their current values
+        
+        Args:
+            fixture_ids: Fixtures whose fades are stopped (default: all)
+        """
+        with self._fade_lock:
+            if fixture_ids is None:
+                self._fades.clear()
+            else:
+                for fixture_id in fixture_ids:
+                    self._fades.pop(fixture_id, None)
+    
+    def _render_fades(self, now: float):
+        """Interpolate all running crossfades for the current frame (called by the DMX output clock)"""
+        with self._fade_lock:
+            if not self._fades:
+                return
+            fades = list(self._fades.items())
+        
+        finished = []
+        with self.frame():
+            for fixture_id, fade in fades:
+                start, target, start_time, duration, layer = fade
+                progress = (now - start_time) / duration
+                if progress >= 1.0:
+                    finished.append((fixture_id, fade))
+                elif progress > 0.0:
+                    rgbw = tuple(a + (b - a) * progress for a, b in zip(start, target))
+                    with self.frame(layer):
+                        self._write_rgbw(fixture_id, self.fixtures[fixture_id]['caps'], rgbw)
+            
+            # Final step goes through set_fixture_color for the black/dimmer logic
+            for fixture_id, fade in finished:
+                with self._fade_lock:
+                    if self._fades.get(fixture_id) is not fade:
+                        continue  # Replaced or cancelled meanwhile
+                with self.frame(fade[4]):
+                    self.set_fixture_color(fixture_id, *fade[1])
     
     def _get_fixture_dimmer(self, fixture_id: str) -> float:
         """
@@ -283,11 +724,10 @@ class FixtureManager:
         Returns:
             Current dimmer value 0.0-1.0, or 1.0 if not found
         """
-        dimmer_channels = ['master_dimmer', 'dimmer', 'intensity']
-        for channel_name in dimmer_channels:
-            if self.has_channel(fixture_id, channel_name):
-                return self.get_fixture_channel(fixture_id, channel_name)
-        return 1.0  # Default to full if no dimmer channel
+        fixture = self.fixtures.get(fixture_id)
+        if fixture is None or fixture['caps'].dimmer_channel is None:
+            return 1.0  # Default to full if no dimmer channel
+        return fixture['state'].get(fixture['caps'].dimmer_channel, 0.0)
     
     def set_fixture_dimmer(self, fixture_id: str, intensity: float, manual: bool = False):
         """
@@ -299,17 +739,18 @@ class FixtureManager:
             intensity: Intensity value 0.0-1.0
             manual: True if this is a user-initiated change (from faders)
         """
+        fixture = self.fixtures.get(fixture_id)
+        if fixture is None:
+            return
+        
         # Save manual dimmer changes for later restoration
-        if manual and fixture_id in self.fixtures:
-            self.fixtures[fixture_id]['manual_dimmer'] = intensity
-        
-        # Try common dimmer channel names
-        dimmer_channels = ['master_dimmer', 'dimmer', 'intensity']
-        for channel_name in dimmer_channels:
-            if self.has_channel(fixture_id, channel_name):
-                self.set_fixture_channel(fixture_id, channel_name, intensity)
-                return
+        if manual:
+            fixture['manual_dimmer'] = intensity
+        
         # If no dimmer channel found, silently ignore (some fixtures may not have dimmer)
+        dimmer_channel = fixture['caps'].dimmer_channel
+        if dimmer_channel is not None:
+            self.set_fixture_channel(fixture_id, dimmer_channel, intensity)
     
     def get_fixture_state(self, fixture_id: str) -> Optional[Dict]:
         """Get current state of a fixture"""
@@ -322,27 +763,50 @@ class FixtureManager:
         return list(self.fixtures.keys())
     
     def blackout_all(self):
-        """Set all fixtures to blackout"""
-        for fixture_id in self.fixtures:
-            self.set_fixture_color(fixture_id, 0, 0, 0, 0)
-            self.set_fixture_dimmer(fixture_id, 0)
+        """Set all fixtures to blackout (and release the intensities FX, cues and flash hold)"""
+        self.cancel_fades()
+        with self.frame(MANUAL_LAYER):
+            for fixture_id in self.fixtures:
+                self.set_fixture_color(fixture_id, 0, 0, 0, 0)
+                self.set_fixture_dimmer(fixture_id, 0)
+        # Intensities merge HTP, so any other layer would keep the fixtures lit
+        for layer in list(self.dmx.layers):
+            if layer != MANUAL_LAYER:
+                self.dmx.clear_layer(layer, intensity_only=True)
     
     def reapply_all_states(self):
-        """Reapply all current fixture states (useful after grandmaster change)"""
-        for fixture_id, fixture_data in self.fixtures.items():
-            state = fixture_data.get('state', {})
-            for channel_name, value in state.items():
-                self.set_fixture_channel(fixture_id, channel_name, value)
+        """Reapply all current fixture states to the manual layer"""
+        with self.frame():
+            for fixture_id, fixture_data in self.fixtures.items():
+                state = fixture_data.get('state', {})
+                for channel_name, value in list(state.items()):
+                    self.set_fixture_channel(fixture_id, channel_name, value)
     
     def flash_all_white(self):
-        """Set all fixtures to full white for flash effect (ignores pan/tilt)"""
-        for fixture_id in self.fixtures:
-            # Use set_fixture_color to handle both RGBW and color wheel fixtures
-            # Full white: w=1.0, r=g=b=0
-            self.set_fixture_color(fixture_id, 0.0, 0.0, 0.0, 1.0)
-            # Set dimmer to full (not manual - don't save this value)
-            self.set_fixture_dimmer(fixture_id, 1.0, manual=False)
-            # Note: pan and tilt channels are intentionally not modified during flash
+        """
+        Overlay full white on all fixtures for the flash effect (ignores pan/tilt)
+        
+        Written raw to the flash layer, which outranks every other layer; fixture states
+        are not touched, so release_flash() brings back the current output as it is by then.
+        """
+        with self.frame(FLASH_LAYER) as frame:
+            for fixture_id, fixture in self.fixtures.items():
+                channels, caps = fixture['channels'], fixture['caps']
+                # Full white: w=1.0, r=g=b=0 (closest wheel slot on color wheel fixtures)
+                if caps.has_color_wheel:
+                    look = {'color_wheel': self._rgbw_to_color_wheel(fixture_id, 0.0, 0.0, 0.0, 1.0)}
+                else:
+                    look = {channel_name: 1.0 if short_key == 'w' else 0.0 for short_key, channel_name in caps.rgbw_channels}
+                if caps.dimmer_channel is not None:
+                    look[caps.dimmer_channel] = 1.0
+                # Note: pan and tilt channels are intentionally not modified during flash
+                for channel_name, value in look.items():
+                    channel = channels[channel_name]
+                    frame.set_channel(channel.universe, channel.address, int(value * 255), channel.type)
+    
+    def release_flash(self):
+        """End the flash effect: drop the flash layer so the layers below show again"""
+        self.dmx.clear_layer(FLASH_LAYER)
     
     def save_current_states(self) -> Dict[str, Dict[str, float]]:
         """Save current states of all fixtures for later restoration"""
@@ -353,14 +817,25 @@ class FixtureManager:
     
     def restore_states(self, saved_states: Dict[str, Dict[str, float]]):
         """Restore previously saved fixture states"""
-        for fixture_id, state in saved_states.items():
-            if fixture_id in self.fixtures:
-                for channel_name, value in state.items():
-                    self.set_fixture_channel(fixture_id, channel_name, value)
+        with self.frame():
+            for fixture_id, state in saved_states.items():
+                if fixture_id in self.fixtures:
+                    for channel_name, value in state.items():
+                        self.set_fixture_channel(fixture_id, channel_name, value)
+    
+    def set_pan_tilt(self, fixture_id: str, pan: float, tilt: float):
+        """
+        Set pan and tilt of a fixture (0.0-1.0 range), with 16-bit precision
+        on fixtures that declare pan_fine/tilt_fine channels
+        """
+        with self.frame():
+            self.set_fixture_channel_16bit(fixture_id, 'pan', pan)
+            self.set_fixture_channel_16bit(fixture_id, 'tilt', tilt)
     
     def has_pan_tilt(self, fixture_id: str) -> bool:
         """Check if a fixture has pan and tilt channels"""
-        return self.has_channel(fixture_id, 'pan') and self.has_channel(fixture_id, 'tilt')
+        fixture = self.fixtures.get(fixture_id)
+        return fixture is not None and fixture['caps'].has_pan_tilt
     
     def set_fixture_position(self, fixture_id: str, position: str):
         """
@@ -386,18 +861,12 @@ class FixtureManager:
         
         if position in positions:
             pos = positions[position]
-            self.set_fixture_channel(fixture_id, 'pan', pos['pan'])
-            self.set_fixture_channel(fixture_id, 'tilt', pos['tilt'])
-            
-            # Also set fine channels if available
-            if self.has_channel(fixture_id, 'pan_fine'):
-                self.set_fixture_channel(fixture_id, 'pan_fine', 0.0)
-            if self.has_channel(fixture_id, 'tilt_fine'):
-                self.set_fixture_channel(fixture_id, 'tilt_fine', 0.0)
+            self.set_pan_tilt(fixture_id, pos['pan'], pos['tilt'])
     
     def set_all_moving_positions(self, position: str):
         """Set all moving fixtures to the same static position"""
-        for fixture_id in self.fixtures:
-            if self.has_pan_tilt(fixture_id):
-                self.set_fixture_position(fixture_id, position)
+        with self.frame():
+            for fixture_id in self.fixtures:
+                if self.has_pan_tilt(fixture_id):
+                    self.set_fixture_position(fixture_id, position)
 
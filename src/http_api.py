@@ -4,27 +4,179 @@ Author: https://github.com/oliverbyte
 """
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import re
 import threading
 from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Hashable, List, Mapping, NamedTuple, Optional, Pattern, Tuple
+from urllib.parse import unquote, urlsplit
+
+import color_manager
+from fader_input import FaderInput
+from live_state import LiveStateHub
+
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', 'config')
+
+STATIC_TYPES = {
+    ".js": "application/javascript",
+    ".css": "text/css",
+    ".html": "text/html; charset=utf-8",
+}
+
+
+class ApiRequest(NamedTuple):
+    """A parsed API request as seen by route handlers"""
+    method: str
+    path: str
+    params: Dict[str, str]  # Path parameters, e.g. {'fixture_id': 'par1'}
+    headers: Mapping[str, str]
+    payload: Dict[str, Any]  # JSON body (empty for GET)
+
+
+class ApiResponse(NamedTuple):
+    """A complete response; the server adds Content-Length and CORS headers"""
+    status: int = 200
+    body: bytes = b"{}"
+    content_type: str = "application/json"
+    headers: Tuple[Tuple[str, str], ...] = ()
+
+
+CORS_PREFLIGHT = ApiResponse(204, headers=(
+    ("Access-Control-Allow-Methods", "GET, POST, OPTIONS"),
+    ("Access-Control-Allow-Headers", "Content-Type"),
+))
+
+
+def json_response(data: Any, status: int = 200) -> ApiResponse:
+    return ApiResponse(status, json.dumps(data).encode("utf-8"))
+
+
+class Router:
+    """Method + path pattern -> handler table, compiled once at startup"""
+
+    PARAM = re.compile(r"\{(\w+)\}")
+
+    def __init__(self):
+        self._routes: Dict[str, List[Tuple[Pattern, Callable[[ApiRequest], ApiResponse]]]] = {}
+
+    def add(self, method: str, path: str, handler: Callable[[ApiRequest], ApiResponse]):
+        """
+        Register a handler
+
+        Args:
+            method: HTTP method ('GET', 'POST')
+            path: Path with optional {name} segments, e.g. '/api/fixture/{fixture_id}/color'
+            handler: Called with an ApiRequest, returns an ApiResponse
+        """
+        pattern = self.PARAM.sub(r"(?P<\1>[^/]+)", re.escape(path).replace(r"\{", "{").replace(r"\}", "}"))
+        self._routes.setdefault(method, []).append((re.compile(pattern + "$"), handler))
+
+    def match(self, method: str, path: str) -> Optional[Tuple[Callable[[ApiRequest], ApiResponse], Dict[str, str]]]:
+        """Find the handler and decoded path parameters for a request"""
+        for pattern, handler in self._routes.get(method, ()):
+            m = pattern.match(path)
+            if m:
+                return handler, {name: unquote(value) for name, value in m.groupdict().items()}
+        return None
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison, RFC 7232)
+
+    Args:
+        if_none_match: Header value: '*' or a comma-separated list of (possibly W/-prefixed) ETags
+        etag: Current ETag of the resource
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Serialized JSON response bodies cached per version.
+
+    Each entry is built once per version of its source data (fixture state version,
+    color reload counter, config file mtime) and then served as-is to every client,
+    together with an ETag derived from the body so unchanged data can be answered
+    with 304 Not Modified.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Hashable, bytes, str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, version: Hashable, build: Callable[[], Any]) -> Tuple[bytes, str]:
+        """
+        Get the body and ETag for key at version, serializing build() on a miss
+
+        Args:
+            key: Cache entry name (e.g. 'states')
+            version: Version of the source data; any change rebuilds the entry
+            build: Returns the JSON-serializable response data
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1], entry[2]
+        body = json.dumps(build()).encode("utf-8")
+        etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        with self._lock:
+            self._entries[key] = (version, body, etag)
+            self.misses += 1
+        return body, etag
+
+    def invalidate(self, key: str):
+        """Drop an entry (after writing its source)"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+def _file_version(path: str) -> Tuple[int, int]:
+    """Cache version of a file: modification time and size"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load_json_file(path: str) -> Any:
+    with open(path, 'r') as f:
+        return json.load(f)
 
 
 class HttpApiServer:
     """Threaded HTTP server exposing a JSON API and serving the generated UI."""
 
-    def __init__(self, fixture_manager, ui_dir: Path, host: str = "0.0.0.0", port: int = 5000, color_fx=None, move_fx=None):
+    def __init__(self, fixture_manager, ui_dir: Path, host: str = "0.0.0.0", port: int = 5000, color_fx=None, move_fx=None,
+                 cue_store=None, cue_list=None):
         self.fixture_manager = fixture_manager
         self.ui_dir = ui_dir
         self.host = host
         self.port = port
         self.color_fx = color_fx
         self.move_fx = move_fx
+        self.cue_store = cue_store
+        self.cue_list = cue_list
         self._server = None
         self._thread = None
-        self._flash_saved_states = None  # Store states before flash
+        self.live_state = LiveStateHub(fixture_manager, color_fx, move_fx)
+        self.cache = ResponseCache()
+        self.fader_input = FaderInput(fixture_manager)
+        self.router = self._build_routes()
 
     def start(self):
         """Start the HTTP server in a background thread."""
@@ -32,27 +184,60 @@ class HttpApiServer:
         self._server = ThreadingHTTPServer((self.host, self.port), handler)
         self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
         self._thread.start()
-        print(f"HTTP UI/API: http://{self.host}:{self.port}")
+        print(f"HTTP UI/API: http://{self.host}:{self._server.server_address[1]}")
 
     def stop(self):
         """Stop the HTTP server."""
         if self._server:
             self._server.shutdown()
             self._server.server_close()
+            self.fader_input.close()
             print("HTTP UI/API: Stopped")
 
+    def handle(self, method: str, target: str, headers: Mapping[str, str], payload: Dict[str, Any]) -> ApiResponse:
+        """
+        Dispatch one request through the route table
+
+        Args:
+            method: HTTP method
+            target: Request target as sent by the client (path and optional query string)
+            headers: Request headers (case-insensitive mapping)
+            payload: Parsed JSON body
+        """
+        path = urlsplit(target).path
+        match = self.router.match(method, path)
+        if match is None:
+            if method == "GET":
+                return self._serve_file(path)
+            return ApiResponse(404)
+        handler, params = match
+        try:
+            return handler(ApiRequest(method, path, params, headers, payload))
+        except Exception as exc:  # keep API resilient
+            return json_response({"error": str(exc)}, 400)
+
     def _make_handler(self):
-        fixture_manager = self.fixture_manager
-        ui_dir = self.ui_dir
-        color_fx = self.color_fx
-        move_fx = self.move_fx
+        api = self
+        live_state = self.live_state
 
         class Handler(BaseHTTPRequestHandler):
-            def _set_headers(self, status: int = 200, content_type: str = "application/json"):
-                self.send_response(status)
-                self.send_header("Content-Type", content_type)
+            # Keep-alive: a fader drag reuses one connection instead of opening one per value
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; without TCP_NODELAY the body waits for the delayed ACK
+            disable_nagle_algorithm = True
+
+            def _send(self, response: ApiResponse):
+                self.send_response(response.status)
                 self.send_header("Access-Control-Allow-Origin", "*")
+                for name, value in response.headers:
+                    self.send_header(name, value)
+                if response.status in (204, 304):
+                    self.end_headers()
+                    return
+                self.send_header("Content-Type", response.content_type)
+                self.send_header("Content-Length", str(len(response.body)))
                 self.end_headers()
+                self.wfile.write(response.body)
 
             def _read_json(self) -> Dict[str, Any]:
                 length = int(self.headers.get("Content-Length", "0"))
@@ -64,363 +249,547 @@ class HttpApiServer:
                 except Exception:
                     return {}
 
-            def do_OPTIONS(self):
-                self.send_response(204)
+            def _stream_events(self):
+                """Server-Sent Events: full state once, then coalesced deltas as they happen"""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
                 self.send_header("Access-Control-Allow-Origin", "*")
-                self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
-                self.send_header("Access-Control-Allow-Headers", "Content-Type")
+                # The stream has no length; it ends when the connection does
+                self.send_header("Connection", "close")
                 self.end_headers()
+                self.close_connection = True
 
-            def do_GET(self):
-                if self.path.startswith("/api/fixtures"):
-                    fixtures = []
-                    for fid, data in fixture_manager.fixtures.items():
-                        fixtures.append(
-                            {
-                                "id": fid,
-                                "type": data["type"],
-                                "universe": data["universe"],
-                                "start_address": data["start_address"],
-                                "channels": data["config"].get("channels", []),
-                            }
-                        )
-                    self._set_headers()
-                    self.wfile.write(json.dumps({"fixtures": fixtures}).encode("utf-8"))
-                    return
-
-                if self.path.startswith("/api/states"):
-                    states = {}
-                    for fid, data in fixture_manager.fixtures.items():
-                        states[fid] = data.get("state", {})
-                    self._set_headers()
-                    self.wfile.write(json.dumps(states).encode("utf-8"))
-                    return
-
-                if self.path.startswith("/api/colors"):
-                    from color_manager import COLORS
-                    self._set_headers()
-                    self.wfile.write(json.dumps(COLORS).encode("utf-8"))
-                    return
-
-                if self.path.startswith("/api/fx/status") and color_fx:
-                    self._set_headers()
-                    self.wfile.write(json.dumps(color_fx.get_status()).encode("utf-8"))
-                    return
-
-                if self.path.startswith("/api/grandmaster"):
-                    self._set_headers()
-                    self.wfile.write(json.dumps({"level": fixture_manager.dmx.grandmaster}).encode("utf-8"))
-                    return
-
-                if self.path.startswith("/api/fx/bpm") and color_fx:
-                    self._set_headers()
-                    self.wfile.write(json.dumps({"bpm": color_fx.bpm}).encode("utf-8"))
-                    return
-
-                if self.path.startswith("/api/fx/fadetime") and color_fx:
-                    self._set_headers()
-                    self.wfile.write(json.dumps({"fade_percentage": color_fx.fade_percentage}).encode("utf-8"))
-                    return
-
-                if self.path.startswith("/api/move/state") and move_fx:
-                    self._set_headers()
-                    state = {
-                        "center_pan": move_fx.center_pan,
-                        "center_tilt": move_fx.center_tilt,
-                        "fx_size": move_fx.fx_size,
-                        "move_phase": move_fx.move_phase,
-                        "bpm": move_fx.bpm,
-                        "move_speed_multiplier": move_fx.move_speed_multiplier
-                    }
-                    self.wfile.write(json.dumps(state).encode("utf-8"))
-                    return
-
-                if self.path.startswith("/api/config/artnet"):
-                    config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'artnet.json')
-                    try:
-                        with open(config_path, 'r') as f:
-                            config = json.load(f)
-                        self._set_headers()
-                        self.wfile.write(json.dumps(config).encode("utf-8"))
-                    except Exception as e:
-                        self._set_headers(500)
-                        self.wfile.write(json.dumps({"error": str(e)}).encode("utf-8"))
-                    return
+                version, state = live_state.subscribe()
+                try:
+                    self.wfile.write(f"id: {version}\nevent: snapshot\ndata: {state}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    while True:
+                        deltas = live_state.wait_for(version, timeout=15)
+                        if deltas is None:
+                            # Fell behind the kept history: resync with a full state
+                            version, state = live_state.get_state()
+                            chunk = f"id: {version}\nevent: snapshot\ndata: {state}\n\n"
+                        elif not deltas:
+                            chunk = ": keepalive\n\n"  # Comment line, also detects closed connections
+                        else:
+                            version = deltas[-1][0]
+                            chunk = "".join(f"id: {v}\nevent: delta\ndata: {payload}\n\n" for v, payload in deltas)
+                        self.wfile.write(chunk.encode("utf-8"))
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError, OSError):
+                    pass  # Client went away
+                finally:
+                    live_state.unsubscribe()
 
-                if self.path.startswith("/api/config/colors"):
-                    config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'colors.json')
-                    try:
-                        with open(config_path, 'r') as f:
-                            config = json.load(f)
-                        self._set_headers()
-                        self.wfile.write(json.dumps(config).encode("utf-8"))
-                    except Exception as e:
-                        self._set_headers(500)
-                        self.wfile.write(json.dumps({"error": str(e)}).encode("utf-8"))
-                    return
+            def do_OPTIONS(self):
+                self._send(CORS_PREFLIGHT)
 
-                # Serve index.html for root
-                if self.path in ["/", "/index.html"]:
-                    index_path = ui_dir / "index.html"
-                    if index_path.exists():
-                        data = index_path.read_bytes()
-                        self._set_headers(content_type="text/html; charset=utf-8")
-                        self.wfile.write(data)
-                    else:
-                        self._set_headers(404)
-                        self.wfile.write(b"Not found")
+            def do_GET(self):
+                if urlsplit(self.path).path == "/api/events":
+                    self._stream_events()
                     return
-
-                # Serve static files if any
-                requested = (ui_dir / self.path.lstrip("/ ")).resolve()
-                try:
-                    if ui_dir in requested.parents and requested.is_file():
-                        mime = "text/plain"
-                        if requested.suffix == ".js":
-                            mime = "application/javascript"
-                        elif requested.suffix == ".css":
-                            mime = "text/css"
-                        elif requested.suffix == ".html":
-                            mime = "text/html; charset=utf-8"
-                        data = requested.read_bytes()
-                        self._set_headers(content_type=mime)
-                        self.wfile.write(data)
-                        return
-                except Exception:
-                    pass
-
-                self._set_headers(404)
-                self.wfile.write(b"Not found")
+                self._send(api.handle("GET", self.path, self.headers, {}))
 
             def do_POST(self):
-                path = self.path
                 payload = self._read_json()
+                self._send(api.handle("POST", self.path, self.headers, payload))
 
-                try:
-                    if path.startswith("/api/fixture/") and "/channel/" in path:
-                        parts = path.split("/")
-                        fixture_id = parts[3]
-                        channel_name = parts[5]
-                        value = float(payload.get("value", 0))
-                        fixture_manager.set_fixture_channel(fixture_id, channel_name, value)
-                        self._set_headers()
-                        self.wfile.write(b"{}")
-                        return
-
-                    if path.startswith("/api/fixture/") and path.endswith("/color"):
-                        fixture_id = path.split("/")[3]
-                        r = float(payload.get("r", 0))
-                        g = float(payload.get("g", 0))
-                        b = float(payload.get("b", 0))
-                        w = float(payload.get("w", 0))
-                        fixture_manager.set_fixture_color(fixture_id, r, g, b, w)
-                        self._set_headers()
-                        self.wfile.write(b"{}")
-                        return
-
-                    if path.startswith("/api/fixture/") and path.endswith("/dimmer"):
-                        fixture_id = path.split("/")[3]
-                        value = float(payload.get("value", 0))
-                        fixture_manager.set_fixture_dimmer(fixture_id, value, manual=True)
-                        self._set_headers()
-                        self.wfile.write(b"{}")
-                        return
-
-                    if path == "/api/grandmaster":
-                        level = float(payload.get("level", 1.0))
-                        fixture_manager.dmx.set_grandmaster(level)
-                        fixture_manager.reapply_all_states()
-                        self._set_headers()
-                        self.wfile.write(b"{}")
-                        return
-
-                    if path == "/api/blackout":
-                        fixture_manager.blackout_all()
-                        self._set_headers()
-                        self.wfile.write(b"{}")
-                        return
-
-                    if path == "/api/all/color":
-                        r = float(payload.get("r", 0))
-                        g = float(payload.get("g", 0))
-                        b = float(payload.get("b", 0))
-                        w = float(payload.get("w", 0))
-                        for fixture_id in fixture_manager.list_fixtures():
-                            fixture_manager.set_fixture_color(fixture_id, r, g, b, w)
-                        
-                        # Update color_fx current_colors to match the applied color (single color)
-                        if color_fx:
-                            from src.color_manager import COLORS
-                            # Find matching color name
-                            for color_name, color_vals in COLORS.items():
-                                if (abs(color_vals.get('r', 0) - r) < 0.01 and
-                                    abs(color_vals.get('g', 0) - g) < 0.01 and
-                                    abs(color_vals.get('b', 0) - b) < 0.01 and
-                                    abs(color_vals.get('w', 0) - w) < 0.01):
-                                    color_fx.current_colors = [color_name]
-                                    break
-                        
-                        self._set_headers()
-                        self.wfile.write(b"{}")
-                        return
-
-                    if path == "/api/fx/start" and color_fx:
-                        fx_name = payload.get("fx", "random")
-                        color_fx.start_fx(fx_name)
-                        self._set_headers()
-                        self.wfile.write(json.dumps(color_fx.get_status()).encode("utf-8"))
-                        return
-
-                    if path == "/api/fx/stop" and color_fx:
-                        color_fx.stop_fx()
-                        self._set_headers()
-                        self.wfile.write(json.dumps(color_fx.get_status()).encode("utf-8"))
-                        return
-
-                    if path == "/api/fx/bpm":
-                        bpm = int(payload.get("bpm", 120))
-                        if color_fx:
-                            color_fx.set_bpm(bpm)
-                        if move_fx:
-                            move_fx.set_bpm(bpm)
-                        self._set_headers()
-                        response = {"bpm": bpm}
-                        if color_fx:
-                            response.update(color_fx.get_status())
-                        self.wfile.write(json.dumps(response).encode("utf-8"))
-                        return
-
-                    if path == "/api/fx/fadetime" and color_fx:
-                        # Receive percentage from frontend (0.0-1.0)
-                        fade_percentage = float(payload.get("fade_percentage", 0.0))
-                        color_fx.set_fade_percentage(fade_percentage)
-                        self._set_headers()
-                        self.wfile.write(json.dumps(color_fx.get_status()).encode("utf-8"))
-                        return
-
-                    if path == "/api/config/artnet":
-                        config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'artnet.json')
-                        try:
-                            # Write the entire config
-                            with open(config_path, 'w') as f:
-                                json.dump(payload, f, indent=2)
-                            
-                            # Reload DMX controller configuration
-                            try:
-                                fixture_manager.dmx.reload_config(config_path)
-                            except Exception as reload_error:
-                                print(f"Warning: Failed to reload DMX config: {reload_error}")
-                            
-                            self._set_headers()
-                            self.wfile.write(json.dumps({"success": True, "reloaded": True}).encode("utf-8"))
-                        except Exception as e:
-                            self._set_headers(500)
-                            self.wfile.write(json.dumps({"error": str(e)}).encode("utf-8"))
-                        return
-
-                    if path == "/api/config/colors":
-                        config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'colors.json')
-                        try:
-                            # Write the entire config
-                            with open(config_path, 'w') as f:
-                                json.dump(payload, f, indent=2)
-                            
-                            # Reload colors in the color manager
-                            try:
-                                from color_manager import reload_colors
-                                reload_colors()
-                            except Exception as reload_error:
-                                print(f"Warning: Failed to reload colors: {reload_error}")
-                            
-                            self._set_headers()
-                            self.wfile.write(json.dumps({"success": True, "reloaded": True}).encode("utf-8"))
-                        except Exception as e:
-                            self._set_headers(500)
-                            self.wfile.write(json.dumps({"error": str(e)}).encode("utf-8"))
-                        return
-                    
-                    if path == "/api/move/center":
-                        pan = payload.get("pan", 0.5)
-                        tilt = payload.get("tilt", 0.5)
-                        if move_fx:
-                            move_fx.set_center(pan, tilt)
-                        self._set_headers()
-                        self.wfile.write(json.dumps({"success": True, "pan": pan, "tilt": tilt}).encode("utf-8"))
-                        return
-                    
-                    if path == "/api/move/fx_size":
-                        size = payload.get("size", 0.3)
-                        if move_fx:
-                            move_fx.set_fx_size(size)
-                        self._set_headers()
-                        self.wfile.write(json.dumps({"success": True, "size": size}).encode("utf-8"))
-                        return
-                    
-                    if path == "/api/move/phase":
-                        phase = payload.get("phase", 0.0)
-                        if move_fx:
-                            move_fx.set_move_phase(phase)
-                        self._set_headers()
-                        self.wfile.write(json.dumps({"success": True, "phase": phase}).encode("utf-8"))
-                        return
-                    
-                    if path == "/api/move/speed":
-                        multiplier = payload.get("multiplier", 1.0)
-                        if move_fx:
-                            move_fx.set_move_speed(multiplier)
-                        self._set_headers()
-                        self.wfile.write(json.dumps({"success": True, "multiplier": multiplier}).encode("utf-8"))
-                        return
-                    
-                    if path == "/api/move/fx":
-                        fx_type = payload.get("fx", "off")
-                        if move_fx:
-                            move_fx.start_fx(fx_type)
-                            self._set_headers()
-                            self.wfile.write(json.dumps(move_fx.get_status()).encode("utf-8"))
-                        else:
-                            # Fallback if move_fx not initialized
-                            if fx_type == "off":
-                                fixture_manager.set_all_moving_positions("front")
-                            self._set_headers()
-                            self.wfile.write(json.dumps({"success": True}).encode("utf-8"))
-                        return
-                    
-                    if path == "/api/flash/on":
-                        # Pause color FX engine if running
-                        if color_fx:
-                            color_fx.flash_active = True
-                        # Save current states and activate flash
-                        self.server._flash_saved_states = fixture_manager.save_current_states()
-                        fixture_manager.flash_all_white()
-                        self._set_headers()
-                        self.wfile.write(json.dumps({"success": True}).encode("utf-8"))
-                        return
-                    
-                    if path == "/api/flash/off":
-                        # Resume color FX engine
-                        if color_fx:
-                            color_fx.flash_active = False
-                        # Restore saved states or blackout if no states were saved
-                        if self.server._flash_saved_states and any(self.server._flash_saved_states.values()):
-                            fixture_manager.restore_states(self.server._flash_saved_states)
-                            self.server._flash_saved_states = None
-                        else:
-                            # No saved states (fixtures not configured or no previous state) - blackout
-                            fixture_manager.blackout_all()
-                            self.server._flash_saved_states = None
-                        self._set_headers()
-                        self.wfile.write(json.dumps({"success": True}).encode("utf-8"))
-                        return
-                except Exception as exc:  # keep API resilient
-                    self._set_headers(400)
-                    self.wfile.write(json.dumps({"error": str(exc)}).encode("utf-8"))
-                    return
+        return Handler
 
-                self._set_headers(404)
-                self.wfile.write(b"{}")
+    def _build_routes(self) -> Router:
+        router = Router()
+        color_fx = self.color_fx
+        move_fx = self.move_fx
+        cue_store = self.cue_store
+        cue_list = self.cue_list
+
+        router.add("GET", "/api/fixtures", self._get_fixtures)
+        router.add("GET", "/api/states", self._get_states)
+        router.add("GET", "/api/colors", self._get_colors)
+        router.add("GET", "/api/groups", self._get_groups)
+        router.add("GET", "/api/grandmaster", self._get_grandmaster)
+        router.add("GET", "/api/dmx/stats", self._get_dmx_stats)
+        router.add("GET", "/api/dmx/timing", self._get_dmx_timing)
+        router.add("GET", "/api/config/{name}", self._get_config)
+        if color_fx:
+            router.add("GET", "/api/fx/status", self._get_fx_status)
+            router.add("GET", "/api/fx/bpm", self._get_bpm)
+            router.add("GET", "/api/fx/fadetime", self._get_fadetime)
+        if move_fx:
+            router.add("GET", "/api/move/state", self._get_move_state)
+        if cue_store:
+            router.add("GET", "/api/cues", self._get_cues)
+            router.add("GET", "/api/cues/status", self._get_cue_status)
+        if cue_list:
+            router.add("GET", "/api/cuelists", self._get_cue_lists)
+            router.add("GET", "/api/cuelists/status", self._get_cue_list_status)
+
+        router.add("POST", "/api/fixture/{fixture_id}/channel/{channel}", self._set_channel)
+        router.add("POST", "/api/fixture/{fixture_id}/color", self._set_color)
+        router.add("POST", "/api/fixture/{fixture_id}/dimmer", self._set_dimmer)
+        router.add("POST", "/api/group/{group}/channel/{channel}", self._set_group_channel)
+        router.add("POST", "/api/grandmaster", self._set_grandmaster)
+        router.add("POST", "/api/dmx/fps", self._set_fps)
+        router.add("POST", "/api/blackout", self._blackout)
+        router.add("POST", "/api/all/color", self._set_all_color)
+        router.add("POST", "/api/bulk", self._bulk_write)
+        if color_fx:
+            router.add("POST", "/api/fx/start", self._start_fx)
+            router.add("POST", "/api/fx/stop", self._stop_fx)
+            router.add("POST", "/api/fx/fadetime", self._set_fadetime)
+        router.add("POST", "/api/fx/bpm", self._set_bpm)
+        router.add("POST", "/api/config/artnet", self._save_artnet_config)
+        router.add("POST", "/api/config/colors", self._save_colors_config)
+        router.add("POST", "/api/move/center", self._set_move_center)
+        router.add("POST", "/api/move/fx_size", self._set_move_fx_size)
+        router.add("POST", "/api/move/phase", self._set_move_phase)
+        router.add("POST", "/api/move/speed", self._set_move_speed)
+        router.add("POST", "/api/move/fx", self._start_move_fx)
+        router.add("POST", "/api/flash/on", self._flash_on)
+        router.add("POST", "/api/flash/off", self._flash_off)
+        if cue_store:
+            router.add("POST", "/api/cue/{name}/save", self._save_cue)
+            router.add("POST", "/api/cue/{name}/go", self._go_cue)
+            router.add("POST", "/api/cue/{name}/delete", self._delete_cue)
+            router.add("POST", "/api/cues/stop", self._stop_cue_fade)
+        if cue_list:
+            router.add("POST", "/api/cuelists/go", self._cue_list_go)
+            router.add("POST", "/api/cuelists/back", self._cue_list_back)
+            router.add("POST", "/api/cuelists/release", self._cue_list_release)
+            router.add("POST", "/api/cuelist/{name}", self._save_cue_list)
+            router.add("POST", "/api/cuelist/{name}/go", self._cue_list_go)
+            router.add("POST", "/api/cuelist/{name}/goto", self._cue_list_goto)
+            router.add("POST", "/api/cuelist/{name}/delete", self._delete_cue_list)
+        return router
+
+    def _cached(self, request: ApiRequest, key: str, version, build) -> ApiResponse:
+        """Serve a cached JSON body, or 304 if the client already has this ETag"""
+        body, etag = self.cache.get(key, version, build)
+        if etag_matches(request.headers.get("If-None-Match", ""), etag):
+            return ApiResponse(304, b"", headers=(("ETag", etag),))
+        return ApiResponse(200, body, headers=(("ETag", etag), ("Cache-Control", "no-cache")))  # Always revalidate
+
+    def _serve_file(self, path: str) -> ApiResponse:
+        """Serve index.html for the root and static files from the UI directory"""
+        if path in ["/", "/index.html"]:
+            index_path = self.ui_dir / "index.html"
+            if index_path.exists():
+                return ApiResponse(200, index_path.read_bytes(), "text/html; charset=utf-8")
+            return ApiResponse(404, b"Not found")
+
+        requested = (self.ui_dir / unquote(path).lstrip("/ ")).resolve()
+        try:
+            if self.ui_dir in requested.parents and requested.is_file():
+                return ApiResponse(200, requested.read_bytes(), STATIC_TYPES.get(requested.suffix, "text/plain"))
+        except Exception:
+            pass
+        return ApiResponse(404, b"Not found")
+
+    # GET handlers
+
+    def _get_fixtures(self, request: ApiRequest) -> ApiResponse:
+        # The patch is fixed for the lifetime of the fixture manager
+        fixture_manager = self.fixture_manager
+        return self._cached(request, "fixtures", id(fixture_manager), lambda: generate_fixture_summary(fixture_manager))
+
+    def _get_states(self, request: ApiRequest) -> ApiResponse:
+        fixtures = self.fixture_manager.fixtures
+        return self._cached(request, "states", self.fixture_manager.state_version, lambda: {
+            fid: dict(data.get("state", {})) for fid, data in list(fixtures.items())
+        })
+
+    def _get_colors(self, request: ApiRequest) -> ApiResponse:
+        return self._cached(request, "colors", color_manager.colors_version(), lambda: color_manager.COLORS)
+
+    def _get_groups(self, request: ApiRequest) -> ApiResponse:
+        # Groups are resolved once when the patch is loaded
+        groups = self.fixture_manager.groups
+        return self._cached(request, "groups", id(groups), lambda: {
+            name: {"fixtures": list(group.fixtures), "channels": sorted(group.channels)}
+            for name, group in groups.items()
+        })
+
+    def _get_grandmaster(self, request: ApiRequest) -> ApiResponse:
+        return json_response({"level": self.fixture_manager.dmx.grandmaster})
+
+    def _get_dmx_stats(self, request: ApiRequest) -> ApiResponse:
+        stats = self.fixture_manager.dmx.get_output_stats()
+        stats["fader_input"] = self.fader_input.get_stats()
+        return json_response(stats)
+
+    def _get_dmx_timing(self, request: ApiRequest) -> ApiResponse:
+        return json_response(self.fixture_manager.dmx.get_timing_stats())
+
+    def _get_config(self, request: ApiRequest) -> ApiResponse:
+        name = request.params["name"]
+        if name not in ("artnet", "colors"):
+            return ApiResponse(404, b"Not found")
+        config_path = os.path.join(CONFIG_DIR, f"{name}.json")
+        try:
+            return self._cached(request, f"config/{name}", _file_version(config_path),
+                                lambda: _load_json_file(config_path))
+        except Exception as e:
+            return json_response({"error": str(e)}, 500)
+
+    def _get_fx_status(self, request: ApiRequest) -> ApiResponse:
+        return json_response(self.color_fx.get_status())
+
+    def _get_bpm(self, request: ApiRequest) -> ApiResponse:
+        return json_response({"bpm": self.color_fx.bpm})
+
+    def _get_fadetime(self, request: ApiRequest) -> ApiResponse:
+        return json_response({"fade_percentage": self.color_fx.fade_percentage})
+
+    def _get_move_state(self, request: ApiRequest) -> ApiResponse:
+        move_fx = self.move_fx
+        return json_response({
+            "center_pan": move_fx.center_pan,
+            "center_tilt": move_fx.center_tilt,
+            "fx_size": move_fx.fx_size,
+            "move_phase": move_fx.move_phase,
+            "bpm": move_fx.bpm,
+            "move_speed_multiplier": move_fx.move_speed_multiplier
+        })
+
+    # POST handlers
+
+    def _set_channel(self, request: ApiRequest) -> ApiResponse:
+        fixture_id, channel_name = request.params["fixture_id"], request.params["channel"]
+        value = float(request.payload.get("value", 0))
+        if not self.fixture_manager.has_channel(fixture_id, channel_name):
+            return json_response({"error": f"Channel '{channel_name}' not found in fixture '{fixture_id}'"}, 404)
+        # Applied with the next frame; newer values for the same channel replace this one
+        self.fader_input.set_channel(fixture_id, channel_name, value)
+        return ApiResponse()
+
+    def _set_color(self, request: ApiRequest) -> ApiResponse:
+        payload = request.payload
+        r = float(payload.get("r", 0))
+        g = float(payload.get("g", 0))
+        b = float(payload.get("b", 0))
+        w = float(payload.get("w", 0))
+        self.fixture_manager.set_fixture_color(request.params["fixture_id"], r, g, b, w)
+        return ApiResponse()
+
+    def _set_dimmer(self, request: ApiRequest) -> ApiResponse:
+        fixture_id = request.params["fixture_id"]
+        value = float(request.payload.get("value", 0))
+        if fixture_id not in self.fixture_manager.fixtures:
+            return json_response({"error": f"Fixture '{fixture_id}' not found"}, 404)
+        self.fader_input.set_dimmer(fixture_id, value)
+        return ApiResponse()
+
+    def _set_group_channel(self, request: ApiRequest) -> ApiResponse:
+        group_name, channel_name = request.params["group"], request.params["channel"]
+        value = float(request.payload.get("value", 0))
+        group = self.fixture_manager.get_group(group_name)
+        if group is None:
+            return json_response({"error": f"Group '{group_name}' not found"}, 404)
+        if channel_name not in group.channels:
+            return json_response({"error": f"No fixture in group '{group_name}' has channel '{channel_name}'"}, 404)
+        self.fader_input.set_group_channel(group_name, channel_name, value)
+        return ApiResponse()
+
+    def _set_grandmaster(self, request: ApiRequest) -> ApiResponse:
+        level = float(request.payload.get("level", 1.0))
+        # Applied to the intensity channels when the output layers are merged
+        self.fixture_manager.dmx.set_grandmaster(level)
+        return ApiResponse()
+
+    def _set_fps(self, request: ApiRequest) -> ApiResponse:
+        self.fixture_manager.dmx.set_fps(float(request.payload.get("fps", 44)))
+        return json_response({"fps": self.fixture_manager.dmx.fps})
+
+    def _blackout(self, request: ApiRequest) -> ApiResponse:
+        self.fixture_manager.blackout_all()
+        return ApiResponse()
+
+    def _set_all_color(self, request: ApiRequest) -> ApiResponse:
+        payload = request.payload
+        r = float(payload.get("r", 0))
+        g = float(payload.get("g", 0))
+        b = float(payload.get("b", 0))
+        w = float(payload.get("w", 0))
+        fixture_manager = self.fixture_manager
+        with fixture_manager.frame():
+            for fixture_id in fixture_manager.list_fixtures():
+                fixture_manager.set_fixture_color(fixture_id, r, g, b, w)
+
+        # Update color_fx current_colors to match the applied color (single color)
+        if self.color_fx:
+            # Find matching color name
+            for color_name, color_vals in color_manager.COLORS.items():
+                if (abs(color_vals.get('r', 0) - r) < 0.01 and
+                    abs(color_vals.get('g', 0) - g) < 0.01 and
+                    abs(color_vals.get('b', 0) - b) < 0.01 and
+                    abs(color_vals.get('w', 0) - w) < 0.01):
+                    self.color_fx.current_colors = [color_name]
+                    break
+        return ApiResponse()
+
+    def _bulk_write(self, request: ApiRequest) -> ApiResponse:
+        """
+        Apply many fixture writes as one frame.
+
+        Body, either a list of updates:
+            {"updates": [{"fixture": "par1", "values": {"red": 1.0, "dimmer": 0.5}},
+                         {"fixtures": ["par2", "par3"], "color": {"r": 0, "g": 0, "b": 1, "w": 0}},
+                         {"group": "movers", "values": {"dimmer": 1.0}}]}
+        or the compact matrix form (one row per fixture, or a single row for all of them):
+            {"fixtures": ["par1", "par2"], "channels": ["red", "blue"], "values": [[1.0, 0.0], [0.0, 1.0]]}
+
+        Targets are "fixture", "fixtures" or "group". Channels a fixture does not have are
+        skipped. Unknown fixtures or groups reject the whole batch before anything is written.
+        """
+        payload = request.payload
+        try:
+            if "updates" in payload:
+                updates = [(self._bulk_targets(update), update.get("values") or {}, update.get("color"))
+                           for update in payload["updates"]]
+            else:
+                fixture_ids = self._bulk_targets(payload)
+        except KeyError as e:
+            return json_response({"error": f"Unknown group: {e.args[0]}"}, 400)
+        if "updates" not in payload:
+            channels = payload.get("channels", [])
+            rows = payload.get("values", [])
+            if rows and not isinstance(rows[0], list):
+                rows = [rows] * len(fixture_ids)
+            if len(rows) != len(fixture_ids) or any(len(row) != len(channels) for row in rows):
+                return json_response({"error": "values must have one row per fixture and one value per channel"}, 400)
+            updates = [([fixture_id], dict(zip(channels, row)), None) for fixture_id, row in zip(fixture_ids, rows)]
+
+        fixtures = self.fixture_manager.fixtures
+        unknown = sorted({fid for fixture_ids, _, _ in updates for fid in fixture_ids if fid not in fixtures})
+        if unknown:
+            return json_response({"error": f"Unknown fixtures: {', '.join(unknown)}"}, 400)
+        # Convert everything up front so a bad value cannot leave the batch half applied
+        updates = [
+            (fixture_ids, {name: float(value) for name, value in values.items()},
+             tuple(float(color.get(key, 0)) for key in "rgbw") if color else None)
+            for fixture_ids, values, color in updates
+        ]
 
-        return Handler
+        fixture_manager = self.fixture_manager
+        written = skipped = 0
+        with fixture_manager.frame():
+            for fixture_ids, values, color in updates:
+                for fixture_id in fixture_ids:
+                    if color:
+                        fixture_manager.set_fixture_color(fixture_id, *color)
+                    for channel_name, value in values.items():
+                        if fixture_manager.has_channel(fixture_id, channel_name):
+                            fixture_manager.set_fixture_channel(fixture_id, channel_name, value)
+                            written += 1
+                        else:
+                            skipped += 1
+        return json_response({"updates": len(updates), "channels": written, "skipped": skipped})
+
+    def _bulk_targets(self, update: Dict[str, Any]) -> List[str]:
+        """Fixture ids addressed by a bulk update ('fixture', 'fixtures' or 'group'); KeyError for unknown groups"""
+        if "group" in update:
+            group = self.fixture_manager.get_group(update["group"])
+            if group is None:
+                raise KeyError(update["group"])
+            return list(group.fixtures)
+        if "fixture" in update:
+            return [update["fixture"]]
+        return list(update.get("fixtures", []))
+
+    def _start_fx(self, request: ApiRequest) -> ApiResponse:
+        self.color_fx.start_fx(request.payload.get("fx", "random"), request.payload.get("group"))
+        return json_response(self.color_fx.get_status())
+
+    def _stop_fx(self, request: ApiRequest) -> ApiResponse:
+        self.color_fx.stop_fx()
+        return json_response(self.color_fx.get_status())
+
+    def _set_bpm(self, request: ApiRequest) -> ApiResponse:
+        bpm = int(request.payload.get("bpm", 120))
+        if self.color_fx:
+            self.color_fx.set_bpm(bpm)
+        if self.move_fx:
+            self.move_fx.set_bpm(bpm)
+        response = {"bpm": bpm}
+        if self.color_fx:
+            response.update(self.color_fx.get_status())
+        return json_response(response)
+
+    def _set_fadetime(self, request: ApiRequest) -> ApiResponse:
+        # Receive percentage from frontend (0.0-1.0)
+        self.color_fx.set_fade_percentage(float(request.payload.get("fade_percentage", 0.0)))
+        return json_response(self.color_fx.get_status())
+
+    def _save_artnet_config(self, request: ApiRequest) -> ApiResponse:
+        config_path = os.path.join(CONFIG_DIR, 'artnet.json')
+        try:
+            # Write the entire config
+            with open(config_path, 'w') as f:
+                json.dump(request.payload, f, indent=2)
+            self.cache.invalidate("config/artnet")
+
+            # Reload DMX controller configuration
+            try:
+                self.fixture_manager.dmx.reload_config(config_path)
+            except Exception as reload_error:
+                print(f"Warning: Failed to reload DMX config: {reload_error}")
+
+            return json_response({"success": True, "reloaded": True})
+        except Exception as e:
+            return json_response({"error": str(e)}, 500)
+
+    def _save_colors_config(self, request: ApiRequest) -> ApiResponse:
+        config_path = os.path.join(CONFIG_DIR, 'colors.json')
+        try:
+            # Write the entire config
+            with open(config_path, 'w') as f:
+                json.dump(request.payload, f, indent=2)
+            self.cache.invalidate("config/colors")
+
+            # Reload colors in the color manager
+            try:
+                color_manager.reload_colors()
+                # Remap color wheel fixtures to the new color definitions
+                self.fixture_manager.rebuild_color_wheel_tables()
+            except Exception as reload_error:
+                print(f"Warning: Failed to reload colors: {reload_error}")
+
+            return json_response({"success": True, "reloaded": True})
+        except Exception as e:
+            return json_response({"error": str(e)}, 500)
+
+    def _set_move_center(self, request: ApiRequest) -> ApiResponse:
+        pan = request.payload.get("pan", 0.5)
+        tilt = request.payload.get("tilt", 0.5)
+        if self.move_fx:
+            self.move_fx.set_center(pan, tilt)
+        return json_response({"success": True, "pan": pan, "tilt": tilt})
+
+    def _set_move_fx_size(self, request: ApiRequest) -> ApiResponse:
+        size = request.payload.get("size", 0.3)
+        if self.move_fx:
+            self.move_fx.set_fx_size(size)
+        return json_response({"success": True, "size": size})
+
+    def _set_move_phase(self, request: ApiRequest) -> ApiResponse:
+        phase = request.payload.get("phase", 0.0)
+        if self.move_fx:
+            self.move_fx.set_move_phase(phase)
+        return json_response({"success": True, "phase": phase})
+
+    def _set_move_speed(self, request: ApiRequest) -> ApiResponse:
+        multiplier = request.payload.get("multiplier", 1.0)
+        if self.move_fx:
+            self.move_fx.set_move_speed(multiplier)
+        return json_response({"success": True, "multiplier": multiplier})
+
+    def _start_move_fx(self, request: ApiRequest) -> ApiResponse:
+        fx_type = request.payload.get("fx", "off")
+        if self.move_fx:
+            self.move_fx.start_fx(fx_type, request.payload.get("group"))
+            return json_response(self.move_fx.get_status())
+        # Fallback if move_fx not initialized
+        if fx_type == "off":
+            self.fixture_manager.set_all_moving_positions("front")
+        return json_response({"success": True})
+
+    def _flash_on(self, request: ApiRequest) -> ApiResponse:
+        # Overlay white on the flash layer; FX, cues and faders keep running underneath
+        self.fixture_manager.flash_all_white()
+        return json_response({"success": True})
+
+    def _flash_off(self, request: ApiRequest) -> ApiResponse:
+        # Dropping the flash layer shows the current output of the other layers again
+        self.fixture_manager.release_flash()
+        return json_response({"success": True})
+
+    def _get_cues(self, request: ApiRequest) -> ApiResponse:
+        return self._cached(request, "cues", self.cue_store.version, self.cue_store.list_cues)
+
+    def _get_cue_status(self, request: ApiRequest) -> ApiResponse:
+        return json_response(self.cue_store.get_status())
+
+    def _save_cue(self, request: ApiRequest) -> ApiResponse:
+        """
+        Store a cue. Body (all optional):
+            {"values": {"par1": {"red": 1.0}}}  explicit values, or
+            {"fixtures": ["par1"]} / {"group": "stage"}  record the current state of these fixtures (default: all)
+            {"fade": 2.0}  default crossfade time in seconds
+        """
+        payload = request.payload
+        fixture_ids = payload.get("fixtures")
+        if "group" in payload:
+            group = self.fixture_manager.get_group(payload["group"])
+            if group is None:
+                return json_response({"error": f"Unknown group: {payload['group']}"}, 400)
+            fixture_ids = group.fixtures
+        cue = self.cue_store.save_cue(request.params["name"], fixture_ids, payload.get("values"),
+                                      float(payload.get("fade", 0.0)))
+        return json_response({"success": True, "fixtures": len(cue.fixtures)})
+
+    def _go_cue(self, request: ApiRequest) -> ApiResponse:
+        fade = request.payload.get("fade")
+        if not self.cue_store.recall(request.params["name"], None if fade is None else float(fade)):
+            return json_response({"error": f"Cue '{request.params['name']}' not found"}, 404)
+        return json_response(self.cue_store.get_status())
+
+    def _delete_cue(self, request: ApiRequest) -> ApiResponse:
+        if not self.cue_store.delete_cue(request.params["name"]):
+            return json_response({"error": f"Cue '{request.params['name']}' not found"}, 404)
+        return json_response({"success": True})
+
+    def _stop_cue_fade(self, request: ApiRequest) -> ApiResponse:
+        self.cue_store.stop_fade()
+        return json_response(self.cue_store.get_status())
+
+    def _get_cue_lists(self, request: ApiRequest) -> ApiResponse:
+        return self._cached(request, "cuelists", self.cue_list.version, self.cue_list.list_lists)
+
+    def _get_cue_list_status(self, request: ApiRequest) -> ApiResponse:
+        return json_response(self.cue_list.get_status())
+
+    def _save_cue_list(self, request: ApiRequest) -> ApiResponse:
+        """
+        Store a cue list. Body:
+            {"steps": ["intro", {"cue": "verse", "fade_in": 2, "fade_out": 4, "wait": 0, "follow": 8}]}
+        """
+        steps = self.cue_list.save_list(request.params["name"], request.payload.get("steps", []))
+        return json_response({"success": True, "steps": len(steps)})
+
+    def _cue_list_go(self, request: ApiRequest) -> ApiResponse:
+        # /api/cuelists/go advances the active list, /api/cuelist/<name>/go a specific one
+        if not self.cue_list.go(request.params.get("name")):
+            return json_response({"error": "No next step", **self.cue_list.get_status()}, 409)
+        return json_response(self.cue_list.get_status())
+
+    def _cue_list_back(self, request: ApiRequest) -> ApiResponse:
+        if not self.cue_list.back():
+            return json_response({"error": "No previous step", **self.cue_list.get_status()}, 409)
+        return json_response(self.cue_list.get_status())
+
+    def _cue_list_goto(self, request: ApiRequest) -> ApiResponse:
+        # "step" is 1-based like the status, or a cue name
+        step = request.payload.get("step")
+        if step is None:
+            return json_response({"error": "step is required"}, 400)
+        if not isinstance(step, str):
+            try:
+                step = int(step) - 1
+            except (TypeError, ValueError):
+                return json_response({"error": "step must be a step number or a cue name"}, 400)
+        if not self.cue_list.goto(request.params["name"], step):
+            return json_response({"error": "Unknown cue list or step"}, 404)
+        return json_response(self.cue_list.get_status())
+
+    def _cue_list_release(self, request: ApiRequest) -> ApiResponse:
+        self.cue_list.release()
+        return json_response(self.cue_list.get_status())
+
+    def _delete_cue_list(self, request: ApiRequest) -> ApiResponse:
+        if not self.cue_list.delete_list(request.params["name"]):
+            return json_response({"error": f"Cue list '{request.params['name']}' not found"}, 404)
+        return json_response({"success": True})
 
 
 def generate_fixture_summary(fixture_manager) -> Dict[str, Any]:
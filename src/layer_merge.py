@@ -0,0 +1,162 @@
+"""
+Layer merge for LightGroove
+Per-universe output layers (manual, FX, cues, flash) merged HTP/LTP into the DMX buffer once per frame
+"""
+
+from typing import Dict, Iterable
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, used for the array merge
+    np = None
+
+# Built-in layer names
+MANUAL_LAYER = 'manual'
+COLOR_FX_LAYER = 'color_fx'
+MOVE_FX_LAYER = 'move_fx'
+CUE_LAYER = 'cue'
+FLASH_LAYER = 'flash'
+
+# Layer priority is stored above the write sequence in every ownership stamp, so one
+# comparison picks the highest priority first and the latest write within it
+PRIORITY_SHIFT = 48
+
+
+class LayerStack:
+    """
+    The output layers of one universe.
+
+    Every layer has a value and an ownership stamp per channel; stamp 0 means the layer
+    does not drive the channel. A stamp is (layer priority << PRIORITY_SHIFT) | write
+    sequence, taken once per frame transaction. merge() combines the layers per channel:
+        intensity channels (HTP): highest value of all layers driving the channel,
+            then scaled by the grandmaster
+        other channels (LTP): value of the layer with the highest stamp, i.e. the most
+            recent write within the highest priority
+    Channels no layer drives are 0. Not thread-safe; DMXUniverse calls it under its lock.
+    """
+
+    def __init__(self, layer_count: int = 1):
+        self.layer_count = 0
+        self._intensity_count = 0
+        if np is not None:
+            self.values = np.zeros((0, 512), dtype=np.uint8)
+            self.stamps = np.zeros((0, 512), dtype=np.int64)
+            self.intensity = np.zeros(512, dtype=bool)
+        else:
+            self.values = []
+            self.stamps = []
+            self.intensity = bytearray(512)
+        self.resize(layer_count)
+
+    def resize(self, layer_count: int):
+        """Add empty layers up to layer_count (layers are never removed)"""
+        added = layer_count - self.layer_count
+        if added <= 0:
+            return
+        if np is not None:
+            self.values = np.vstack((self.values, np.zeros((added, 512), dtype=np.uint8)))
+            self.stamps = np.vstack((self.stamps, np.zeros((added, 512), dtype=np.int64)))
+        else:
+            self.values += [bytearray(512) for _ in range(added)]
+            self.stamps += [[0] * 512 for _ in range(added)]
+        self.layer_count = layer_count
+
+    def set_intensity(self, addresses: Iterable[int]):
+        """Mark channels (1-512) as intensity: merged HTP and scaled by the grandmaster"""
+        for address in addresses:
+            self.intensity[address - 1] = True
+        self._intensity_count = int(sum(1 for flag in self.intensity if flag))
+
+    def write(self, layer: int, stamp: int, writes: Dict[int, int]):
+        """Set channel -> value (0-255) on a layer"""
+        values, stamps = self.values[layer], self.stamps[layer]
+        for channel, value in writes.items():
+            values[channel - 1] = value
+            stamps[channel - 1] = stamp
+
+    def write_range(self, layer: int, stamp: int, offset: int, data: bytes):
+        """Set consecutive channels from a 0-based offset on a layer"""
+        end = offset + len(data)
+        self.values[layer][offset:end] = data if np is None else np.frombuffer(bytes(data), dtype=np.uint8)
+        if np is not None:
+            self.stamps[layer, offset:end] = stamp
+        else:
+            self.stamps[layer][offset:end] = [stamp] * (end - offset)
+
+    def scatter(self, layer: int, stamp: int, addresses, values):
+        """Set values at (not necessarily consecutive) channels on a layer (see DMXUniverse.scatter)"""
+        if np is not None and isinstance(addresses, np.ndarray):
+            index = addresses - 1
+            self.values[layer, index] = values
+            self.stamps[layer, index] = stamp
+            return
+        layer_values, layer_stamps = self.values[layer], self.stamps[layer]
+        for channel, value in zip(addresses, values):
+            layer_values[channel - 1] = value
+            layer_stamps[channel - 1] = stamp
+
+    def read(self, layer: int, addresses):
+        """
+        Read back a layer at the given channels (1-512)
+
+        Returns:
+            (values, driven): DMX values and whether the layer drives each channel, as
+            numpy arrays for a numpy address array, lists otherwise
+        """
+        if np is not None and isinstance(addresses, np.ndarray):
+            index = addresses - 1
+            return self.values[layer, index], self.stamps[layer, index] != 0
+        layer_values, layer_stamps = self.values[layer], self.stamps[layer]
+        return ([layer_values[channel - 1] for channel in addresses],
+                [layer_stamps[channel - 1] != 0 for channel in addresses])
+
+    def clear(self, layer: int, intensity_only: bool = False):
+        """Release all channels (or only the intensity channels) of a layer"""
+        if np is not None:
+            mask = self.intensity if intensity_only else slice(None)
+            self.values[layer, mask] = 0
+            self.stamps[layer, mask] = 0
+            return
+        values, stamps = self.values[layer], self.stamps[layer]
+        for channel in range(512):
+            if not intensity_only or self.intensity[channel]:
+                values[channel] = 0
+                stamps[channel] = 0
+
+    def merge(self, grandmaster: float = 1.0) -> bytes:
+        """Merge all layers into one 512-channel frame"""
+        if np is not None:
+            return self._merge_arrays(grandmaster)
+        return self._merge_channels(grandmaster)
+
+    def _merge_arrays(self, grandmaster: float) -> bytes:
+        values, stamps = self.values, self.stamps
+        if self.layer_count == 1:
+            merged = values[0].copy()
+        else:
+            # LTP: per channel, the layer with the highest stamp
+            owner = stamps.argmax(axis=0)
+            merged = np.take_along_axis(values, owner[np.newaxis, :], axis=0)[0]
+        if self._intensity_count:
+            intensity = self.intensity
+            if self.layer_count > 1:
+                # HTP: undriven layers hold 0, so the highest value is the plain column maximum
+                merged[intensity] = values[:, intensity].max(axis=0)
+            if grandmaster < 1.0:
+                # Same rounding as int(value * grandmaster)
+                merged[intensity] = (merged[intensity] * grandmaster).astype(np.uint8)
+        return merged.tobytes()
+
+    def _merge_channels(self, grandmaster: float) -> bytes:
+        values, stamps, intensity = self.values, self.stamps, self.intensity
+        layers = range(self.layer_count)
+        merged = bytearray(512)
+        for channel in range(512):
+            if intensity[channel]:
+                value = max(values[layer][channel] for layer in layers)
+                merged[channel] = int(value * grandmaster) if grandmaster < 1.0 else value
+            else:
+                owner = max(layers, key=lambda layer: stamps[layer][channel])
+                merged[channel] = values[owner][channel]
+        return bytes(merged)
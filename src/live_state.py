@@ -0,0 +1,195 @@
+"""
+Live State Hub for LightGroove
+Samples the state shown in the UI and pushes coalesced deltas to Server-Sent Events clients
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class LiveStateHub:
+    """
+    Shared change feed for all connected UIs.
+
+    While at least one client is subscribed, a single sampler thread compares the
+    current state (fixture channels, FX status, BPM, grandmaster, move state) with
+    the last published one every `interval` seconds. Fixture channels are only copied
+    and compared when FixtureManager.state_version moved since the last sample. Changes
+    are published as one delta per sample with an increasing version number, serialized
+    once and handed to every client; when nothing changed nothing is sent. With no
+    clients the sampler stops. Threaded clients block in wait_for(); event-loop clients
+    register a listener that is called (from the sampler thread) for every new delta.
+    """
+
+    def __init__(self, fixture_manager, color_fx=None, move_fx=None, interval: float = 0.05, history: int = 256):
+        """
+        Args:
+            fixture_manager: FixtureManager whose fixture states are streamed
+            color_fx: ColorFXEngine (optional)
+            move_fx: MoveFXEngine (optional)
+            interval: Sampling period in seconds (coalescing window)
+            history: Number of deltas kept for clients that fall behind
+        """
+        self.fixture_manager = fixture_manager
+        self.color_fx = color_fx
+        self.move_fx = move_fx
+        self.interval = interval
+        self.version = 0
+        self._state: Dict = {}
+        self._states_version = -1  # FixtureManager.state_version the sampled fixture states belong to
+        self._deltas = deque(maxlen=history)  # (version, json payload)
+        self._cond = threading.Condition()
+        self._clients = 0
+        self._thread = None
+        self._listeners: List[Callable[[], None]] = []
+
+    def snapshot(self, include_states: bool = True) -> Dict:
+        """
+        Collect the current UI-visible state
+
+        Args:
+            include_states: Copy the fixture channel states (the expensive part)
+        """
+        state = {'grandmaster': self.fixture_manager.dmx.grandmaster}
+        if include_states:
+            state['states'] = {fid: dict(data.get('state', {})) for fid, data in list(self.fixture_manager.fixtures.items())}
+        if self.color_fx:
+            status = self.color_fx.get_status()
+            status['current_colors'] = list(status.get('current_colors') or [])
+            state['fx'] = status
+            state['bpm'] = self.color_fx.bpm
+        if self.move_fx:
+            state['move'] = {
+                'center_pan': self.move_fx.center_pan,
+                'center_tilt': self.move_fx.center_tilt,
+                'fx_size': self.move_fx.fx_size,
+                'move_phase': self.move_fx.move_phase,
+                'bpm': self.move_fx.bpm,
+                'move_speed_multiplier': self.move_fx.move_speed_multiplier,
+            }
+            state.setdefault('bpm', self.move_fx.bpm)
+        return state
+
+    @staticmethod
+    def diff(old: Dict, new: Dict) -> Dict:
+        """Get the changes from old to new; fixture states are compared per channel"""
+        delta = {}
+        for key, value in new.items():
+            if key == 'states':
+                changed = {}
+                old_states = old.get('states', {})
+                for fid, channels in value.items():
+                    old_channels = old_states.get(fid, {})
+                    fixture_delta = {ch: v for ch, v in channels.items() if old_channels.get(ch) != v}
+                    if fixture_delta:
+                        changed[fid] = fixture_delta
+                if changed:
+                    delta['states'] = changed
+            elif old.get(key) != value:
+                delta[key] = value
+        return delta
+
+    def subscribe(self) -> Tuple[int, str]:
+        """
+        Register a client and start sampling if it is the first one
+
+        Returns:
+            (version, full state as JSON) to send before the first delta
+        """
+        with self._cond:
+            self._clients += 1
+            if self._thread is None:
+                # First client: start from a fresh state so the snapshot is current
+                states_version = self.fixture_manager.state_version
+                state = self._safe_snapshot()
+                if state is not None:
+                    self._state, self._states_version = state, states_version
+                self._thread = threading.Thread(target=self._sample_loop, name="live-state", daemon=True)
+                self._thread.start()
+            return self.version, json.dumps(self._state)
+
+    def unsubscribe(self):
+        """Unregister a client; the sampler stops with the last one"""
+        with self._cond:
+            self._clients -= 1
+            self._cond.notify_all()
+
+    def add_listener(self, callback: Callable[[], None]):
+        """
+        Call callback (on the sampler thread, must not block) whenever a new delta is published
+
+        Used by event-loop clients, e.g. lambda: loop.call_soon_threadsafe(event.set)
+        """
+        with self._cond:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]):
+        """Stop calling a listener"""
+        with self._cond:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def wait_for(self, version: int, timeout: float) -> Optional[List[Tuple[int, str]]]:
+        """
+        Wait for deltas newer than version
+
+        Returns:
+            List of (version, JSON delta), empty on timeout, or None if the client fell
+            further behind than the kept history and needs a fresh snapshot
+        """
+        with self._cond:
+            if self.version == version:
+                self._cond.wait(timeout)
+            return self._deltas_since(version)
+
+    def deltas_since(self, version: int) -> Optional[List[Tuple[int, str]]]:
+        """Deltas newer than version without waiting (same results as wait_for)"""
+        with self._cond:
+            return self._deltas_since(version)
+
+    def _deltas_since(self, version: int) -> Optional[List[Tuple[int, str]]]:
+        if self.version == version:
+            return []
+        if not self._deltas or self._deltas[0][0] > version + 1:
+            return None
+        return [(v, payload) for v, payload in self._deltas if v > version]
+
+    def get_state(self) -> Tuple[int, str]:
+        """Get the current version and full state as JSON (for resyncing a client)"""
+        with self._cond:
+            return self.version, json.dumps(self._state)
+
+    def _safe_snapshot(self, include_states: bool = True) -> Optional[Dict]:
+        try:
+            return self.snapshot(include_states)
+        except RuntimeError:
+            # A state dict changed size while being copied; the next sample picks it up
+            return None
+
+    def _sample_loop(self):
+        while True:
+            time.sleep(self.interval)
+            # Read before copying, so a change made during the copy is picked up next time
+            states_version = self.fixture_manager.state_version
+            new_state = self._safe_snapshot(include_states=states_version != self._states_version)
+            with self._cond:
+                if self._clients <= 0:
+                    self._thread = None
+                    return
+                if new_state is None:
+                    continue
+                if 'states' in new_state:
+                    self._states_version = states_version
+                delta = self.diff(self._state, new_state)
+                if not delta:
+                    continue
+                self._state = {**self._state, **new_state}
+                self.version += 1
+                self._deltas.append((self.version, json.dumps(delta)))
+                self._cond.notify_all()
+                listeners = list(self._listeners)
+            for callback in listeners:
+                callback()
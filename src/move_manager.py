@@ -9,7 +9,142 @@ import math
 import json
 import os
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, effects fall back to per-fixture evaluation
+    np = None
+
+from layer_merge import MOVE_FX_LAYER
+
+
+# Effect shapes: pure functions of the cycle angle (radians) returning
+# unit pan/tilt offsets (-1.0..1.0) around the center position.
+# `xp` is the math module used: `math` for one fixture, `numpy` for all fixtures at once.
+
+def _shape_pan_sway(angle, xp=math):
+    """Pan sway - smooth left-right sine oscillation."""
+    return xp.sin(angle), angle * 0.0
+
+
+def _shape_tilt_sway(angle, xp=math):
+    """Tilt sway - smooth up-down sine oscillation (reduced amplitude)."""
+    return angle * 0.0, 0.7 * xp.sin(angle)
+
+
+def _shape_circle(angle, xp=math):
+    """Circle - continuous circular movement."""
+    return xp.cos(angle), xp.sin(angle)
+
+
+def _shape_eight(angle, xp=math):
+    """Figure-8 - lemniscate of Bernoulli pattern."""
+    denominator = 1 + xp.sin(angle) ** 2
+    return xp.cos(angle) / denominator, xp.sin(angle) * xp.cos(angle) / denominator
+
+
+def _shape_lissajous(angle, xp=math, freq_x=3, freq_y=2, phase_x=0, phase_y=math.pi/2):
+    """
+    Lissajous curve - complex mathematical patterns.
+    
+    Args:
+        freq_x: Frequency multiplier for pan (X-axis)
+        freq_y: Frequency multiplier for tilt (Y-axis)
+        phase_x: Phase offset for pan in radians
+        phase_y: Phase offset for tilt in radians
+    
+    Common patterns:
+    - freq_x=3, freq_y=2: Classic 3:2 Lissajous
+    - freq_x=5, freq_y=4: More complex pattern
+    - phase_y=π/2: Creates perpendicular motion
+    """
+    return xp.sin(freq_x * angle + phase_x), xp.sin(freq_y * angle + phase_y)
+
+
+def _shape_diamond(angle, xp=math):
+    """Diamond - square rotated 45 degrees, cubic power for sharp corners."""
+    return xp.cos(angle) ** 3, xp.sin(angle) ** 3
+
+
+# Effect name -> (shape function, beats per full cycle)
+MOVE_SHAPES: Dict[str, Tuple[Callable, int]] = {
+    'pan_sway': (_shape_pan_sway, 1),
+    'tilt_sway': (_shape_tilt_sway, 1),
+    'circle': (_shape_circle, 1),
+    'eight': (_shape_eight, 2),  # One full figure-8 takes 2 beats
+    'lissajous': (_shape_lissajous, 1),
+    'diamond': (_shape_diamond, 1),
+}
+
+
+def move_position(shape, cycle_phase: float, index: int, count: int, center_pan: float,
+                  center_tilt: float, fx_size: float, move_phase: float) -> Tuple[float, float]:
+    """
+    Evaluate an effect shape for one fixture.
+    
+    Args:
+        shape: Shape function from MOVE_SHAPES
+        cycle_phase: Position within the effect cycle (0.0-1.0)
+        index: Fixture index within the moving fixtures
+        count: Number of moving fixtures
+        center_pan, center_tilt: Effect center position (0.0-1.0)
+        fx_size: Effect size (0.0-1.0), full size is ±50% around center
+        move_phase: Phase spread across fixtures (0.0-1.0)
+    
+    Returns:
+        (pan, tilt) tuple, not clamped
+    """
+    phase_offset = (index / count) * move_phase if count > 1 else 0
+    x, y = shape((cycle_phase + phase_offset) * 2 * math.pi)
+    return center_pan + (fx_size * 0.5) * x, center_tilt + (fx_size * 0.5) * y
+
+
+class _MoveLayout:
+    """
+    Precomputed arrays for evaluating a move effect on all fixtures at once (numpy only).
+    
+    Per universe, holds the pan/tilt (and pan_fine/tilt_fine) DMX addresses of the
+    moving fixtures and which fixture each address belongs to, so one frame is a
+    few array ops plus one scatter write per universe.
+    """
+    
+    CHANNELS = ('pan', 'tilt', 'pan_fine', 'tilt_fine')
+    
+    def __init__(self, fixture_manager, fixtures: List[str]):
+        count = len(fixtures)
+        self.states = [fixture_manager.fixtures[fixture_id]['state'] for fixture_id in fixtures]
+        # Per-fixture phase spread factor, same as move_position()
+        self.phase_index = np.arange(count) / count if count > 1 else np.zeros(count)
+        # Fixtures with fine channels, for state updates: (fixture index, state)
+        self.pan_fine_states = []
+        self.tilt_fine_states = []
+        
+        # universe -> channel name -> ([fixture index], [address])
+        by_universe: Dict[int, Dict[str, Tuple[List[int], List[int]]]] = {}
+        for idx, fixture_id in enumerate(fixtures):
+            channels = fixture_manager.fixtures[fixture_id]['channels']
+            for name in self.CHANNELS:
+                channel = channels.get(name)
+                if channel is not None:
+                    indices, addresses = by_universe.setdefault(channel.universe, {}).setdefault(name, ([], []))
+                    indices.append(idx)
+                    addresses.append(channel.address)
+            if 'pan_fine' in channels:
+                self.pan_fine_states.append((idx, self.states[idx]))
+            if 'tilt_fine' in channels:
+                self.tilt_fine_states.append((idx, self.states[idx]))
+        
+        # universe -> (address array, fixture index array per channel in CHANNELS order)
+        self.universes = {}
+        for universe_id, names in by_universe.items():
+            addresses = []
+            indices = []
+            for name in self.CHANNELS:
+                name_indices, name_addresses = names.get(name, ([], []))
+                addresses.extend(name_addresses)
+                indices.append(np.array(name_indices, dtype=np.intp))
+            self.universes[universe_id] = (np.array(addresses, dtype=np.intp), indices)
 
 
 class MoveFXEngine:
@@ -26,6 +161,7 @@ class MoveFXEngine:
     - Continuous smooth motion without restart jumps
     - Real-time position adaptation
     - Multi-fixture support
+    - Frame-aligned evaluation on the DMX output clock (no per-effect threads)
     """
     
     def __init__(self, fixture_manager, state_file: str = None):
@@ -33,8 +169,15 @@ class MoveFXEngine:
         self.bpm = 20  # Default 20 BPM
         self.running = False
         self.current_fx = None
-        self.fx_thread = None
-        self.stop_event = threading.Event()
+        self.group = 'moving'  # Fixture group the effects run on (only members with pan/tilt move)
+        
+        # Render state, advanced once per DMX frame by _render()
+        self._render_lock = threading.Lock()
+        self._fixtures: List[str] = []  # Moving fixtures captured at effect start
+        self._cycle_phase = 0.0  # Position within the current effect cycle (0.0-1.0)
+        self._last_render: Optional[float] = None
+        self._layout: Optional[_MoveLayout] = None  # Address arrays for the vectorized path
+        self.vectorized = np is not None  # Evaluate all fixtures at once with numpy
         
         # Effect center position (X/Y pad controls)
         self.center_pan = 0.5  # Pan center (0.0-1.0)
@@ -68,6 +211,10 @@ class MoveFXEngine:
         # Load saved state
         self._load_state()
         
+        # Effects write to their own output layer on the DMX frame clock
+        self.fixture_manager.dmx.add_layer(MOVE_FX_LAYER)
+        self.fixture_manager.dmx.add_renderer(self._render)
+        
     def set_bpm(self, bpm: int):
         """Set FX speed in beats per minute (1-480 range)."""
         self.bpm = max(1, min(480, bpm))
@@ -82,8 +229,9 @@ class MoveFXEngine:
         
         # Apply position to fixtures even if no effect is running
         if not self.running:
-            for fixture_id in self.get_moving_fixtures():
-                self._set_pan_tilt(fixture_id, self.center_pan, self.center_tilt)
+            with self.fixture_manager.frame(MOVE_FX_LAYER):
+                for fixture_id in self.get_moving_fixtures():
+                    self._set_pan_tilt(fixture_id, self.center_pan, self.center_tilt)
         
         # Trigger save
         self._save_state()
@@ -118,10 +266,12 @@ class MoveFXEngine:
             return 60.0 / self.bpm * 100
         return (60.0 / self.bpm) / self.move_speed_multiplier
     
-    def get_moving_fixtures(self) -> List[str]:
-        """Get list of fixture IDs that have pan and tilt channels."""
-        return [fid for fid in self.fixture_manager.list_fixtures() 
-                if self.fixture_manager.has_pan_tilt(fid)]
+    def get_moving_fixtures(self, group: Optional[str] = None) -> List[str]:
+        """Get the fixture IDs with pan and tilt channels in a group (default: the engine's group)."""
+        fixture_group = self.fixture_manager.get_group(group or self.group)
+        if fixture_group is None:
+            return []
+        return list(fixture_group.moving)
     
     def _set_pan_tilt(self, fixture_id: str, pan: float, tilt: float):
         """
@@ -136,249 +286,122 @@ class MoveFXEngine:
         pan = max(0.0, min(1.0, pan))
         tilt = max(0.0, min(1.0, tilt))
         
-        self.fixture_manager.set_fixture_channel(fixture_id, 'pan', pan)
-        self.fixture_manager.set_fixture_channel(fixture_id, 'tilt', tilt)
-        
-        # Also set fine channels if available
-        if self.fixture_manager.has_channel(fixture_id, 'pan_fine'):
-            self.fixture_manager.set_fixture_channel(fixture_id, 'pan_fine', 0.0)
-        if self.fixture_manager.has_channel(fixture_id, 'tilt_fine'):
-            self.fixture_manager.set_fixture_channel(fixture_id, 'tilt_fine', 0.0)
+        # Uses pan_fine/tilt_fine for 16-bit positioning when the fixture has them
+        self.fixture_manager.set_pan_tilt(fixture_id, pan, tilt)
     
-    def start_fx(self, fx_name: str):
-        """Start a movement effect by name."""
+    def start_fx(self, fx_name: str, group: Optional[str] = None):
+        """
+        Start a movement effect by name.
+        
+        Args:
+            fx_name: Effect name (see MOVE_SHAPES) or 'off'
+            group: Fixture group to run on (defaults to the last used group, initially 'moving')
+        """
         if self.running:
             self.stop_fx()
-            
-        self.current_fx = fx_name
-        self.running = True
-        self.stop_event.clear()
         
-        moving_fixtures = self.get_moving_fixtures()
-        if not moving_fixtures:
-            print("Move FX: No fixtures with pan/tilt found")
-            self.running = False
+        if fx_name == 'off':
+            # Return all to front/center position
+            with self.fixture_manager.frame(MOVE_FX_LAYER):
+                self.fixture_manager.set_all_moving_positions('front')
             return
         
-        if fx_name == 'pan_sway':
-            self.fx_thread = threading.Thread(target=self._run_pan_sway, daemon=True)
-            self.fx_thread.start()
-            print(f"Move FX: Started 'pan_sway' effect at {self.bpm} BPM")
-        elif fx_name == 'tilt_sway':
-            self.fx_thread = threading.Thread(target=self._run_tilt_sway, daemon=True)
-            self.fx_thread.start()
-            print(f"Move FX: Started 'tilt_sway' effect at {self.bpm} BPM")
-        elif fx_name == 'circle':
-            self.fx_thread = threading.Thread(target=self._run_circle, daemon=True)
-            self.fx_thread.start()
-            print(f"Move FX: Started 'circle' effect at {self.bpm} BPM")
-        elif fx_name == 'eight':
-            self.fx_thread = threading.Thread(target=self._run_eight, daemon=True)
-            self.fx_thread.start()
-            print(f"Move FX: Started 'eight' (figure-8) effect at {self.bpm} BPM")
-        elif fx_name == 'lissajous':
-            self.fx_thread = threading.Thread(target=self._run_lissajous, daemon=True)
-            self.fx_thread.start()
-            print(f"Move FX: Started 'lissajous' effect at {self.bpm} BPM")
-        elif fx_name == 'diamond':
-            self.fx_thread = threading.Thread(target=self._run_diamond, daemon=True)
-            self.fx_thread.start()
-            print(f"Move FX: Started 'diamond' effect at {self.bpm} BPM")
-        elif fx_name == 'off':
-            self.stop_fx()
-            # Return all to front/center position
-            self.fixture_manager.set_all_moving_positions('front')
-        else:
+        if fx_name not in MOVE_SHAPES:
             print(f"Move FX: Unknown effect '{fx_name}'")
-            self.running = False
+            return
+        
+        group_name = group or self.group
+        if self.fixture_manager.get_group(group_name) is None:
+            print(f"Move FX: Unknown group '{group_name}'")
+            return
+        moving_fixtures = self.get_moving_fixtures(group_name)
+        if not moving_fixtures:
+            print(f"Move FX: No fixtures with pan/tilt found in group '{group_name}'")
+            return
+        
+        with self._render_lock:
+            self.current_fx = fx_name
+            self.group = group_name
+            self._fixtures = moving_fixtures
+            self._layout = _MoveLayout(self.fixture_manager, moving_fixtures) if np is not None else None
+            self._cycle_phase = 0.0
+            self._last_render = None
+            self.running = True
+        print(f"Move FX: Started '{fx_name}' effect on group '{group_name}' at {self.bpm} BPM")
             
     def stop_fx(self):
         """Stop the currently running effect."""
         if self.running:
             print(f"Move FX: Stopping '{self.current_fx}' effect")
-            self.running = False
-            self.stop_event.set()
-            if self.fx_thread and self.fx_thread.is_alive():
-                self.fx_thread.join(timeout=2.0)
-            self.current_fx = None
-    
-    def _run_pan_sway(self):
-        """Pan sway effect - smooth left-right movement."""
-        fixtures = self.get_moving_fixtures()
-        steps_per_cycle = 60  # Smooth motion
-        step = 0
-        
-        while self.running:
-            # Recalculate interval on each step for responsive BPM changes
-            interval = self.get_interval()
-            step_time = interval / steps_per_cycle
-            
-            # Sine wave for smooth oscillation around center position
-            progress = (step % steps_per_cycle) / steps_per_cycle
-            
-            for idx, fixture_id in enumerate(fixtures):
-                # Apply phase offset per fixture
-                phase_offset = (idx / len(fixtures)) * self.move_phase if len(fixtures) > 1 else 0
-                phase_progress = (progress + phase_offset) % 1.0
-                pan_value = self.center_pan + (self.fx_size * 0.5) * math.sin(phase_progress * 2 * math.pi)
-                # Use center_tilt from X/Y pad for tilt position
-                self._set_pan_tilt(fixture_id, pan_value, self.center_tilt)
-            
-            step += 1
-            time.sleep(step_time)
-    
-    def _run_tilt_sway(self):
-        """Tilt sway effect - smooth up-down movement."""
-        fixtures = self.get_moving_fixtures()
-        steps_per_cycle = 60
-        step = 0
-        
-        while self.running:
-            # Recalculate interval on each step for responsive BPM changes
-            interval = self.get_interval()
-            step_time = interval / steps_per_cycle
-            
-            # Sine wave for smooth oscillation around center position
-            progress = (step % steps_per_cycle) / steps_per_cycle
-            
-            for idx, fixture_id in enumerate(fixtures):
-                # Apply phase offset per fixture
-                phase_offset = (idx / len(fixtures)) * self.move_phase if len(fixtures) > 1 else 0
-                phase_progress = (progress + phase_offset) % 1.0
-                tilt_value = self.center_tilt + (self.fx_size * 0.5) * 0.7 * math.sin(phase_progress * 2 * math.pi)
-                # Use center_pan from X/Y pad for pan position
-                self._set_pan_tilt(fixture_id, self.center_pan, tilt_value)
-            
-            step += 1
-            time.sleep(step_time)
-    
-    def _run_circle(self):
-        """Circle effect - smooth continuous circular movement."""
-        fixtures = self.get_moving_fixtures()
-        steps_per_cycle = 80  # Smooth circular motion
-        angle = 0  # Start angle
-        
-        while self.running:
-            # Recalculate interval on each step for responsive BPM changes
-            interval = self.get_interval()
-            step_time = interval / steps_per_cycle
-            angle_increment = (2 * math.pi) / steps_per_cycle
-            
-            for idx, fixture_id in enumerate(fixtures):
-                # Apply phase offset per fixture
-                phase_offset = (idx / len(fixtures)) * self.move_phase * 2 * math.pi if len(fixtures) > 1 else 0
-                fixture_angle = angle + phase_offset
-                
-                # Circle with size as radius, centered at user-defined position
-                pan_value = self.center_pan + (self.fx_size * 0.5) * math.cos(fixture_angle)
-                tilt_value = self.center_tilt + (self.fx_size * 0.5) * math.sin(fixture_angle)
-                
-                self._set_pan_tilt(fixture_id, pan_value, tilt_value)
-            
-            angle += angle_increment
-            time.sleep(step_time)
-    
-    def _run_eight(self):
-        """Figure-8 effect - lemniscate of Bernoulli pattern."""
-        fixtures = self.get_moving_fixtures()
-        steps_per_cycle = 100  # Need more steps for complex path
-        step = 0
-        
-        while self.running:
-            # Recalculate interval on each step for responsive BPM changes
-            interval = self.get_interval() * 2  # One full figure-8 takes 2 beats
-            step_time = interval / steps_per_cycle
-            
-            # Parametric equations for figure-8 (lemniscate)
-            progress = (step % steps_per_cycle) / steps_per_cycle
-            
-            for idx, fixture_id in enumerate(fixtures):
-                # Apply phase offset per fixture
-                phase_offset = (idx / len(fixtures)) * self.move_phase if len(fixtures) > 1 else 0
-                phase_progress = (progress + phase_offset) % 1.0
-                t = phase_progress * 2 * math.pi
-                
-                # Lemniscate formula with user-controlled size and center
-                denominator = 1 + math.sin(t) ** 2
-                pan_value = self.center_pan + (self.fx_size * 0.5) * math.cos(t) / denominator
-                tilt_value = self.center_tilt + (self.fx_size * 0.5) * math.sin(t) * math.cos(t) / denominator
-                
-                self._set_pan_tilt(fixture_id, pan_value, tilt_value)
-            
-            step += 1
-            time.sleep(step_time)
+            # Wait for an in-flight frame so no effect position lands after stop
+            with self._render_lock:
+                self.running = False
+                self.current_fx = None
     
-    def _run_lissajous(self, freq_x=3, freq_y=2, phase_x=0, phase_y=math.pi/2):
+    def _render(self, now: float):
         """
-        Lissajous curve effect - complex mathematical patterns.
+        Evaluate the running effect for one DMX frame (called by the DMX output clock).
         
-        Args:
-            freq_x: Frequency multiplier for pan (X-axis)
-            freq_y: Frequency multiplier for tilt (Y-axis)
-            phase_x: Phase offset for pan in radians
-            phase_y: Phase offset for tilt in radians
-        
-        Common patterns:
-        - freq_x=3, freq_y=2: Classic 3:2 Lissajous
-        - freq_x=5, freq_y=4: More complex pattern
-        - phase_y=π/2: Creates perpendicular motion
+        The cycle phase is advanced by the real frame delta, so BPM, speed and size
+        changes take effect immediately without jumps and without timing drift.
         """
-        fixtures = self.get_moving_fixtures()
-        steps_per_cycle = 100
-        angle = 0
-        
-        while self.running:
-            # Recalculate interval on each step for responsive BPM changes
-            interval = self.get_interval()
-            step_time = interval / steps_per_cycle
-            angle_increment = (2 * math.pi) / steps_per_cycle
+        with self._render_lock:
+            if not self.running:
+                return
+            shape, beats_per_cycle = MOVE_SHAPES[self.current_fx]
+            if self._last_render is not None:
+                cycle_time = self.get_interval() * beats_per_cycle
+                self._cycle_phase = (self._cycle_phase + (now - self._last_render) / cycle_time) % 1.0
+            self._last_render = now
             
-            for idx, fixture_id in enumerate(fixtures):
-                # Apply phase offset per fixture
-                phase_offset = (idx / len(fixtures)) * self.move_phase * 2 * math.pi if len(fixtures) > 1 else 0
-                fixture_angle = angle + phase_offset
-                
-                # Lissajous parametric equations with user-controlled center and size
-                pan_value = self.center_pan + (self.fx_size * 0.5) * math.sin(freq_x * fixture_angle + phase_x)
-                tilt_value = self.center_tilt + (self.fx_size * 0.5) * math.sin(freq_y * fixture_angle + phase_y)
-                
-                self._set_pan_tilt(fixture_id, pan_value, tilt_value)
+            if self.vectorized and self._layout is not None:
+                self._render_vectorized(shape)
+                return
             
-            angle += angle_increment
-            time.sleep(step_time)
+            fixtures = self._fixtures
+            count = len(fixtures)
+            with self.fixture_manager.frame(MOVE_FX_LAYER):
+                for idx, fixture_id in enumerate(fixtures):
+                    pan, tilt = move_position(shape, self._cycle_phase, idx, count,
+                                              self.center_pan, self.center_tilt, self.fx_size, self.move_phase)
+                    self._set_pan_tilt(fixture_id, pan, tilt)
     
-    def _run_diamond(self):
-        """
-        Diamond effect - square rotated 45 degrees with sharp corners.
-        Uses power functions for sharp corner transitions.
-        """
-        fixtures = self.get_moving_fixtures()
-        steps_per_cycle = 100
-        angle = 0
+    def _render_vectorized(self, shape):
+        """Evaluate the effect for all moving fixtures as arrays and scatter into the universe buffers."""
+        layout = self._layout
+        angles = (self._cycle_phase + layout.phase_index * self.move_phase) * (2 * math.pi)
+        x, y = shape(angles, xp=np)
+        pan = np.clip(self.center_pan + (self.fx_size * 0.5) * x, 0.0, 1.0)
+        tilt = np.clip(self.center_tilt + (self.fx_size * 0.5) * y, 0.0, 1.0)
+        # Coarse/fine bytes, same split as fixture_manager.split_16bit()
+        pan_coarse, pan_fine = self._split_16bit(pan)
+        tilt_coarse, tilt_fine = self._split_16bit(tilt)
         
-        while self.running:
-            # Recalculate interval on each step for responsive BPM changes
-            interval = self.get_interval()
-            step_time = interval / steps_per_cycle
-            angle_increment = (2 * math.pi) / steps_per_cycle
-            
-            for idx, fixture_id in enumerate(fixtures):
-                # Apply phase offset per fixture
-                phase_offset = (idx / len(fixtures)) * self.move_phase * 2 * math.pi if len(fixtures) > 1 else 0
-                fixture_angle = angle + phase_offset
-                
-                # Use cubic power for sharper corners
-                raw_pan = math.cos(fixture_angle)
-                raw_tilt = math.sin(fixture_angle)
-                
-                # Apply power function for sharpness with user-controlled center and size
-                pan_value = self.center_pan + (self.fx_size * 0.5) * (raw_pan ** 3)
-                tilt_value = self.center_tilt + (self.fx_size * 0.5) * (raw_tilt ** 3)
-                
-                self._set_pan_tilt(fixture_id, pan_value, tilt_value)
-            
-            angle += angle_increment
-            time.sleep(step_time)
+        with self.fixture_manager.frame(MOVE_FX_LAYER) as frame:
+            for universe_id, (addresses, (pan_idx, tilt_idx, pan_fine_idx, tilt_fine_idx)) in layout.universes.items():
+                values = np.concatenate((pan_coarse[pan_idx], tilt_coarse[tilt_idx],
+                                         pan_fine[pan_fine_idx], tilt_fine[tilt_fine_idx]))
+                frame.scatter(universe_id, addresses, values)
+        
+        # Keep fixture state in sync for the UI
+        for state, pan_value, tilt_value in zip(layout.states, pan.tolist(), tilt.tolist()):
+            state['pan'] = pan_value
+            state['tilt'] = tilt_value
+        pan_fine_values = (pan_fine / 255).tolist()
+        for idx, state in layout.pan_fine_states:
+            state['pan_fine'] = pan_fine_values[idx]
+        tilt_fine_values = (tilt_fine / 255).tolist()
+        for idx, state in layout.tilt_fine_states:
+            state['tilt_fine'] = tilt_fine_values[idx]
+        self.fixture_manager.mark_state_changed()
+    
+    @staticmethod
+    def _split_16bit(values):
+        """Split an array of normalised values into coarse and fine DMX byte arrays."""
+        scaled = values * 255
+        coarse = np.floor(scaled)
+        fine = np.minimum(255, np.floor((scaled - coarse) * 256))
+        return coarse.astype(np.uint8), fine.astype(np.uint8)
     
     def _save_state(self):
         """Save current state to file (debounced)."""
@@ -463,5 +486,6 @@ class MoveFXEngine:
             'running': self.running,
             'current_fx': self.current_fx,
             'bpm': self.bpm,
+            'group': self.group,
             'moving_fixtures': self.get_moving_fixtures()
         }
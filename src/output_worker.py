@@ -0,0 +1,201 @@
+"""
+Output Workers for LightGroove
+One sender thread per output destination, so a slow or failing node cannot delay the others
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+class OutputWorker:
+    """
+    Sends the universes of one destination (an ArtNet node or the sACN output) from its own thread.
+
+    The output loop submits one batch of (sender, data) pairs per frame, and only for
+    universes that changed (or are due for a keep-alive). The hand-over is a single-slot
+    mailbox: a batch still waiting when the next frame arrives is merged with it, keeping
+    the latest data per sender (counted in batches_dropped), so a universe that changed
+    only in the older batch is still sent. After a send error the destination backs off
+    (0.5 s doubling up to 10 s); batches submitted meanwhile are merged the same way
+    (batches_skipped) and the failed batch is kept under them, so the latest data of
+    every universe goes out when the backoff expires. Errors are logged at most once per
+    ERROR_LOG_INTERVAL.
+    """
+
+    BACKOFF_MIN = 0.5
+    BACKOFF_MAX = 10.0
+    ERROR_LOG_INTERVAL = 10.0
+
+    def __init__(self, name: str, after_batch: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            name: Destination name used in logs and metrics (e.g. 'artnet:node1')
+            after_batch: Called after each successfully sent batch (e.g. sACN universe sync)
+        """
+        self.name = name
+        self.after_batch = after_batch
+        self.running = False
+        self._thread = None
+        self._mailbox = threading.Condition()
+        self._pending: Optional[Tuple[float, Dict]] = None  # (first submit time, sender -> latest data)
+        self._sending = False  # A batch was taken from the mailbox and is being sent
+        # Backoff state
+        self.consecutive_failures = 0
+        self.backoff_until = 0.0
+        self.last_error: Optional[str] = None
+        self._last_error_log = 0.0
+        self._suppressed_errors = 0
+        # Metrics
+        self.lock = threading.Lock()
+        self.packets_sent = 0
+        self.send_errors = 0
+        self.batches_dropped = 0
+        self.batches_skipped = 0  # During backoff
+        self._latency_us = deque(maxlen=500)  # Submit -> batch sent
+
+    def start(self):
+        """Start the sender thread"""
+        if not self.running:
+            self.running = True
+            self._thread = threading.Thread(target=self._run, name=f"output-{self.name}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the sender thread"""
+        self.running = False
+        with self._mailbox:
+            self._mailbox.notify_all()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def submit(self, batch: Iterable[Tuple[object, object]]):
+        """
+        Hand this frame's packets to the worker, merged into a batch that is still waiting
+
+        Args:
+            batch: (sender, data) pairs; sender.send(data) transmits one universe.
+                   data must not be modified after submit (immutable frames)
+        """
+        with self._mailbox:
+            if self._pending is None:
+                self._pending = (time.perf_counter(), dict(batch))
+            else:
+                if time.monotonic() < self.backoff_until:
+                    self.batches_skipped += 1
+                else:
+                    self.batches_dropped += 1
+                self._pending[1].update(batch)
+            self._mailbox.notify_all()
+
+    def _run(self):
+        while self.running:
+            with self._mailbox:
+                # Hold the pending batch (merging newer ones into it) until the backoff expires
+                while self.running:
+                    if self._pending is None:
+                        self._mailbox.wait()
+                        continue
+                    backoff = self.backoff_until - time.monotonic()
+                    if backoff <= 0:
+                        break
+                    self._mailbox.wait(backoff)
+                pending, self._pending = self._pending, None
+                self._sending = pending is not None
+            if pending is None:
+                continue
+
+            submitted, batch = pending
+            error = None
+            try:
+                for sender, data in batch.items():
+                    if sender.send(data):
+                        self.packets_sent += 1
+                if self.after_batch:
+                    self.after_batch()
+            except Exception as e:
+                error = e
+            with self._mailbox:
+                if error is not None:
+                    # Retry after the backoff; data submitted meanwhile is newer and wins
+                    if self._pending is not None:
+                        batch.update(self._pending[1])
+                    self._pending = (submitted, batch)
+                self._sending = False
+                self._mailbox.notify_all()
+            if error is not None:
+                self._on_error(error)
+                continue
+
+            if self.consecutive_failures:
+                print(f"Output Worker: {self.name} recovered after {self.consecutive_failures} failed frames")
+                self.consecutive_failures = 0
+            with self.lock:
+                self._latency_us.append(int((time.perf_counter() - submitted) * 1e6))
+
+    def retire(self, senders: Iterable, timeout: float = 2.0) -> bool:
+        """
+        Stop using senders that a config reload replaced: wait until a batch being sent has
+        finished, then drop their pending data (the new senders get the current frames)
+
+        Args:
+            senders: Senders no longer routed to
+            timeout: Longest wait for the batch in flight, in seconds
+
+        Returns:
+            False if a batch was still being sent when the timeout expired
+        """
+        deadline = time.monotonic() + timeout
+        with self._mailbox:
+            while self._sending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._mailbox.wait(remaining)
+            if self._pending is not None:
+                batch = self._pending[1]
+                for sender in senders:
+                    batch.pop(sender, None)
+                if not batch:
+                    self._pending = None
+        return True
+
+    def _on_error(self, error: Exception):
+        """Start or extend the backoff and log the error (rate limited)"""
+        self.send_errors += 1
+        self.consecutive_failures += 1
+        backoff = min(self.BACKOFF_MAX, self.BACKOFF_MIN * 2 ** (self.consecutive_failures - 1))
+        now = time.monotonic()
+        self.backoff_until = now + backoff
+        self.last_error = str(error)
+
+        if now - self._last_error_log >= self.ERROR_LOG_INTERVAL:
+            suppressed = f" ({self._suppressed_errors} more errors suppressed)" if self._suppressed_errors else ""
+            print(f"Output Worker: {self.name} send failed: {error}, retrying in {backoff:g}s{suppressed}")
+            self._last_error_log = now
+            self._suppressed_errors = 0
+        else:
+            self._suppressed_errors += 1
+
+    def get_stats(self) -> Dict:
+        """Get send, error, backoff and latency (microseconds, submit to sent) metrics"""
+        with self.lock:
+            latency = sorted(self._latency_us)
+        summary = {'mean': 0, 'p95': 0, 'max': 0}
+        if latency:
+            summary = {
+                'mean': round(sum(latency) / len(latency), 1),
+                'p95': latency[(len(latency) - 1) * 95 // 100],
+                'max': latency[-1],
+            }
+        return {
+            'packets_sent': self.packets_sent,
+            'send_errors': self.send_errors,
+            'batches_dropped': self.batches_dropped,
+            'batches_skipped': self.batches_skipped,
+            'backoff_remaining': round(max(0.0, self.backoff_until - time.monotonic()), 2),
+            'last_error': self.last_error,
+            'latency_us': summary,
+        }
@@ -0,0 +1,199 @@
+"""
+sACN (E1.31) Sender for LightGroove
+Encodes E1.31 data and universe sync packets and sends them via multicast or unicast
+"""
+
+import socket
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+
+E131_PORT = 5568
+ACN_PACKET_ID = b'ASC-E1.17\x00\x00\x00'
+VECTOR_ROOT_E131_DATA = 0x00000004
+VECTOR_ROOT_E131_EXTENDED = 0x00000008
+VECTOR_E131_DATA_PACKET = 0x00000002
+VECTOR_E131_EXTENDED_SYNCHRONIZATION = 0x00000001
+VECTOR_DMP_SET_PROPERTY = 0x02
+DATA_PACKET_SIZE = 638  # 126-byte header + 512 channels
+SYNC_PACKET_SIZE = 49
+DEFAULT_PRIORITY = 100
+
+
+def multicast_address(universe: int) -> str:
+    """Multicast group for a universe (239.255.<hi>.<lo>)"""
+    return f"239.255.{(universe >> 8) & 0xFF}.{universe & 0xFF}"
+
+
+def _flags_and_length(length: int) -> bytes:
+    return (0x7000 | length).to_bytes(2, 'big')
+
+
+def _root_layer(vector: int, cid: bytes, packet_size: int) -> bytearray:
+    root = bytearray(38)
+    root[0:2] = (0x0010).to_bytes(2, 'big')  # Preamble size
+    # 2-3: postamble size (0)
+    root[4:16] = ACN_PACKET_ID
+    root[16:18] = _flags_and_length(packet_size - 16)
+    root[18:22] = vector.to_bytes(4, 'big')
+    root[22:38] = cid
+    return root
+
+
+def build_data_header(universe: int, cid: bytes, source_name: str, priority: int = DEFAULT_PRIORITY,
+                      sync_address: int = 0) -> bytearray:
+    """
+    Build the 126-byte header of an E1.31 data packet (sequence byte left at 0, start code 0)
+
+    Args:
+        universe: sACN universe (1-63999)
+        cid: 16-byte component identifier of this source
+        source_name: Human-readable source name (max 63 bytes UTF-8)
+        priority: Source priority (0-200)
+        sync_address: Universe the receiver waits for a sync packet on (0 = no sync)
+    """
+    header = bytearray(126)
+    header[0:38] = _root_layer(VECTOR_ROOT_E131_DATA, cid, DATA_PACKET_SIZE)
+    # Framing layer
+    header[38:40] = _flags_and_length(DATA_PACKET_SIZE - 38)
+    header[40:44] = VECTOR_E131_DATA_PACKET.to_bytes(4, 'big')
+    name = source_name.encode('utf-8')[:63]
+    header[44:44 + len(name)] = name
+    header[108] = max(0, min(200, priority))
+    header[109:111] = sync_address.to_bytes(2, 'big')
+    # 111: sequence number, 112: options
+    header[113:115] = universe.to_bytes(2, 'big')
+    # DMP layer
+    header[115:117] = _flags_and_length(DATA_PACKET_SIZE - 115)
+    header[117] = VECTOR_DMP_SET_PROPERTY
+    header[118] = 0xA1  # Address type & data type
+    # 119-120: first property address (0)
+    header[121:123] = (1).to_bytes(2, 'big')  # Address increment
+    header[123:125] = (513).to_bytes(2, 'big')  # Property value count (start code + 512)
+    # 125: start code, written with the frame
+    return header
+
+
+def build_sync_packet(cid: bytes, sync_address: int) -> bytearray:
+    """Build an E1.31 universe synchronization packet (sequence byte left at 0)"""
+    packet = bytearray(SYNC_PACKET_SIZE)
+    packet[0:38] = _root_layer(VECTOR_ROOT_E131_EXTENDED, cid, SYNC_PACKET_SIZE)
+    packet[38:40] = _flags_and_length(SYNC_PACKET_SIZE - 38)
+    packet[40:44] = VECTOR_E131_EXTENDED_SYNCHRONIZATION.to_bytes(4, 'big')
+    # 44: sequence number
+    packet[45:47] = sync_address.to_bytes(2, 'big')
+    # 47-48: reserved
+    return packet
+
+
+class E131Universe:
+    """One outgoing sACN universe: a pre-built packet and its own sequence counter"""
+
+    def __init__(self, sender: 'E131Sender', address: Tuple[str, int], universe: int, priority: int):
+        self.sender = sender
+        self.address = address
+        self.universe = universe
+        self.priority = priority
+        self.sequence = 0
+        self.packets_sent = 0
+        self.send_errors = 0
+        self._packet = bytearray(DATA_PACKET_SIZE)
+        self._packet[:126] = build_data_header(universe, sender.cid, sender.source_name, priority, sender.sync_address)
+        self._data = memoryview(self._packet)[125:]
+
+    def send(self, frame) -> bool:
+        """
+        Send one DMX frame
+
+        Args:
+            frame: Start code + 512 channel values (513 bytes-like)
+        """
+        self.sequence = (self.sequence + 1) % 256
+        self._packet[111] = self.sequence
+        self._data[:] = frame
+        try:
+            sent = self.sender.sendto(self._packet, self.address)
+        except OSError:
+            self.send_errors += 1
+            raise
+        if sent:
+            self.packets_sent += 1
+        return sent
+
+
+class E131Sender:
+    """Shared non-blocking UDP socket for all sACN universes, with optional universe sync"""
+
+    def __init__(self, source_name: str = 'LightGroove', cid: Optional[str] = None, sync_address: int = 0,
+                 multicast_ttl: int = 1):
+        """
+        Args:
+            source_name: Source name shown by receivers
+            cid: Component identifier (UUID string), random per run if not configured
+            sync_address: Universe used for sync packets (0 disables universe synchronization)
+            multicast_ttl: Router hops for multicast packets
+        """
+        self.source_name = source_name
+        self.cid = uuid.UUID(cid).bytes if cid else uuid.uuid4().bytes
+        self.sync_address = sync_address
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, multicast_ttl)
+        self.socket.setblocking(False)
+        self.universes: Dict[Tuple[str, int, int], E131Universe] = {}
+        self.packets_dropped = 0  # Socket buffer full
+        self._sync_packet = build_sync_packet(self.cid, sync_address)
+        self._sync_sequence = 0
+
+    def add_universe(self, universe: int, priority: int = DEFAULT_PRIORITY, unicast_ip: Optional[str] = None,
+                     port: int = E131_PORT) -> E131Universe:
+        """Get the output for a universe, sent to its multicast group unless a unicast IP is given"""
+        address = (unicast_ip or multicast_address(universe), port)
+        key = (address[0], universe, priority)
+        if key not in self.universes:
+            self.universes[key] = E131Universe(self, address, universe, priority)
+        return self.universes[key]
+
+    def sync_destinations(self) -> List[Tuple[str, int]]:
+        """
+        Addresses the sync packet goes to: every unicast destination in use, plus the
+        sync universe's multicast group if any universe is sent via multicast
+        """
+        destinations = []
+        multicast = False
+        for universe in self.universes.values():
+            if universe.address[0] == multicast_address(universe.universe):
+                multicast = True
+            elif universe.address not in destinations:
+                destinations.append(universe.address)
+        if multicast:
+            destinations.append((multicast_address(self.sync_address), E131_PORT))
+        return destinations
+
+    def send_sync(self) -> bool:
+        """Tell receivers to output the data packets sent since the last sync"""
+        if not self.sync_address:
+            return False
+        self._sync_sequence = (self._sync_sequence + 1) % 256
+        self._sync_packet[44] = self._sync_sequence
+        sent = False
+        for address in self.sync_destinations():
+            sent = self.sendto(self._sync_packet, address) or sent
+        return sent
+
+    def sendto(self, packet, address: Tuple[str, int]) -> bool:
+        """
+        Send one datagram without blocking; a full socket buffer drops the packet
+
+        Raises:
+            OSError: Destination unreachable or other socket errors (handled by the output worker)
+        """
+        try:
+            self.socket.sendto(packet, address)
+            return True
+        except BlockingIOError:
+            self.packets_dropped += 1
+        return False
+
+    def close(self):
+        """Close the UDP socket"""
+        self.socket.close()
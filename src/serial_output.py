@@ -0,0 +1,139 @@
+"""
+Serial DMX Output for LightGroove
+Writes frames to a USB-DMX interface from a dedicated worker thread
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+
+# Enttec DMX USB Pro framing
+ENTTEC_START = 0x7E
+ENTTEC_END = 0xE7
+ENTTEC_LABEL_SEND_DMX = 6
+
+SERIAL_MODES = ('open_dmx', 'enttec_pro')
+
+
+def build_enttec_packet(frame) -> bytes:
+    """
+    Wrap a DMX frame in an Enttec DMX USB Pro 'Output Only Send DMX' message
+
+    Args:
+        frame: Start code + channel values (bytes-like, up to 513 bytes)
+    """
+    length = len(frame)
+    return bytes((ENTTEC_START, ENTTEC_LABEL_SEND_DMX, length & 0xFF, length >> 8)) + bytes(frame) + bytes((ENTTEC_END,))
+
+
+class SerialOutput:
+    """
+    Serial DMX output running in its own thread.
+
+    The output loop hands over frames with submit(); the worker only ever writes the
+    most recent one (single-slot mailbox), so a slow port drops stale frames instead
+    of delaying the network outputs.
+
+    Modes:
+        open_dmx: Raw DMX at 250000 baud (FTDI 'Open DMX' style), break + mark-after-break per frame
+        enttec_pro: Enttec DMX USB Pro framed messages, the widget generates the DMX timing itself
+    """
+
+    def __init__(self, port: str, mode: str = 'open_dmx'):
+        if mode not in SERIAL_MODES:
+            raise ValueError(f"Unknown serial mode '{mode}' (expected one of {', '.join(SERIAL_MODES)})")
+        self.port = port
+        self.mode = mode
+        self.serial = None
+        self.running = False
+        self._thread = None
+        self._mailbox = threading.Condition()
+        self._pending: Optional[bytes] = None
+        # Statistics
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.write_errors = 0
+        self.last_write_us = 0
+
+    def open(self):
+        """Open the serial port with the line settings for the selected mode"""
+        import serial
+        if self.mode == 'enttec_pro':
+            # USB CDC device, the baud rate is not used on the DMX side
+            self.serial = serial.Serial(port=self.port, baudrate=57600, timeout=1, write_timeout=1)
+        else:
+            self.serial = serial.Serial(
+                port=self.port,
+                baudrate=250000,
+                bytesize=serial.EIGHTBITS,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_TWO,
+                write_timeout=1
+            )
+
+    def start(self):
+        """Start the writer thread"""
+        if not self.running:
+            self.running = True
+            self._thread = threading.Thread(target=self._write_loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the writer thread and close the port"""
+        self.running = False
+        with self._mailbox:
+            self._mailbox.notify()
+        if self._thread:
+            self._thread.join(timeout=2)
+        if self.serial and self.serial.is_open:
+            self.serial.close()
+
+    def submit(self, frame):
+        """
+        Hand the latest frame to the writer, replacing one that was not written yet
+
+        Args:
+            frame: Start code + 512 channel values (copied, so reused buffers are safe)
+        """
+        packet = build_enttec_packet(frame) if self.mode == 'enttec_pro' else bytes(frame)
+        with self._mailbox:
+            if self._pending is not None:
+                self.frames_dropped += 1
+            self._pending = packet
+            self._mailbox.notify()
+
+    def _write_loop(self):
+        while self.running:
+            with self._mailbox:
+                while self._pending is None and self.running:
+                    self._mailbox.wait()
+                packet, self._pending = self._pending, None
+            if packet is None:
+                continue
+
+            start = time.perf_counter()
+            try:
+                if self.mode == 'open_dmx':
+                    self.serial.break_condition = True
+                    time.sleep(0.0001)  # Break (100us)
+                    self.serial.break_condition = False
+                    time.sleep(0.000012)  # Mark After Break (12us)
+                self.serial.write(packet)
+                self.frames_written += 1
+            except Exception as e:
+                self.write_errors += 1
+                print(f"Serial Output: Write to {self.port} failed: {e}")
+                time.sleep(0.5)  # Don't spin on a disconnected device
+            self.last_write_us = int((time.perf_counter() - start) * 1e6)
+
+    def get_stats(self) -> Dict:
+        """Get writer counters"""
+        return {
+            'port': self.port,
+            'mode': self.mode,
+            'frames_written': self.frames_written,
+            'frames_dropped': self.frames_dropped,
+            'write_errors': self.write_errors,
+            'last_write_us': self.last_write_us,
+        }
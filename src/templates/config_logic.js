@@ -96,8 +96,10 @@ function renderMappings() {
         <div style="flex: 1;">
           <div style="font-weight: 600; margin-bottom: 5px;">DMX Universe ${dmxUniverse}</div>
           <div style="font-size: 12px; color: #9ca3af;">
+            ${mapping.output_mode === 'e131' ? `
+            <div>sACN Universe: ${mapping.e131_universe || dmxUniverse}</div>` : `
             <div>Node: ${mapping.node_id}</div>
-            <div>ArtNet Universe: ${mapping.artnet_universe}</div>
+            <div>ArtNet Universe: ${mapping.artnet_universe}</div>`}
             <div style="margin-top: 5px;">
               <span style="padding: 2px 8px; border-radius: 999px; background: ${mapping.output_mode === 'artnet' ? '#1e40af' : '#374151'}; font-size: 10px;">
                 ${mapping.output_mode}
@@ -385,16 +387,19 @@ function initConfigEventListeners() {
         return;
       }
       
+      const outputMode = document.getElementById('mapping-output-mode').value;
       const nodeId = document.getElementById('mapping-node').value;
-      if (!nodeId) {
+      // sACN is multicast per universe and needs no node
+      if (!nodeId && outputMode !== 'e131') {
         showToast('Please select a node', 'warning');
         return;
       }
       
       const mapping = {
+        ...(artnetConfig.universe_mapping[dmxUniverse] || {}),
         node_id: nodeId,
         artnet_universe: parseInt(document.getElementById('mapping-artnet-universe').value) || 0,
-        output_mode: document.getElementById('mapping-output-mode').value
+        output_mode: outputMode
       };
       
       if (!isEdit && artnetConfig.universe_mapping[dmxUniverse]) {
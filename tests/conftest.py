@@ -0,0 +1,7 @@
+"""
+Test setup: modules in src/ import each other by flat name (main.py puts src on the path)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
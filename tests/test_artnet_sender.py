@@ -0,0 +1,76 @@
+"""
+ArtDmx packets from ArtNetSender, received on a local UDP socket
+"""
+import socket
+
+import pytest
+
+from artnet_sender import ARTNET_ID, DMX_CHANNELS, DMX_HEADER_SIZE, OP_DMX, PROTOCOL_VERSION, ArtNetSender
+
+
+@pytest.fixture
+def receiver():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.settimeout(2.0)
+    yield sock
+    sock.close()
+
+
+@pytest.fixture
+def sender():
+    sender = ArtNetSender()
+    yield sender
+    sender.close()
+
+
+def receive(sock):
+    packet, _ = sock.recvfrom(2048)
+    return packet
+
+
+def test_artdmx_header_and_data(receiver, sender):
+    port = sender.add_port('127.0.0.1', 0x0123, receiver.getsockname()[1])
+    data = bytes(i % 256 for i in range(DMX_CHANNELS))
+    assert port.send(data)
+
+    packet = receive(receiver)
+    assert len(packet) == DMX_HEADER_SIZE + DMX_CHANNELS
+    assert packet[0:8] == ARTNET_ID
+    assert int.from_bytes(packet[8:10], 'little') == OP_DMX
+    assert int.from_bytes(packet[10:12], 'big') == PROTOCOL_VERSION
+    assert packet[12] == 1  # First sequence number
+    assert packet[13] == 0  # Physical port
+    assert int.from_bytes(packet[16:18], 'big') == DMX_CHANNELS
+    assert packet[DMX_HEADER_SIZE:] == data
+    assert port.packets_sent == 1
+
+
+@pytest.mark.parametrize('universe, sub_uni, net', [
+    (0, 0x00, 0x00),
+    (0x0015, 0x15, 0x00),  # Sub-Net 1, Universe 5
+    (0x0123, 0x23, 0x01),
+    (0x7FFF, 0xFF, 0x7F),  # Highest 15-bit port-address
+])
+def test_universe_and_net_fields(receiver, sender, universe, sub_uni, net):
+    sender.add_port('127.0.0.1', universe, receiver.getsockname()[1]).send(bytes(DMX_CHANNELS))
+    packet = receive(receiver)
+    assert packet[14] == sub_uni
+    assert packet[15] == net
+
+
+def test_sequence_wraps_past_zero(receiver, sender):
+    port = sender.add_port('127.0.0.1', 0, receiver.getsockname()[1])
+    port.sequence = 253
+    sequences = []
+    for _ in range(4):
+        port.send(bytes(DMX_CHANNELS))
+        sequences.append(receive(receiver)[12])
+    # 0 means "sequencing disabled", so the counter runs 1-255
+    assert sequences == [254, 255, 1, 2]
+
+
+def test_ports_are_shared_per_destination(sender):
+    first = sender.add_port('127.0.0.1', 1, 6454)
+    assert sender.add_port('127.0.0.1', 1, 6454) is first
+    assert sender.add_port('127.0.0.1', 2, 6454) is not first
@@ -0,0 +1,68 @@
+import contextlib
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from color_manager import ColorFXEngine
+from dmx_controller import DMXController
+from fixture_manager import FixtureManager
+from layer_merge import COLOR_FX_LAYER
+
+FIXTURES_FILE = Path(__file__).resolve().parent.parent / 'config' / 'fixtures.json'
+COLOR_ADDRESSES = [2, 3, 4, 5]  # red, green, blue, white of the PAR at address 1
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Colour FX engine on one RGBW PAR, fading over the whole beat"""
+    patch_file = tmp_path / 'patch.json'
+    patch_file.write_text(json.dumps({'universes': {'1': {'fixtures': [
+        {'id': 'par1', 'type': 'rgbw_dimmer_shutter_macro', 'start_address': 1},
+    ]}}}))
+    with contextlib.redirect_stdout(io.StringIO()):
+        dmx = DMXController()
+        dmx.add_universe(1)
+        fm = FixtureManager(dmx, str(FIXTURES_FILE), str(patch_file))
+        fx = ColorFXEngine(fm, str(tmp_path / 'color_state.json'))
+    fx.set_fade_percentage(1.0)
+    yield fx
+    fx.autosave_running = False
+    dmx.stop()
+
+
+def quiet_call(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+@pytest.mark.parametrize('running', [False, True])
+def test_stop_cancels_fades_and_releases_the_layer(engine, running):
+    fm = engine.fixture_manager
+    quiet_call(engine.start_fx, 'random_1')
+    engine._render(0.0)
+    engine._render(0.001)
+    assert 'par1' in fm._fades
+
+    fm.dmx.running = running  # Only the flag: the frame clock is driven by hand
+    quiet_call(engine.stop_fx)
+    assert 'par1' not in fm._fades
+    if running:
+        engine._render(0.002)  # Cleared on the next frame, after any fade step
+    fm.dmx.running = False
+    _, driven = fm.dmx.read_layer(COLOR_FX_LAYER, 1, COLOR_ADDRESSES)
+    assert not any(driven)
+
+
+def test_switching_effects_keeps_the_new_colours(engine):
+    fm = engine.fixture_manager
+    engine.set_fade_percentage(0.0)
+    quiet_call(engine.start_fx, 'random_1')
+    engine._render(0.0)
+    fm.dmx.running = True
+    quiet_call(engine.start_fx, 'random_2')
+    engine._render(0.001)  # Clears the old effect and writes the first beat of the new one
+    fm.dmx.running = False
+    _, driven = fm.dmx.read_layer(COLOR_FX_LAYER, 1, COLOR_ADDRESSES)
+    assert all(driven)
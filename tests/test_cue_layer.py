@@ -0,0 +1,79 @@
+import contextlib
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from cue_list import CueListPlayer
+from cue_store import CueStore
+from dmx_controller import DMXController
+from fixture_manager import FixtureManager
+
+FIXTURES_FILE = Path(__file__).resolve().parent.parent / 'config' / 'fixtures.json'
+
+
+@pytest.fixture
+def rig(tmp_path):
+    """One RGBW PAR at address 1 of universe 1, with a cue store and a cue list player"""
+    patch_file = tmp_path / 'patch.json'
+    patch_file.write_text(json.dumps({'universes': {'1': {'fixtures': [
+        {'id': 'par1', 'type': 'rgbw_dimmer_shutter_macro', 'start_address': 1},
+    ]}}}))
+    with contextlib.redirect_stdout(io.StringIO()):
+        dmx = DMXController()
+        dmx.add_universe(1)
+        fm = FixtureManager(dmx, str(FIXTURES_FILE), str(patch_file))
+        cues = CueStore(fm, str(tmp_path / 'cues.json'))
+        player = CueListPlayer(cues, str(tmp_path / 'cue_lists.json'))
+    yield fm, cues, player
+    dmx.stop()
+
+
+def quiet_call(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def test_go_takes_over_channels_showing_the_same_value(rig):
+    fm, cues, player = rig
+    fm.set_fixture_channel('par1', 'dimmer', 1.0)
+    fm.set_fixture_channel('par1', 'red', 1.0)
+    quiet_call(cues.save_cue, 'full', None, {'par1': {'dimmer': 1.0, 'red': 1.0}})
+    quiet_call(player.save_list, 'show', ['full'])
+    assert quiet_call(player.go, 'show', 0.0)
+
+    # The cue holds the fixture when the faders are pulled down
+    fm.set_fixture_channel('par1', 'dimmer', 0.0)
+    fm.set_fixture_channel('par1', 'red', 0.0)
+    assert fm.dmx.get_channel(1, 1) == 255  # Intensity: HTP with the cue layer
+    assert fm.dmx.get_channel(1, 2) == 0  # Attribute: the later fader move wins (LTP)
+    assert fm.fixtures['par1']['state']['dimmer'] == 0.0
+
+
+def test_fade_starts_from_the_cue_layer(rig):
+    fm, cues, player = rig
+    quiet_call(cues.save_cue, 'half', None, {'par1': {'dimmer': 0.5}})
+    quiet_call(cues.save_cue, 'full', None, {'par1': {'dimmer': 1.0}})
+    quiet_call(player.save_list, 'show', ['half', {'cue': 'full', 'fade_in': 10}])
+    assert quiet_call(player.go, 'show', 0.0)
+    fm.set_fixture_channel('par1', 'dimmer', 0.9)  # Manual level above the cue
+
+    assert quiet_call(player.go, 'show', 0.0)
+    player._render(5.0)
+    levels, driven = cues.current_levels(cues.get_cue('full').patches[0])
+    assert list(driven) == [True]
+    assert levels[0] == pytest.approx(0.75, abs=1 / 255)
+
+
+def test_release_hands_channels_back(rig):
+    fm, cues, player = rig
+    quiet_call(cues.save_cue, 'full', None, {'par1': {'dimmer': 1.0}})
+    quiet_call(player.save_list, 'show', ['full'])
+    quiet_call(player.go, 'show', 0.0)
+    assert fm.dmx.get_channel(1, 1) == 255
+
+    player.release()
+    patch = cues.get_cue('full').patches[0]
+    assert list(cues.current_levels(patch)[1]) == [False]
+    assert fm.dmx.get_channel(1, 1) == 0
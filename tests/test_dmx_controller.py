@@ -0,0 +1,15 @@
+import contextlib
+import io
+
+import pytest
+
+from dmx_controller import DMXController
+
+
+@pytest.mark.parametrize('configured, expected', [(500, 100.0), (0, 1.0), (30, 30.0)])
+def test_config_fps_reports_the_clamped_rate(configured, expected):
+    dmx = DMXController()
+    with contextlib.redirect_stdout(io.StringIO()):
+        dmx._apply_config({'fps': configured})
+    assert dmx.fps == expected
+    assert dmx.get_timing_stats()['target_fps'] == expected
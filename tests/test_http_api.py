@@ -0,0 +1,59 @@
+"""
+HTTP API helpers
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from http_api import ApiRequest, HttpApiServer, etag_matches
+
+ETAG = '"0123456789abcdef"'
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('"0123456789abcdef"', True),
+    ('W/"0123456789abcdef"', True),  # Weak comparison
+    ('"other", "0123456789abcdef"', True),
+    ('"other",W/"0123456789abcdef" ', True),
+    ('*', True),
+    (' * ', True),
+    ('', False),
+    ('"other"', False),
+    ('"x0123456789abcdef"', False),  # Contains the ETag, but is a different one
+    ('"0123456789abcdef"x', False),
+    ('0123456789abcdef', False),  # Unquoted
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, ETAG) is expected
+
+
+class RecordingCueList:
+    def __init__(self):
+        self.calls = []
+
+    def goto(self, name, step):
+        self.calls.append((name, step))
+        return True
+
+    def get_status(self):
+        return {}
+
+
+@pytest.mark.parametrize('payload, status, step', [
+    ({}, 400, None),
+    ({'step': None}, 400, None),
+    ({'step': [1]}, 400, None),
+    ({'step': 3}, 200, 2),  # 1-based in the API
+    ({'step': 'verse'}, 200, 'verse'),
+])
+def test_cue_list_goto_step(payload, status, step):
+    api = SimpleNamespace(cue_list=RecordingCueList())
+    request = ApiRequest('POST', '/api/cuelist/show/goto', {'name': 'show'}, {}, payload)
+    response = HttpApiServer._cue_list_goto(api, request)
+    assert response.status == status
+    if status == 400:
+        assert 'step' in json.loads(response.body)['error']
+        assert api.cue_list.calls == []
+    else:
+        assert api.cue_list.calls == [('show', step)]
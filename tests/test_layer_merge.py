@@ -0,0 +1,53 @@
+import contextlib
+import io
+
+import pytest
+
+from dmx_controller import DMXController
+from layer_merge import CUE_LAYER
+
+
+@pytest.fixture
+def dmx():
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller = DMXController()
+        controller.add_universe(1)
+        controller.add_layer(CUE_LAYER)
+    yield controller
+    controller.stop()
+
+
+def test_writes_merge_lazily_on_read(dmx):
+    universe = dmx.get_universe(1)
+    dmx.set_channel(1, 1, 200, 'dimmer')
+    dmx.set_channel(1, 2, 50)
+    assert universe.layers_dirty
+    assert bytes(universe.dmx_data[:2]) == bytes(2)  # Not merged by the writes
+
+    assert dmx.get_channel(1, 1) == 200
+    assert not universe.layers_dirty
+    assert universe.snapshot()[1:3] == bytes([200, 50])
+
+
+def test_htp_ltp_and_grandmaster(dmx):
+    dmx.set_channel(1, 1, 100, 'dimmer')
+    dmx.set_channel(1, 2, 10)
+    with dmx.begin_frame(CUE_LAYER) as frame:
+        frame.set_channel(1, 1, 60)
+        frame.set_channel(1, 2, 20)
+    assert dmx.get_universe(1).get_data()[:2] == bytes([100, 20])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        dmx.set_grandmaster(0.5)
+    assert dmx.get_universe(1).get_data()[:2] == bytes([50, 20])
+
+    dmx.clear_layer(CUE_LAYER)
+    assert dmx.get_universe(1).get_data()[:2] == bytes([50, 10])
+
+
+def test_read_layer_reports_driven_channels(dmx):
+    with dmx.begin_frame(CUE_LAYER) as frame:
+        frame.set_channel(1, 3, 128)
+    values, driven = dmx.read_layer(CUE_LAYER, 1, [2, 3])
+    assert list(values) == [0, 128]
+    assert list(driven) == [False, True]
@@ -0,0 +1,73 @@
+"""
+LiveStateHub sampling: fixture states are only copied when their version moved
+"""
+import threading
+from types import SimpleNamespace
+
+from live_state import LiveStateHub
+
+
+class CountingFixtures(dict):
+    """fixtures mapping that counts how often the sampler copies it"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.copies = 0
+
+    def items(self):
+        self.copies += 1
+        return super().items()
+
+
+def make_hub():
+    fixtures = CountingFixtures({'par1': {'state': {'dimmer': 0.0}}})
+    fixture_manager = SimpleNamespace(fixtures=fixtures, state_version=0, dmx=SimpleNamespace(grandmaster=1.0))
+    return LiveStateHub(fixture_manager, interval=0.01), fixture_manager
+
+
+def wait_delta(hub, version):
+    deltas = hub.wait_for(version, timeout=2.0)
+    assert deltas
+    return deltas[-1]
+
+
+def test_unchanged_states_are_not_copied():
+    hub, fixture_manager = make_hub()
+    version, _ = hub.subscribe()
+    try:
+        copies = fixture_manager.fixtures.copies
+        # Only a non-fixture value changes: published without copying the fixture states
+        fixture_manager.dmx.grandmaster = 0.5
+        version, payload = wait_delta(hub, version)
+        assert payload == '{"grandmaster": 0.5}'
+        assert fixture_manager.fixtures.copies == copies
+
+        fixture_manager.fixtures['par1']['state']['dimmer'] = 1.0
+        fixture_manager.state_version += 1
+        version, payload = wait_delta(hub, version)
+        assert payload == '{"states": {"par1": {"dimmer": 1.0}}}'
+        assert fixture_manager.fixtures.copies > copies
+    finally:
+        hub.unsubscribe()
+
+
+def test_listener_called_for_each_delta():
+    hub, fixture_manager = make_hub()
+    calls = []
+    called = threading.Event()
+
+    def listener():
+        calls.append(hub.version)
+        called.set()
+
+    hub.add_listener(listener)
+    version, _ = hub.subscribe()
+    try:
+        fixture_manager.dmx.grandmaster = 0.25
+        version, _ = wait_delta(hub, version)
+        assert called.wait(2)
+        assert calls == [version]
+        assert hub.deltas_since(version) == []
+        assert hub.deltas_since(version - 1) == [(version, '{"grandmaster": 0.25}')]
+    finally:
+        hub.unsubscribe()
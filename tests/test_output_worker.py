@@ -0,0 +1,76 @@
+"""
+OutputWorker hand-over: waiting and failed batches are merged, never lose a universe's latest frame
+"""
+import threading
+import time
+
+from output_worker import OutputWorker
+
+
+class RecordingSender:
+    """Stands in for an ArtNetPort/E131Universe"""
+
+    def __init__(self, fail: int = 0):
+        self.sent = []
+        self.fail = fail  # Number of sends that raise before succeeding
+        self.event = threading.Event()
+
+    def send(self, data) -> bool:
+        if self.fail:
+            self.fail -= 1
+            raise OSError("unreachable")
+        self.sent.append(bytes(data))
+        self.event.set()
+        return True
+
+
+def test_waiting_batch_is_merged_not_replaced():
+    worker = OutputWorker('test')
+    first, second = RecordingSender(), RecordingSender()
+    # Universe 'first' only changed in the frame that is still waiting
+    worker.submit([(first, b'\x01'), (second, b'\x01')])
+    worker.submit([(second, b'\x02')])
+    assert worker.batches_dropped == 1
+
+    worker.start()
+    try:
+        assert first.event.wait(2) and second.event.wait(2)
+    finally:
+        worker.stop()
+    assert first.sent == [b'\x01']
+    assert second.sent == [b'\x02']  # Latest data per sender
+
+
+def test_failed_batch_is_sent_after_backoff():
+    worker = OutputWorker('test')
+    worker.BACKOFF_MIN = 0.05
+    failing, other = RecordingSender(fail=1), RecordingSender()
+    worker.start()
+    try:
+        worker.submit([(failing, b'\x01')])
+        deadline = time.monotonic() + 2
+        while not worker.send_errors and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert worker.send_errors == 1
+        # Submitted during the backoff: merged with the failed batch instead of skipped
+        worker.submit([(other, b'\x02')])
+        assert failing.event.wait(2) and other.event.wait(2)
+    finally:
+        worker.stop()
+    assert failing.sent == [b'\x01']
+    assert other.sent == [b'\x02']
+    assert worker.consecutive_failures == 0
+
+
+def test_retire_drops_pending_data_of_replaced_senders():
+    worker = OutputWorker('test')
+    old, new = RecordingSender(), RecordingSender()
+    worker.submit([(old, b'\x01'), (new, b'\x01')])
+    assert worker.retire([old])
+    worker.start()
+    try:
+        assert new.event.wait(2)
+    finally:
+        worker.stop()
+    assert old.sent == []
+    assert new.sent == [b'\x01']
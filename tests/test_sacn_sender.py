@@ -0,0 +1,97 @@
+"""
+E1.31 data and sync packets from E131Sender, received on a local UDP socket
+"""
+import socket
+import uuid
+
+import pytest
+
+from sacn_sender import (ACN_PACKET_ID, DATA_PACKET_SIZE, E131_PORT, SYNC_PACKET_SIZE, VECTOR_E131_DATA_PACKET,
+                         VECTOR_E131_EXTENDED_SYNCHRONIZATION, VECTOR_ROOT_E131_DATA, VECTOR_ROOT_E131_EXTENDED,
+                         E131Sender, multicast_address)
+
+CID = '6f1c1c9e-8d5e-4b6f-9a43-2f9c1a0d7e11'
+
+
+@pytest.fixture
+def receiver():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.settimeout(2.0)
+    yield sock
+    sock.close()
+
+
+@pytest.fixture
+def sender():
+    sender = E131Sender(source_name='Test Source', cid=CID, sync_address=7)
+    yield sender
+    sender.close()
+
+
+def receive(sock):
+    packet, _ = sock.recvfrom(2048)
+    return packet
+
+
+def test_data_packet_over_loopback(receiver, sender):
+    universe = sender.add_universe(42, priority=150, unicast_ip='127.0.0.1', port=receiver.getsockname()[1])
+    frame = bytes([0]) + bytes(i % 256 for i in range(512))
+    assert universe.send(frame)
+
+    packet = receive(receiver)
+    assert len(packet) == DATA_PACKET_SIZE
+    # Root layer
+    assert packet[4:16] == ACN_PACKET_ID
+    assert int.from_bytes(packet[18:22], 'big') == VECTOR_ROOT_E131_DATA
+    assert packet[22:38] == uuid.UUID(CID).bytes
+    # Framing layer
+    assert int.from_bytes(packet[40:44], 'big') == VECTOR_E131_DATA_PACKET
+    assert packet[44:108].rstrip(b'\x00') == b'Test Source'
+    assert packet[108] == 150
+    assert int.from_bytes(packet[109:111], 'big') == 7  # Sync address
+    assert packet[111] == 1  # Sequence
+    assert int.from_bytes(packet[113:115], 'big') == 42
+    # DMP layer: start code + channels
+    assert int.from_bytes(packet[123:125], 'big') == 513
+    assert packet[125:] == frame
+
+
+def test_sequence_wraps(receiver, sender):
+    universe = sender.add_universe(1, unicast_ip='127.0.0.1', port=receiver.getsockname()[1])
+    universe.sequence = 254
+    sequences = []
+    for _ in range(3):
+        universe.send(bytes(513))
+        sequences.append(receive(receiver)[111])
+    assert sequences == [255, 0, 1]
+
+
+def test_sync_reaches_unicast_receiver(receiver, sender):
+    port = receiver.getsockname()[1]
+    sender.add_universe(1, unicast_ip='127.0.0.1', port=port)
+    sender.add_universe(2, unicast_ip='127.0.0.1', port=port)
+    assert sender.sync_destinations() == [('127.0.0.1', port)]
+    assert sender.send_sync()
+
+    packet = receive(receiver)
+    assert len(packet) == SYNC_PACKET_SIZE
+    assert int.from_bytes(packet[18:22], 'big') == VECTOR_ROOT_E131_EXTENDED
+    assert int.from_bytes(packet[40:44], 'big') == VECTOR_E131_EXTENDED_SYNCHRONIZATION
+    assert packet[44] == 1  # Sequence
+    assert int.from_bytes(packet[45:47], 'big') == 7
+
+
+def test_sync_destinations_mixed(sender):
+    sender.add_universe(1)  # Multicast
+    sender.add_universe(2, unicast_ip='10.0.0.5')
+    assert sender.sync_destinations() == [('10.0.0.5', E131_PORT), (multicast_address(7), E131_PORT)]
+
+
+def test_no_sync_without_sync_address():
+    sender = E131Sender(sync_address=0)
+    try:
+        sender.add_universe(1, unicast_ip='127.0.0.1')
+        assert not sender.send_sync()
+    finally:
+        sender.close()
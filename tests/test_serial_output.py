@@ -0,0 +1,102 @@
+"""
+Serial DMX writer: Enttec DMX USB Pro framing, and the writer thread against a pty stand-in for the port
+"""
+import contextlib
+import io
+import os
+import select
+import time
+
+import pytest
+
+from dmx_controller import DMXController
+from serial_output import ENTTEC_END, ENTTEC_LABEL_SEND_DMX, ENTTEC_START, SerialOutput, build_enttec_packet
+
+FRAME = bytes([0]) + bytes(i % 256 for i in range(512))
+
+
+def test_enttec_packet_framing():
+    packet = build_enttec_packet(FRAME)
+    assert packet[0] == ENTTEC_START == 0x7E
+    assert packet[1] == ENTTEC_LABEL_SEND_DMX == 6
+    assert packet[2] | (packet[3] << 8) == 513  # Length LSB/MSB: start code + 512 channels
+    assert packet[4] == 0  # DMX start code
+    assert packet[4:-1] == FRAME
+    assert packet[-1] == ENTTEC_END == 0xE7
+    assert len(packet) == 513 + 5
+
+
+def test_enttec_packet_short_frame():
+    packet = build_enttec_packet(bytes([0, 255, 128]))
+    assert packet == bytes([0x7E, 6, 3, 0, 0, 255, 128, 0xE7])
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        SerialOutput('/dev/null', 'dmx512a')
+
+
+def test_mailbox_keeps_latest_frame():
+    output = SerialOutput('/dev/null', 'open_dmx')
+    output.submit(bytes(513))
+    output.submit(FRAME)
+    assert output.frames_dropped == 1
+    assert output._pending == FRAME
+
+
+def read_from_pty(master: int, size: int, timeout: float = 2.0) -> bytes:
+    data = b''
+    deadline = time.monotonic() + timeout
+    while len(data) < size and time.monotonic() < deadline:
+        ready, _, _ = select.select([master], [], [], 0.1)
+        if ready:
+            data += os.read(master, 4096)
+    return data
+
+
+@pytest.mark.skipif(not hasattr(os, 'openpty'), reason="needs a pty")
+@pytest.mark.parametrize('mode, expected', [
+    ('enttec_pro', build_enttec_packet(FRAME)),
+    ('open_dmx', FRAME),  # Raw frame; break/mark-after-break are line conditions, not bytes
+])
+def test_writer_thread_over_pty(mode, expected):
+    pytest.importorskip('serial')
+    master, slave = os.openpty()
+    output = SerialOutput(os.ttyname(slave), mode)
+    try:
+        output.open()
+        output.start()
+        output.submit(FRAME)
+        assert read_from_pty(master, len(expected)) == expected
+        # The counter is bumped after write() returns, which may be after the bytes arrived
+        deadline = time.monotonic() + 2.0
+        while output.frames_written == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert output.frames_written == 1
+        assert output.write_errors == 0
+    finally:
+        output.stop()
+        os.close(master)
+        os.close(slave)
+
+
+@pytest.mark.skipif(not hasattr(os, 'openpty'), reason="needs a pty")
+def test_controller_routes_one_universe_to_the_port():
+    pytest.importorskip('serial')
+    master, slave = os.openpty()
+    dmx = DMXController()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()) as log:
+            dmx._apply_config({'serial_port': os.ttyname(slave), 'universe_mapping': {
+                '1': {'output_mode': 'serial'},
+                '2': {'output_mode': 'serial'},
+            }})
+        assert list(dmx.routes) == [1]
+        assert dmx.serial_universe == 1
+        assert dmx.universes[2].output_mode == 'virtual'
+        assert "Universe 2 not sent to serial" in log.getvalue()
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            dmx.stop()
+        os.close(master)
+        os.close(slave)